@@ -0,0 +1,175 @@
+"""Admission control - bounds concurrent chat generations and sheds load beyond a wait queue."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f"Server is busy ({reason.replace('_', ' ')}), retry in {retry_after}s")
+
+
+class AdmissionController:
+    """
+    Limits in-flight generations and queues a bounded number of waiters.
+
+    A request takes a slot immediately when one is free. Otherwise it waits in
+    a FIFO queue (priority waiters go first) for at most `queue_timeout`
+    seconds. When the queue is already full the request is rejected at once
+    with 429; a request that times out in the queue gets 503. Both carry a
+    Retry-After estimate based on how long slots are typically held.
+    Slots are handed directly to the next waiter on release, so a burst can
+    never overshoot `max_in_flight`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        observe_wait: Optional[Callable[[float], None]] = None
+    ):
+        """
+        Args:
+            max_in_flight: Concurrent slots (0 or less disables admission control)
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is shed
+            observe_wait: Called with each admitted request's queue wait, in seconds
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.observe_wait = observe_wait
+
+        self.in_flight = 0
+        self._priority: Deque[asyncio.Future] = deque()
+        self._normal: Deque[asyncio.Future] = deque()
+        # Exponentially weighted average of how long a slot is held
+        self._hold_seconds = 1.0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._priority) + len(self._normal)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a request arriving now."""
+        if not self.enabled:
+            return 1
+        waves = (self.queue_depth + 1) / self.max_in_flight
+        return max(1, math.ceil(self._hold_seconds * waves))
+
+    async def acquire(self, priority: bool = False) -> None:
+        """
+        Take a slot, waiting in the queue if all slots are busy.
+
+        Args:
+            priority: Join the priority lane (served before normal waiters)
+
+        Raises:
+            AdmissionRejected: The queue is full (429) or the wait timed out (503)
+        """
+        start = time.perf_counter()
+        if not self.enabled:
+            return
+        if self.in_flight < self.max_in_flight and self.queue_depth == 0:
+            self.in_flight += 1
+            self._admit(start)
+            return
+        if self.queue_depth >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue_full", 429, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane = self._priority if priority else self._normal
+        lane.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter, lane):
+                self._admit(start)
+                return
+            self.rejected_timeout += 1
+            raise AdmissionRejected("queue_timeout", 503, self.retry_after())
+        except asyncio.CancelledError:
+            if not self._abandon(waiter, lane):
+                # The slot was handed over just as we were cancelled - pass it on
+                self.release()
+            raise
+        self._admit(start)
+
+    def _abandon(self, waiter: asyncio.Future, lane: Deque[asyncio.Future]) -> bool:
+        """Leave the queue; returns False if a slot was already handed to this waiter."""
+        if waiter.done():
+            return False
+        waiter.cancel()
+        lane.remove(waiter)
+        return True
+
+    def _admit(self, start: float) -> None:
+        self.admitted += 1
+        if self.observe_wait is not None:
+            self.observe_wait(time.perf_counter() - start)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it straight to the next waiter if there is one."""
+        if not self.enabled:
+            return
+        if held_seconds is not None:
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held_seconds
+        for lane in (self._priority, self._normal):
+            while lane:
+                waiter = lane.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_flight -= 1
+
+    async def run(self, factory: Callable[[], AsyncIterator[str]], priority: bool = False) -> AsyncIterator[str]:
+        """
+        Hold a slot for the lifetime of a chunk stream.
+
+        Args:
+            factory: Creates the stream once a slot is granted
+            priority: Queue in the priority lane
+
+        Yields:
+            The stream's chunks
+        """
+        await self.acquire(priority)
+        start = time.perf_counter()
+        chunks = factory()
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            # Close the inner stream first so upstream work stops before the slot is reused
+            try:
+                await chunks.aclose()
+            finally:
+                self.release(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
@@ -1,28 +1,67 @@
 # Import required FastAPI components for building the API
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 # Import Pydantic for data validation and settings management
 from pydantic import BaseModel
-# Import OpenAI client for interacting with OpenAI's API
-from openai import OpenAI
+import asyncio
+import json
 import os
-from typing import Optional, Dict, Any, List
+import secrets
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator
 from contextlib import asynccontextmanager
-from collections import defaultdict
-from datetime import datetime
 
 # Import document ingestion
-from .ingest import router as ingest_router, load_documents_from_data_folder, get_vector_store
+from .ingest import (
+    router as ingest_router, start_background_ingestion, stop_background_ingestion,
+    start_web_refresher, stop_web_refresher, get_ingestion_progress, get_vector_store
+)
 # Import prompt templates
 from .prompts import PromptTemplates
+# Import shared, pooled OpenAI clients
+from .clients import init_clients, get_clients, close_clients, current_clients
+# Import stage deadlines and disconnect-aware streaming
+from .streaming import (
+    PipelineDeadlines, StageTimeoutError, with_deadline, open_token_stream, relay_tokens, stop_on_disconnect
+)
+# Import semantic answer cache
+from .semantic_cache import SemanticCache, replay
+# Import single-flight request deduplication
+from .single_flight import Flight, SingleFlight, normalize_message
+# Import constant-memory RAG statistics
+from .rag_stats import PromptCacheStats, RAGStatistics, VersionedSnapshot, snapshot_delta
+# Import Prometheus-style metrics
+from .metrics import (
+    REGISTRY, CHAT_STAGE_SECONDS, CHAT_TOKENS_STREAMED, CHAT_CONTEXT_TOKENS, CHAT_USAGE_TOKENS, CHAT_REQUESTS,
+    OPENAI_POOL_CONNECTIONS, CHAT_IN_FLIGHT, SEMANTIC_CACHE_ENTRIES, VECTOR_STORE_CHUNKS,
+    ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT_SECONDS, CHAT_MODEL_ROUTES
+)
+# Import admission control / load shedding
+from .admission import AdmissionController, AdmissionRejected
+# Import model routing
+from .routing import ModelRouter, RouteDecision, RouteStats
+from .settings import env_bool, env_float, env_int, env_str
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load documents from data/ folder when the app starts."""
-    await load_documents_from_data_folder()
+    """Warm up the shared OpenAI clients and start loading documents in the background."""
+    warm_up = None
+    if os.getenv("OPENAI_API_KEY"):
+        # Importing openai is the slowest part of a cold start - do it in a worker thread
+        warm_up = asyncio.create_task(asyncio.to_thread(init_clients))
+    # Don't block startup on parsing and embedding - the index fills in progressively
+    start_background_ingestion()
+    # Keep web articles fresh with conditional requests (WEB_REFRESH_INTERVAL)
+    start_web_refresher()
     yield
+    await stop_web_refresher()
+    await stop_background_ingestion()
+    if warm_up is not None:
+        await warm_up
+    # Release pooled connections on shutdown
+    await close_clients()
 
 
 # Initialize FastAPI application with a title
@@ -41,46 +80,88 @@ app.add_middleware(
 # Include document ingestion endpoints
 app.include_router(ingest_router)
 
+# Per-stage deadlines for the chat pipeline (configurable via CHAT_* env vars)
+deadlines = PipelineDeadlines.from_env()
+
+# Semantic answer cache - paraphrased questions replay a previous answer without an LLM call
+semantic_cache: Optional[SemanticCache] = (
+    SemanticCache(
+        threshold=env_float("SEMANTIC_CACHE_THRESHOLD", 0.92),
+        max_entries=env_int("SEMANTIC_CACHE_MAX_ENTRIES", 512),
+        ttl_seconds=env_float("SEMANTIC_CACHE_TTL", 3600.0),
+    )
+    if env_bool("SEMANTIC_CACHE_ENABLED", True) else None
+)
+
+# Single-flight registry - identical in-flight chat requests share one pipeline run
+single_flight = SingleFlight()
+dedupe_requests = env_bool("SINGLE_FLIGHT_ENABLED", True)
+
+# Admission control - bounds concurrent generations; excess requests queue briefly, then are shed
+admission = AdmissionController(
+    max_in_flight=env_int("CHAT_MAX_IN_FLIGHT", 32),
+    max_queue=env_int("CHAT_MAX_QUEUE", 64),
+    queue_timeout=env_float("CHAT_QUEUE_TIMEOUT", 10.0),
+    observe_wait=ADMISSION_WAIT_SECONDS.observe,
+)
+# Exact repeats of cached questions skip ahead of generations (they hold a slot only briefly)
+cache_hit_priority = env_bool("CHAT_CACHE_HIT_PRIORITY", True)
+
+# Retrieved context is packed into a token budget (0 = the top 3 chunks verbatim),
+# chosen from this many search results
+context_token_budget = env_int("CONTEXT_TOKEN_BUDGET", 800)
+context_candidates = env_int("CONTEXT_CANDIDATES", 6)
+
+# Optional model routing - requests without an explicit model get a fast, default or
+# strong model chosen from the query, template and retrieval scores (CHAT_ROUTER_*)
+model_router: Optional[ModelRouter] = ModelRouter.from_env() if env_bool("CHAT_ROUTER_ENABLED", False) else None
+route_stats = RouteStats()
+
+# Per-stage latency histograms, bound once so the hot path is a bisect and a few increments
+STAGE_EMBEDDING = CHAT_STAGE_SECONDS.labels("embedding")
+STAGE_SEARCH = CHAT_STAGE_SECONDS.labels("search")
+STAGE_PROMPT_BUILD = CHAT_STAGE_SECONDS.labels("prompt_build")
+STAGE_FIRST_TOKEN = CHAT_STAGE_SECONDS.labels("first_token")  # LLM request -> first token
+STAGE_TTFT = CHAT_STAGE_SECONDS.labels("ttft")  # pipeline start -> first token
+STAGE_STREAM = CHAT_STAGE_SECONDS.labels("stream")  # first token -> end of stream
+
+# Gauges read at scrape time
+OPENAI_POOL_CONNECTIONS.labels("active").set_function(
+    lambda: current_clients().pool_stats()["active"] if current_clients() else 0
+)
+OPENAI_POOL_CONNECTIONS.labels("idle").set_function(
+    lambda: current_clients().pool_stats()["idle"] if current_clients() else 0
+)
+CHAT_IN_FLIGHT.set_function(lambda: len(single_flight))
+SEMANTIC_CACHE_ENTRIES.set_function(lambda: len(semantic_cache) if semantic_cache is not None else 0)
+VECTOR_STORE_CHUNKS.set_function(lambda: len(get_vector_store().documents))
+ADMISSION_IN_FLIGHT.set_function(lambda: admission.in_flight)
+ADMISSION_QUEUE_DEPTH.set_function(lambda: admission.queue_depth)
+
 # RAG Statistics Storage
-# This tracks retrieval quality and usage patterns
-rag_statistics: Dict[str, Any] = {
-    "total_queries": 0,
-    "total_documents_retrieved": 0,
-    "avg_relevance_score": 0.0,
-    "similarity_method_usage": {"cosine": 0, "euclidean": 0},
-    "source_usage": defaultdict(int),  # Track how often each source is retrieved
-    "queries_over_time": [],  # Track when queries happen
-    "relevance_scores": [],  # Store all scores for calculating averages
-}
+# This tracks retrieval quality and usage patterns in constant memory
+rag_statistics = RAGStatistics()
 
 def update_rag_stats(search_results: List[Dict[str, Any]], similarity_method: str) -> None:
-    """Update RAG statistics with new search results."""
-    rag_statistics["total_queries"] += 1
-    rag_statistics["total_documents_retrieved"] += len(search_results)
-    rag_statistics["similarity_method_usage"][similarity_method] += 1
-    
-    # Track query timestamp
-    rag_statistics["queries_over_time"].append({
-        "timestamp": datetime.now().isoformat(),
-        "num_results": len(search_results)
-    })
-    
-    # Track relevance scores and source usage
-    for result in search_results:
-        score = result.get("score", 0.0)
-        rag_statistics["relevance_scores"].append(score)
-        
-        # Track source from metadata
-        metadata = result.get("metadata", {})
-        source = metadata.get("source", "unknown")
-        if source and source != "unknown":
-            # Extract filename from path
-            source_name = os.path.basename(source) if "/" in source or "\\" in source else source
-            rag_statistics["source_usage"][source_name] += 1
-    
-    # Update average relevance score
-    if rag_statistics["relevance_scores"]:
-        rag_statistics["avg_relevance_score"] = sum(rag_statistics["relevance_scores"]) / len(rag_statistics["relevance_scores"])
+    """Update RAG statistics with new search results (O(1) per result)."""
+    rag_statistics.record(search_results, similarity_method)
+
+# Prompt tokens served from the provider's prompt cache, per template
+prompt_cache_stats = PromptCacheStats()
+
+def record_usage(template: str, usage: Any) -> None:
+    """Record a completion's token usage, including prompt tokens served from cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+    prompt_cache_stats.record(template, usage.prompt_tokens, cached, usage.completion_tokens)
+    CHAT_USAGE_TOKENS.labels("prompt").inc(usage.prompt_tokens)
+    CHAT_USAGE_TOKENS.labels("cached_prompt").inc(cached)
+    CHAT_USAGE_TOKENS.labels("completion").inc(usage.completion_tokens)
+
+def record_route(decision: RouteDecision) -> None:
+    """Count one routing decision in the stats payload and metrics."""
+    route_stats.record(decision)
+    CHAT_MODEL_ROUTES.labels(decision.route, decision.model).inc()
 
 # Define the data model for chat requests using Pydantic
 # This ensures incoming request data is properly validated
@@ -90,67 +171,231 @@ class ChatRequest(BaseModel):
     template: Optional[str] = "default"  # Prompt template: default, beginner, advanced
     similarity_method: Optional[str] = "cosine"  # Similarity measure: cosine or euclidean
 
+def requested_model(request: ChatRequest) -> str:
+    """
+    The model a request asked for, as used in cache and single-flight keys.
+
+    With routing enabled, requests that leave `model` unset share the "auto"
+    key: the router's choice is only known after retrieval.
+    """
+    if model_router is not None and not ("model" in request.model_fields_set and request.model):
+        return "auto"
+    return request.model
+
+async def answer_stream(request: ChatRequest, flight: Flight) -> AsyncIterator[str]:
+    """
+    Run the RAG pipeline for one request and yield the answer as it streams.
+    
+    Runs as a single-flight producer: identical concurrent requests share this
+    one run. Stage failures raised before the first chunk reach every subscriber.
+    """
+    pipeline_start = time.perf_counter()
+    
+    # RAG: Search vector database for relevant context
+    vector_store = get_vector_store()
+    
+    # Check if vector store has documents
+    stats = vector_store.get_stats()
+    if stats["num_documents"] == 0:
+        print("⚠️  WARNING: Vector store is empty! No documents loaded.")
+        print("   This might be a deployment issue - check if data/ folder is accessible")
+    
+    # Embed the query under its deadline (needed for both the cache and the search)
+    query_vector = None
+    if semantic_cache is not None or stats["num_documents"] > 0:
+        with STAGE_EMBEDDING.time():
+            query_vector = await with_deadline(
+                vector_store.embed_query(request.user_message),
+                deadlines.embedding,
+                "embedding"
+            )
+    
+    # Replay a cached answer to an equivalent question without calling the LLM
+    model = requested_model(request)
+    cache_key = (request.template, model, request.similarity_method)
+    index_version = vector_store.index_version
+    if semantic_cache is not None:
+        cached = semantic_cache.lookup(cache_key, query_vector, index_version)
+        if cached is not None:
+            flight.info["X-Cache"] = "HIT"
+            async for chunk in replay(cached.chunks):
+                yield chunk
+            return
+    flight.info["X-Cache"] = "MISS"
+    
+    search_results = []
+    if stats["num_documents"] > 0:
+        # Scan the index off the event loop under its own deadline
+        with STAGE_SEARCH.time():
+            search_results = await with_deadline(
+                asyncio.to_thread(
+                    vector_store.search_by_vector,
+                    query_vector,
+                    top_k=context_candidates if context_token_budget > 0 else 3,
+                    similarity_method=request.similarity_method
+                ),
+                deadlines.search,
+                "search"
+            )
+    
+    # Track RAG statistics (only if we have results)
+    if search_results:
+        update_rag_stats(search_results, request.similarity_method)
+    
+    # Build prompt using templates: a static per-template prefix, then the retrieved context
+    template = request.template if request.template in PromptTemplates.SYSTEM_PROMPTS else "default"
+    
+    # Route to a model unless the request named one ("auto" asks for routing too);
+    # with routing off every model name, "auto" included, is passed through as sent
+    route = None
+    if model_router is not None:
+        if model == "auto":
+            route = model_router.route(request.user_message, template, search_results, request.similarity_method)
+            model = route.model
+        else:
+            route = RouteDecision(model, "explicit", "model set in request")
+        record_route(route)
+        flight.info["X-Model-Route"] = f"{route.route} ({route.reason})"
+        flight.info["X-Model"] = route.model
+    
+    with STAGE_PROMPT_BUILD.time():
+        if context_token_budget > 0:
+            context, packing = PromptTemplates.pack_context(
+                search_results, context_token_budget, query=request.user_message
+            )
+            system_message = PromptTemplates.build_system_message(template=template, context=context)
+            user_message = request.user_message
+            CHAT_CONTEXT_TOKENS.observe(packing["tokens_used"])
+            flight.info["X-Context-Tokens"] = str(packing["tokens_used"])
+        else:
+            system_message, user_message = PromptTemplates.build_rag_prompt(
+                user_query=request.user_message,
+                search_results=search_results,
+                template=template,
+                max_sources=3
+            )
+    
+    # Reuse the process-wide async client so warm pooled connections skip the TLS handshake
+    client = get_clients().async_client
+    
+    # Open the stream and wait for the first token before responding, so a
+    # slow upstream becomes a clean 504 instead of a hung, empty response.
+    request_sent = time.perf_counter()
+    token_stream, first_token = await open_token_stream(
+        client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "developer", "content": system_message},
+                {"role": "user", "content": user_message}
+            ],
+            stream=True,  # Enable streaming response
+            # Final chunk reports usage, including prompt tokens served from the prompt cache
+            stream_options={"include_usage": True},
+            # Requests sharing a template share a prefix - route them to the same cache
+            prompt_cache_key=f"diving-coach-{template}"
+        ),
+        deadlines.first_token
+    )
+    first_token_at = time.perf_counter()
+    STAGE_FIRST_TOKEN.observe(first_token_at - request_sent)
+    STAGE_TTFT.observe(first_token_at - pipeline_start)
+    if route is not None:
+        route_stats.observe_ttft(route, first_token_at - pipeline_start)
+    
+    # Cache the full answer once the upstream stream completes normally
+    def remember(chunks: List[str]) -> None:
+        if semantic_cache is not None:
+            semantic_cache.store(cache_key, request.user_message, query_vector, chunks, index_version)
+    
+    # Token reads yield to the event loop, so one worker serves many concurrent
+    # streams; the upstream stream is closed when this run ends or is cancelled.
+    tokens_streamed = 0
+    try:
+        async for token in relay_tokens(
+            token_stream, first_token, on_complete=remember, token_timeout=deadlines.token_idle
+        ):
+            tokens_streamed += 1
+            yield token
+    finally:
+        STAGE_STREAM.observe(time.perf_counter() - first_token_at)
+        CHAT_TOKENS_STREAMED.observe(tokens_streamed)
+        if token_stream.usage is not None:
+            record_usage(template, token_stream.usage)
+
+
 # Define the main chat endpoint that handles POST requests
 @app.post("/api/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     try:
         # Get API key from environment variable
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise HTTPException(status_code=500, detail="OPENAI_API_KEY environment variable is not set")
         
-        # RAG: Search vector database for relevant context
-        vector_store = get_vector_store()
+        # Identical concurrent requests share one embedding, search and generation
+        if dedupe_requests:
+            flight_key = (
+                normalize_message(request.user_message),
+                request.template,
+                requested_model(request),
+                request.similarity_method
+            )
+        else:
+            flight_key = object()
         
-        # Check if vector store has documents
-        stats = vector_store.get_stats()
-        if stats["num_documents"] == 0:
-            print("⚠️  WARNING: Vector store is empty! No documents loaded.")
-            print("   This might be a deployment issue - check if data/ folder is accessible")
+        # Only a flight's leader takes an admission slot - followers ride along for free
+        def run_pipeline(flight: Flight) -> AsyncIterator[str]:
+            priority = (
+                cache_hit_priority
+                and semantic_cache is not None
+                and semantic_cache.contains(
+                    (request.template, requested_model(request), request.similarity_method),
+                    request.user_message,
+                    get_vector_store().index_version
+                )
+            )
+            return admission.run(lambda: answer_stream(request, flight), priority=priority)
         
-        search_results = await vector_store.search(
-            request.user_message, 
-            top_k=3,
-            similarity_method=request.similarity_method
-        )
+        subscription = single_flight.subscribe(flight_key, run_pipeline)
         
-        # Track RAG statistics (only if we have results)
-        if search_results:
-            update_rag_stats(search_results, request.similarity_method)
+        # Wait for the first chunk so pipeline errors still become proper status codes
+        await subscription.ready()
+        if not subscription.leader:
+            CHAT_REQUESTS.labels("deduplicated").inc()
+        elif subscription.flight.info.get("X-Cache") == "HIT":
+            CHAT_REQUESTS.labels("cache_hit").inc()
+        else:
+            CHAT_REQUESTS.labels("generated").inc()
         
-        # Build prompt using templates
-        system_message, user_message = PromptTemplates.build_rag_prompt(
-            user_query=request.user_message,
-            search_results=search_results,
-            template=request.template,
-            max_sources=3
+        # Every subscriber gets the same token stream (late joiners get the prefix
+        # replayed). StreamingResponse pulls the next chunk only after the previous
+        # one was sent, and a disconnecting client unsubscribes - the upstream
+        # generation is cancelled once nobody is listening.
+        headers = {
+            **subscription.flight.info,
+            "X-Single-Flight": "leader" if subscription.leader else "follower"
+        }
+        return StreamingResponse(
+            stop_on_disconnect(subscription.stream(), http_request, deadlines.disconnect_check_interval),
+            media_type="text/plain",
+            headers=headers
         )
-        
-        # Initialize OpenAI client with the API key from environment
-        client = OpenAI(api_key=api_key)
-        
-        # Create an async generator function for streaming responses
-        async def generate():
-            # Create a streaming chat completion request with enhanced context
-            stream = client.chat.completions.create(
-                model=request.model,
-                messages=[
-                    {"role": "developer", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                stream=True  # Enable streaming response
-            )
-            
-            # Yield each chunk of the response as it becomes available
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    yield chunk.choices[0].delta.content
-
-        # Return a streaming response to the client
-        return StreamingResponse(generate(), media_type="text/plain")
     
+    except HTTPException:
+        CHAT_REQUESTS.labels("error").inc()
+        raise
+    except AdmissionRejected as e:
+        # Overloaded - fail fast so the client can back off instead of waiting
+        CHAT_REQUESTS.labels("rejected").inc()
+        ADMISSION_REJECTIONS.labels(e.reason).inc()
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except StageTimeoutError as e:
+        # A stage ran past its deadline - tell the client which one
+        CHAT_REQUESTS.labels("timeout").inc()
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         # Handle any errors that occur during processing
+        CHAT_REQUESTS.labels("error").inc()
         raise HTTPException(status_code=500, detail=str(e))
 
 # Define a health check endpoint to verify API status
@@ -158,6 +403,27 @@ async def chat(request: ChatRequest):
 async def health_check():
     return {"status": "ok"}
 
+# Liveness: the process is up and serving requests
+@app.get("/api/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+# Readiness: initial ingestion has finished (chat works before this, on a partial index)
+@app.get("/api/health/ready")
+async def readiness():
+    summary = get_ingestion_progress().summary()
+    summary.pop("sources")
+    summary["num_documents"] = len(get_vector_store().documents)
+    if not summary["complete"]:
+        return JSONResponse(status_code=503, content={"status": "loading", **summary})
+    return {"status": "ready", **summary}
+
+# Define a Prometheus scrape endpoint
+@app.get("/api/metrics")
+async def metrics():
+    """Per-stage latency histograms, counters and gauges in Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Define a debug endpoint to diagnose deployment issues
 @app.get("/api/debug")
 async def debug_info():
@@ -198,52 +464,209 @@ async def debug_info():
     
     return debug_data
 
-# Define RAG statistics endpoint
-@app.get("/api/rag-stats")
-async def get_rag_stats():
+# Profiling endpoints are disabled unless DEBUG_TOKEN is set
+debug_token = env_str("DEBUG_TOKEN", "")
+# Created on first use so profiling code stays out of cold starts
+allocation_tracker = None
+MAX_PROFILE_SECONDS = 60.0
+
+
+def require_debug_token(request: Request) -> None:
+    """Reject the request unless profiling is enabled and the caller sent the debug token."""
+    if not debug_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get("x-debug-token", "")
+    if not secrets.compare_digest(supplied.encode(), debug_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Debug-Token")
+
+
+# Define a sampling profiler endpoint
+@app.get("/api/debug/profile")
+async def profile(request: Request, seconds: float = 5.0, interval_ms: float = 10.0, format: str = "collapsed"):
+    """
+    Sample every thread's stack for `seconds` and return the collapsed stacks.
+
+    The sampler runs in a worker thread, so the event loop keeps serving
+    requests (and shows up in the profile) while it runs. The text output
+    can be fed straight into flamegraph.pl or speedscope.
+    """
+    require_debug_token(request)
+    from .profiling import sample_stacks, collapsed
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    if not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 1 and 1000")
+
+    result = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000)
+    if format == "json":
+        return {
+            "samples": result["samples"],
+            "duration_seconds": round(result["duration"], 3),
+            "stacks": [{"stack": stack, "count": count} for stack, count in result["stacks"].most_common()],
+        }
+    return Response(content=collapsed(result["stacks"]), media_type="text/plain; charset=utf-8")
+
+# Define a memory breakdown endpoint
+@app.get("/api/debug/memory")
+async def memory(request: Request, tracemalloc: Optional[str] = None, top: int = 20):
+    """
+    Report where memory goes: embedding matrix, chunk texts, metadata, stats and caches.
+
+    Pass `tracemalloc=start` to begin tracing allocations (adds overhead) and
+    `tracemalloc=stop` to end it. While tracing, the response includes the top
+    allocation sites and the growth since the previous call.
+    """
+    require_debug_token(request)
+    global allocation_tracker
+    from .profiling import AllocationTracker, memory_breakdown
+    if allocation_tracker is None:
+        allocation_tracker = AllocationTracker()
+    if tracemalloc == "start":
+        allocation_tracker.start()
+    elif tracemalloc == "stop":
+        allocation_tracker.stop()
+    elif tracemalloc is not None:
+        raise HTTPException(status_code=400, detail="tracemalloc must be 'start' or 'stop'")
+
+    vector_store = get_vector_store()
+    components = {
+        "embedding_matrix": vector_store.embeddings,
+        "document_texts": vector_store.documents,
+        "metadata": vector_store.metadata,
+        "rag_statistics": rag_statistics,
+        "single_flight": single_flight,
+    }
+    if semantic_cache is not None:
+        components["semantic_cache"] = semantic_cache
+
+    # Deep sizing walks every object - keep it off the event loop
+    report = await asyncio.to_thread(memory_breakdown, components)
+    report["tracemalloc"] = await asyncio.to_thread(allocation_tracker.report, max(1, min(top, 100)))
+    return report
+
+def build_rag_stats_payload() -> Dict[str, Any]:
     """
-    Returns RAG system statistics including:
+    Build the RAG statistics payload:
     - Vector store information (number of documents, size)
     - Retrieval quality metrics (average relevance scores)
     - Usage patterns (similarity methods, source frequency)
     """
-    try:
-        vector_store = get_vector_store()
-        vector_stats = vector_store.get_stats()
+    vector_store = get_vector_store()
+    vector_stats = vector_store.get_stats()
+    
+    # Get top 5 most frequently retrieved sources
+    top_sources = rag_statistics.top_sources(5)
+    
+    return {
+        # Vector store stats
+        "vector_store": vector_stats,
         
-        # Get top 5 most frequently retrieved sources
-        top_sources = sorted(
-            rag_statistics["source_usage"].items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+        # Retrieval quality
+        "total_queries": rag_statistics.total_queries,
+        "total_documents_retrieved": rag_statistics.total_documents_retrieved,
+        "avg_documents_per_query": (
+            rag_statistics.total_documents_retrieved / rag_statistics.total_queries
+            if rag_statistics.total_queries > 0 else 0
+        ),
+        "avg_relevance_score": round(rag_statistics.avg_relevance_score, 3),
+        "relevance_score_stddev": round(rag_statistics.scores.stddev, 3),
+        "relevance_score_percentiles": rag_statistics.score_percentiles(),
         
-        return {
-            # Vector store stats
-            "vector_store": vector_stats,
-            
-            # Retrieval quality
-            "total_queries": rag_statistics["total_queries"],
-            "total_documents_retrieved": rag_statistics["total_documents_retrieved"],
-            "avg_documents_per_query": (
-                rag_statistics["total_documents_retrieved"] / rag_statistics["total_queries"]
-                if rag_statistics["total_queries"] > 0 else 0
-            ),
-            "avg_relevance_score": round(rag_statistics["avg_relevance_score"], 3),
-            
-            # Usage patterns
-            "similarity_method_usage": dict(rag_statistics["similarity_method_usage"]),
-            "top_sources": [
-                {"source": source, "count": count}
-                for source, count in top_sources
-            ],
-            
-            # Recent activity (last 10 queries)
-            "recent_queries": rag_statistics["queries_over_time"][-10:] if rag_statistics["queries_over_time"] else [],
-        }
+        # Usage patterns
+        "similarity_method_usage": dict(rag_statistics.similarity_method_usage),
+        "top_sources": [
+            {"source": source, "count": count}
+            for source, count in top_sources
+        ],
+        
+        # Recent activity (last 10 queries) and per-minute query counts
+        "recent_queries": list(rag_statistics.recent_queries)[-10:],
+        "queries_over_time": rag_statistics.queries_over_time.series(),
+        
+        # Semantic answer cache effectiveness
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        
+        # Request deduplication
+        "single_flight": single_flight.stats(),
+        
+        # Provider prompt caching (prompt tokens whose prefill was reused)
+        "prompt_cache": prompt_cache_stats.summary(),
+        
+        # Model routing decisions and time to first token per route
+        "model_routing": route_stats.summary() if model_router is not None else None,
+    }
+
+
+def rag_stats_version() -> tuple:
+    """Cheap fingerprint of everything the stats payload is built from."""
+    return (
+        rag_statistics.version,
+        get_vector_store().index_version,
+        semantic_cache.version if semantic_cache is not None else 0,
+        single_flight.version,
+        prompt_cache_stats.version,
+        route_stats.version,
+    )
+
+
+# Pre-serialized stats payload, rebuilt only when the underlying stats change
+rag_stats_snapshot = VersionedSnapshot(build_rag_stats_payload, rag_stats_version)
+rag_stats_push_interval = env_float("RAG_STATS_PUSH_INTERVAL", 2.0)
+
+
+# Define RAG statistics endpoint
+@app.get("/api/rag-stats")
+async def get_rag_stats(request: Request):
+    """
+    Returns RAG system statistics (see build_rag_stats_payload).
+    
+    Serves a cached snapshot with an ETag; clients revalidating with
+    If-None-Match get an empty 304 while nothing has changed.
+    """
+    try:
+        etag, _, body = rag_stats_snapshot.get()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if rag_stats_snapshot.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.get("/api/rag-stats/stream")
+async def stream_rag_stats(request: Request):
+    """
+    Server-Sent Events stream of RAG statistics.
+    
+    Sends a full `snapshot` event first, then a `delta` event with only the
+    changed top-level fields whenever the stats change, plus keep-alive comments.
+    """
+    async def events():
+        last_etag = None
+        last_payload: Dict[str, Any] = {}
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            etag, payload, body = rag_stats_snapshot.get()
+            if etag != last_etag:
+                if last_etag is None:
+                    yield f"event: snapshot\nid: {etag}\ndata: {body.decode()}\n\n"
+                else:
+                    delta = snapshot_delta(last_payload, payload)
+                    yield f"event: delta\nid: {etag}\ndata: {json.dumps(delta)}\n\n"
+                last_etag, last_payload = etag, payload
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= 15:
+                # Keep proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(rag_stats_push_interval)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Entry point for running the application directly
 if __name__ == "__main__":
     import uvicorn
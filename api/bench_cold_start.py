@@ -0,0 +1,170 @@
+"""Cold-start benchmark - import time and time-to-first-response of the API in fresh interpreters.
+
+Usage (from the repository root or api/):
+    python api/bench_cold_start.py
+    python api/bench_cold_start.py --runs 10 --import-budget-ms 800 --first-response-budget-ms 1200
+
+Exits with status 1 when the median exceeds a budget or an ingestion/debug-only
+dependency is imported by `import api.app`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+REPO_ROOT = Path(__file__).parent.parent.absolute()
+
+# Budgets (milliseconds, median over runs); override with flags or env vars
+IMPORT_BUDGET_MS = float(os.getenv("COLD_START_IMPORT_BUDGET_MS", "1500"))
+FIRST_RESPONSE_BUDGET_MS = float(os.getenv("COLD_START_FIRST_RESPONSE_BUDGET_MS", "2500"))
+
+# Needed only for ingestion, web loading, LLM calls or debugging - must load on first use
+LAZY_MODULES = ("pypdf", "trafilatura", "requests", "lxml", "openai", "httpx", "api.profiling")
+
+# Child process: import the app, then serve one request over raw ASGI (no test client imports)
+_FIRST_RESPONSE_SCRIPT = r"""
+import asyncio, json, time
+start = time.perf_counter()
+from api.app import app
+imported = time.perf_counter()
+
+async def first_response():
+    sent = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "path": "/api/health/live", "raw_path": b"/api/health/live", "query_string": b"",
+        "headers": [], "scheme": "http", "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+status = asyncio.run(first_response())
+done = time.perf_counter()
+print(json.dumps({"status": status, "import_ms": (imported - start) * 1000, "request_ms": (done - imported) * 1000}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # The app refuses to import without a key; no request here reaches OpenAI
+    env.setdefault("OPENAI_API_KEY", "sk-cold-start-benchmark")
+    return env
+
+
+def measure_imports() -> Tuple[float, Dict[str, float]]:
+    """
+    Run `python -X importtime -c "import api.app"` once.
+
+    Returns:
+        (cumulative ms for api.app, {module: cumulative ms} for every module imported)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.app"],
+        cwd=REPO_ROOT, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    modules: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative) / 1000
+    return modules.get("api.app", 0.0), modules
+
+
+def measure_first_response() -> Dict[str, float]:
+    """Time interpreter start -> first /api/health/live response in a fresh process."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_RESPONSE_SCRIPT],
+        cwd=REPO_ROOT, env=_child_env(), capture_output=True, text=True, check=True
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    child = json.loads(result.stdout.strip().splitlines()[-1])
+    if child["status"] != 200:
+        raise RuntimeError(f"/api/health/live returned {child['status']}")
+    return {"total_ms": total_ms, "import_ms": child["import_ms"], "request_ms": child["request_ms"]}
+
+
+def run_benchmark(runs: int = 5) -> Dict[str, object]:
+    """Measure imports and first responses `runs` times each and summarize medians."""
+    import_times: List[float] = []
+    modules: Dict[str, float] = {}
+    for _ in range(runs):
+        api_ms, modules = measure_imports()
+        import_times.append(api_ms)
+
+    responses = [measure_first_response() for _ in range(runs)]
+    heaviest = sorted(
+        ((name, ms) for name, ms in modules.items() if "." not in name and name != "api"),
+        key=lambda item: item[1], reverse=True
+    )[:10]
+
+    return {
+        "runs": runs,
+        "import_ms": statistics.median(import_times),
+        "first_response_ms": statistics.median(r["total_ms"] for r in responses),
+        "first_request_ms": statistics.median(r["request_ms"] for r in responses),
+        "heaviest_imports": heaviest,
+        "eager_lazy_modules": sorted(m for m in LAZY_MODULES if m in modules),
+    }
+
+
+def check_budget(
+    report: Dict[str, object],
+    import_budget_ms: float = IMPORT_BUDGET_MS,
+    first_response_budget_ms: float = FIRST_RESPONSE_BUDGET_MS
+) -> List[str]:
+    """Return a list of budget violations (empty when the cold start is within budget)."""
+    failures = []
+    if report["eager_lazy_modules"]:
+        failures.append(f"ingestion/debug-only modules imported at startup: {report['eager_lazy_modules']}")
+    if report["import_ms"] > import_budget_ms:
+        failures.append(f"import api.app took {report['import_ms']:.0f}ms (budget {import_budget_ms:.0f}ms)")
+    if report["first_response_ms"] > first_response_budget_ms:
+        failures.append(
+            f"first response took {report['first_response_ms']:.0f}ms (budget {first_response_budget_ms:.0f}ms)"
+        )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time against a budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-response-budget-ms", type=float, default=FIRST_RESPONSE_BUDGET_MS)
+    args = parser.parse_args()
+
+    print(f"🧊 Measuring cold start ({args.runs} runs)...\n")
+    report = run_benchmark(args.runs)
+
+    print(f"   import api.app:       {report['import_ms']:.0f}ms (budget {args.import_budget_ms:.0f}ms)")
+    print(f"   first response:       {report['first_response_ms']:.0f}ms (budget {args.first_response_budget_ms:.0f}ms)")
+    print(f"   first request itself: {report['first_request_ms']:.1f}ms")
+    print("\n   Heaviest top-level imports (cumulative):")
+    for name, ms in report["heaviest_imports"]:
+        print(f"     {name:<20} {ms:7.1f}ms")
+
+    failures = check_budget(report, args.import_budget_ms, args.first_response_budget_ms)
+    if failures:
+        print("\n❌ Cold-start budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print("\n✅ Cold start within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Offline index build - run the ingestion pipeline as a batch job and write a deployable index.
+
+Usage (from the repository root, with OPENAI_API_KEY set):
+    python -m api.build_index --output index.npz
+    python -m api.build_index --output index.npz --workers 8 --batch-size 200
+    python -m api.build_index --output index.npz --fresh    # ignore an earlier build
+
+The output file doubles as the checkpoint: it is rewritten every
+--checkpoint-every seconds and when the run is interrupted, and a re-run
+loads it and only parses and embeds sources that are missing or changed.
+An interrupted build therefore resumes without re-embedding finished sources
+(a source cut off halfway is redone). Serve the result with
+INDEX_ARTIFACT_PATH=index.npz; the server then only indexes what changed since.
+
+Exits with status 1 when a source failed to index.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def _configure(args: argparse.Namespace) -> None:
+    """Worker settings are read from the environment when the ingestion module is imported."""
+    if args.workers is not None:
+        os.environ["INGEST_WORKERS"] = str(args.workers)
+    if args.batch_size is not None:
+        os.environ["INGEST_EMBED_BATCH_SIZE"] = str(args.batch_size)
+    if args.web_connections is not None:
+        os.environ["WEB_MAX_CONNECTIONS"] = str(args.web_connections)
+    # The build loads its own checkpoint (or deliberately not, with --fresh)
+    os.environ["INDEX_ARTIFACT_PATH"] = ""
+
+
+async def _checkpoint_periodically(ingest, path: str, interval: float, timings: List[float]) -> None:
+    saved_version = ingest.vector_store.index_version
+    while True:
+        await asyncio.sleep(interval)
+        if ingest.vector_store.index_version != saved_version:
+            saved_version = ingest.vector_store.index_version
+            _checkpoint(ingest, path, timings)
+
+
+def _checkpoint(ingest, path: str, timings: List[float], complete: bool = False) -> None:
+    # Synchronous on purpose: no indexing step can run while the store and manifest are captured
+    started = time.perf_counter()
+    ingest.save_index(path, complete=complete)
+    timings.append(time.perf_counter() - started)
+    print(f"💾 {'Index' if complete else 'Checkpoint'} written: {len(ingest.vector_store.documents)} chunks")
+
+
+def _throughput_report(ingest, elapsed: float, checkpoints: List[float]) -> List[Tuple[str, str]]:
+    """One (stage, description) row per ingestion stage, from the ingestion metrics."""
+    from .metrics import INGEST_STAGE_SECONDS
+
+    summary = ingest.progress.summary()
+    indexed = [s for s in summary["sources"] if s["status"] == "done"]
+    chunks: Dict[str, int] = {"local_file": 0, "web": 0}
+    for source in indexed:
+        chunks[source["source_type"]] += source["chunks"]
+    embedded = sum(s["chunks"] - s["duplicates"] for s in indexed)
+
+    def stage(name: str) -> Tuple[int, float]:
+        child = INGEST_STAGE_SECONDS.labels(name)
+        return child.count, child.sum
+
+    def rate(count: float, seconds: float) -> str:
+        return f"{count / seconds:.1f}/s" if seconds > 0 else "-"
+
+    parsed, parse_seconds = stage("parse")
+    parse_seconds += stage("chunking")[1]
+    fetched, fetch_seconds = stage("web_fetch")
+    batches, embed_seconds = stage("embedding")
+    return [
+        ("parse + split", f"{parsed} files, {chunks['local_file']} chunks in {parse_seconds:.2f}s "
+                          f"({rate(chunks['local_file'], parse_seconds)} chunks)"),
+        ("web fetch", f"{fetched} pages, {chunks['web']} chunks in {fetch_seconds:.2f}s "
+                      f"({rate(fetched, fetch_seconds)} pages)"),
+        ("embed + index", f"{embedded} chunks in {batches} batches, {embed_seconds:.2f}s "
+                          f"({rate(embedded, embed_seconds)} chunks)"),
+        ("checkpoint", f"{len(checkpoints)} writes, {sum(checkpoints):.2f}s"),
+        ("total", f"{chunks['local_file'] + chunks['web']} chunks in {elapsed:.2f}s "
+                  f"({rate(chunks['local_file'] + chunks['web'], elapsed)} chunks), "
+                  f"{summary['duplicates_collapsed']} near-duplicates collapsed"),
+    ]
+
+
+async def build(args: argparse.Namespace) -> int:
+    _configure(args)
+    from . import ingest
+    from .pipeline import default_workers
+
+    if args.data_dir:
+        ingest.DATA_DIR = Path(args.data_dir).absolute()
+    if args.config_dir:
+        ingest.CONFIG_DIR = Path(args.config_dir).absolute()
+    output = str(Path(args.output).absolute())
+
+    print(f"🏗️  Building index {output} ({default_workers()} parse workers, "
+          f"{ingest.EMBED_BATCH_SIZE} chunks per embedding request)")
+    if not args.fresh and os.path.exists(output):
+        await ingest.load_index(output)
+
+    checkpoints: List[float] = []
+    started = time.perf_counter()
+    checkpointer = asyncio.create_task(
+        _checkpoint_periodically(ingest, output, args.checkpoint_every, checkpoints)
+    )
+    finished = False
+    try:
+        await ingest.load_documents_from_data_folder(full=args.fresh)
+        finished = True
+    finally:
+        checkpointer.cancel()
+        summary = ingest.progress.summary()
+        # On interruption too, so the next run resumes from here
+        _checkpoint(ingest, output, checkpoints, complete=finished and not summary["sources_failed"])
+    elapsed = time.perf_counter() - started
+
+    print("\n📊 Throughput:")
+    for name, description in _throughput_report(ingest, elapsed, checkpoints):
+        print(f"   {name:<14} {description}")
+    if summary["sources_failed"]:
+        failed = [s["source"] for s in summary["sources"] if s["status"] == "failed"]
+        print(f"\n❌ {len(failed)} source(s) failed (re-run to retry): {', '.join(failed)}")
+        return 1
+    print(f"\n✅ Index ready: {output} ({os.path.getsize(output) / (1024 * 1024):.1f} MB)")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build a deployable vector index from api/data and web sources.")
+    parser.add_argument("--output", "-o", default="index.npz", help="Index artifact (and checkpoint) path")
+    parser.add_argument("--workers", type=int, default=None, help="Parse worker processes (default: INGEST_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding request")
+    parser.add_argument("--web-connections", type=int, default=None, help="Concurrent web fetches")
+    parser.add_argument("--data-dir", default=None, help="Documents folder (default: api/data)")
+    parser.add_argument("--config-dir", default=None, help="Folder with web_sources.json (default: api/config)")
+    parser.add_argument("--checkpoint-every", type=float, default=30.0, help="Seconds between checkpoints")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an existing artifact and rebuild everything")
+    args = parser.parse_args()
+    try:
+        return asyncio.run(build(args))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted - re-run the same command to resume")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Shared OpenAI clients - one pooled set of connections per process."""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .settings import env_float, env_int
+
+if TYPE_CHECKING:
+    # openai and httpx are imported when the clients are first created, keeping cold starts fast
+    import httpx
+
+
+@dataclass
+class ClientSettings:
+    """Connection pool limits and timeouts for the OpenAI HTTP clients."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    write_timeout: float = 10.0
+    pool_timeout: float = 10.0
+    max_retries: int = 2
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        """Build settings from OPENAI_* environment variables."""
+        return cls(
+            max_connections=env_int("OPENAI_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=env_int("OPENAI_MAX_KEEPALIVE_CONNECTIONS", cls.max_keepalive_connections),
+            keepalive_expiry=env_float("OPENAI_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            connect_timeout=env_float("OPENAI_CONNECT_TIMEOUT", cls.connect_timeout),
+            read_timeout=env_float("OPENAI_READ_TIMEOUT", cls.read_timeout),
+            write_timeout=env_float("OPENAI_WRITE_TIMEOUT", cls.write_timeout),
+            pool_timeout=env_float("OPENAI_POOL_TIMEOUT", cls.pool_timeout),
+            max_retries=env_int("OPENAI_MAX_RETRIES", cls.max_retries),
+        )
+
+    def limits(self) -> "httpx.Limits":
+        import httpx
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> "httpx.Timeout":
+        import httpx
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+class OpenAIClients:
+    """
+    Process-wide OpenAI client backed by a keep-alive connection pool.
+
+    Creating a client per request means a new pool and a TLS handshake every
+    time; sharing these keeps warm connections around for chat and embeddings.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, settings: Optional[ClientSettings] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY must be provided as parameter or set as environment variable")
+
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        self.settings = settings or ClientSettings.from_env()
+        limits = self.settings.limits()
+        timeout = self.settings.timeout()
+
+        self.async_client = AsyncOpenAI(
+            api_key=self.api_key,
+            timeout=timeout,
+            max_retries=self.settings.max_retries,
+            http_client=DefaultAsyncHttpxClient(limits=limits, timeout=timeout),
+        )
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Active and idle connections in the async client's pool (best effort)."""
+        try:
+            transport = self.async_client._client._transport
+            connections = list(transport._pool.connections)
+        except AttributeError:
+            return {"active": 0, "idle": 0}
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"active": len(connections) - idle, "idle": idle}
+
+    async def aclose(self) -> None:
+        """Close the client and release its pooled connections."""
+        await self.async_client.close()
+
+
+_clients: Optional[OpenAIClients] = None
+_clients_lock = threading.Lock()
+
+
+def init_clients(api_key: Optional[str] = None, settings: Optional[ClientSettings] = None) -> OpenAIClients:
+    """Create the shared clients (warmed up in a worker thread from the app lifespan)."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = OpenAIClients(api_key=api_key, settings=settings)
+    return _clients
+
+
+def get_clients() -> OpenAIClients:
+    """Get the shared clients, creating them on first use outside the app lifespan."""
+    return _clients or init_clients()
+
+
+def current_clients() -> Optional[OpenAIClients]:
+    """The shared clients if they were created, without creating them."""
+    return _clients
+
+
+async def close_clients() -> None:
+    """Close the shared clients on shutdown."""
+    global _clients
+    if _clients is not None:
+        await _clients.aclose()
+        _clients = None
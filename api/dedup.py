@@ -0,0 +1,135 @@
+"""Near-duplicate detection - MinHash signatures with LSH banding, to collapse repeated passages."""
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+Chunk = Tuple[str, Dict[str, Any]]  # (chunk text, metadata)
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """32-bit hashes of the text's overlapping word `size`-grams (case and punctuation ignored)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+class MinHashLSH:
+    """
+    Finds near-duplicate texts in roughly linear time.
+
+    Each text gets a MinHash signature of `num_perm` values; the fraction of
+    equal values between two signatures estimates the Jaccard similarity of
+    their shingle sets. Signatures are cut into `bands` bands and indexed by
+    band, so only texts sharing at least one whole band are compared; a
+    pair with Jaccard similarity s becomes a candidate with probability
+    1 - (1 - s^rows)^bands. With the defaults (64 permutations, 16 bands of
+    4) that is ~99% at 0.7 and >99.9% at 0.8, but only ~64% at 0.5, so
+    thresholds below ~0.7 need more bands. Candidates are then checked
+    against `threshold`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Universal hashing (a*x + b) mod p; a, b < 2^32 so nothing overflows uint64
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """The most similar indexed key at or above the threshold, with its estimated similarity."""
+        candidates: Set[str] = set()
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band, ()))
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        self.remove(key)
+        self._signatures[key] = signature
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band]
+
+    def retain(self, keys: Set[str]) -> None:
+        """Forget every key not in `keys` (e.g. chunks no longer in the index)."""
+        for key in [key for key in self._signatures if key not in keys]:
+            self.remove(key)
+
+    def clear(self) -> None:
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+
+    def collapse(self, chunks: List[Chunk]) -> Tuple[List[Chunk], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Split chunks into ones to store and near-duplicates of already indexed ones.
+
+        Chunks are keyed by metadata["chunk_uid"]; each unique chunk is
+        indexed so later chunks (in this batch too) can match it.
+
+        Returns:
+            (unique chunks, {chunk_uid of the kept chunk: [metadata of its duplicates]})
+        """
+        unique: List[Chunk] = []
+        duplicates: Dict[str, List[Dict[str, Any]]] = {}
+        for text, metadata in chunks:
+            signature = self.signature(text)
+            match = self.query(signature)
+            if match is None:
+                self.insert(metadata["chunk_uid"], signature)
+                unique.append((text, metadata))
+            else:
+                duplicates.setdefault(match[0], []).append(metadata)
+        return unique, duplicates
@@ -0,0 +1,52 @@
+"""On-disk cache storage - entry files sharded by key prefix, shared by the parse and HTTP caches."""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+class DiskCache:
+    """
+    Base for caches that keep one file per key under `directory`/<key[:2]>/.
+
+    Write failures (e.g. a read-only filesystem) disable writes with a single
+    warning: a cache must never fail the work it is there to speed up.
+    """
+    suffix = ""
+    label = "Cache"
+
+    def __init__(self, directory: Optional[str], default_directory: Path):
+        self.directory = Path(directory) if directory else default_directory
+        self._writable = True
+
+    def _key_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{self.suffix}"
+
+    def _write_failed(self, error: OSError) -> None:
+        if self._writable:
+            print(f"⚠️  {self.label} not writable ({error}); continuing without it")
+        self._writable = False
+
+    def _entries(self) -> Iterator[Path]:
+        if self.directory.exists():
+            yield from self.directory.glob(f"*/*{self.suffix}")
+
+    def clear(self) -> int:
+        """Delete every cache entry; returns how many were removed."""
+        removed = 0
+        for entry in list(self._entries()):
+            try:
+                entry.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        entries = list(self._entries())
+        size = sum(entry.stat().st_size for entry in entries)
+        return {
+            "directory": str(self.directory),
+            "entries": len(entries),
+            "size_mb": round(size / (1024 * 1024), 3),
+            "writable": self._writable,
+        }
@@ -1,17 +1,34 @@
 import os
 import asyncio
-from typing import Optional
-from openai import AsyncOpenAI
+from typing import TYPE_CHECKING, Optional
+
+from .clients import get_clients
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 class EmbeddingModel: 
-    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        api_key: Optional[str] = None,
+        client: Optional["AsyncOpenAI"] = None
+    ):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY must be provided as parameter or set as environment variable")
         
         self.model = model
         
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        # Explicit credentials get a dedicated client; otherwise share the process-wide pool
+        if client is None and api_key is not None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=api_key)
+        self._client = client
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        return self._client or get_clients().async_client
 
     async def get_embedding(self, text: str) -> list[float]:
         if not text or not text.strip():
@@ -0,0 +1,75 @@
+"""HTTP cache - fetched web pages on disk with their validators, for conditional requests."""
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .disk_cache import DiskCache
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.absolute() / ".http_cache"
+
+
+@dataclass
+class CachedResponse:
+    """A page body as last fetched, with the validators the server sent for it."""
+    url: str
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified instead of resending the page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache(DiskCache):
+    """
+    One gzip-compressed JSON file per URL, keyed by SHA-256 of the URL.
+
+    Entries are replaced atomically; see DiskCache for write failures.
+    """
+    suffix = ".json.gz"
+    label = "HTTP cache"
+
+    def __init__(self, directory: Optional[str] = None):
+        super().__init__(directory, DEFAULT_CACHE_DIR)
+        self.revalidated = 0
+
+    def _entry_path(self, url: str) -> Path:
+        return self._key_path(hashlib.sha256(url.encode()).hexdigest())
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        try:
+            with gzip.open(self._entry_path(url), "rt", encoding="utf-8") as f:
+                return CachedResponse(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store a freshly fetched page with its validators."""
+        if not self._writable:
+            return
+        response = CachedResponse(url, body, etag, last_modified, datetime.now().isoformat())
+        path = self._entry_path(url)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(asdict(response), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self._write_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "revalidated": self.revalidated}
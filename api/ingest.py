@@ -1,15 +1,34 @@
 """Document ingestion - loads local files and web articles."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from datetime import datetime
 from pathlib import Path
+import asyncio
+import hashlib
 import json
 import os
+import secrets
+import time
+import uuid
 
-from .loaders import TextFileLoader, CharacterTextSplitter
+from .loaders import BoundaryTextSplitter, CharacterTextSplitter, LOADER_VERSION
+from .dedup import MinHashLSH
+from .http_cache import HttpCache
+from .manifest import FileRecord, SourceManifest, UrlRecord
+from .parse_cache import ParseCache, file_digest
+from .pipeline import (
+    SUPPORTED_EXTENSIONS, Chunk, create_parse_executor, default_workers, discover_files, stream_file_chunks
+)
+from .settings import env_bool, env_float, env_int, env_str
 from .vector_store import VectorStore
-from .web_loader import load_articles_from_urls
+from .metrics import INGEST_STAGE_SECONDS, WEB_REFRESH_PAGES
+from .tokens import estimate_tokens
 
 
 # Get absolute path to the api directory
@@ -17,9 +36,144 @@ API_DIR = Path(__file__).parent.absolute()
 DATA_DIR = API_DIR / "data"
 CONFIG_DIR = API_DIR / "config"
 
+# "boundary" chunks end on sentence/paragraph breaks and are sized in tokens;
+# "character" is the original fixed-size character splitter (CHUNK_SIZE/CHUNK_OVERLAP)
+INGEST_SPLITTER = env_str("INGEST_SPLITTER", "boundary").lower()
+CHUNK_TOKENS = env_int("CHUNK_TOKENS", 256)
+CHUNK_OVERLAP_TOKENS = env_int("CHUNK_OVERLAP_TOKENS", 32)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Pages per parse task, chunks per embedding request, and batches buffered between the two
+PAGE_WINDOW = env_int("INGEST_PAGE_WINDOW", 8)
+EMBED_BATCH_SIZE = env_int("INGEST_EMBED_BATCH_SIZE", 100)
+EMBED_QUEUE_SIZE = 4
+# Web fetching: connections across all hosts, concurrent requests per host, timeouts (seconds)
+WEB_MAX_CONNECTIONS = env_int("WEB_MAX_CONNECTIONS", 16)
+WEB_MAX_PER_HOST = env_int("WEB_MAX_PER_HOST", 2)
+WEB_FETCH_TIMEOUT = env_float("WEB_FETCH_TIMEOUT", 10.0)
+WEB_TOTAL_TIMEOUT = env_float("WEB_TOTAL_TIMEOUT", 120.0)
+# Uploads are streamed to disk a block at a time and capped in size; the endpoint
+# is disabled unless UPLOAD_TOKEN is set (callers send it as X-Upload-Token)
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+UPLOAD_MAX_BYTES = env_int("UPLOAD_MAX_MB", 100) * 1024 * 1024
+UPLOAD_TOKEN = env_str("UPLOAD_TOKEN", "")
+MAX_UPLOAD_JOBS = 100
+# Seconds between background revalidations of indexed web articles (0 disables)
+WEB_REFRESH_INTERVAL = env_float("WEB_REFRESH_INTERVAL", 6 * 3600.0)
+# Prebuilt index (python -m api.build_index) loaded on startup; only sources changed since are indexed
+INDEX_ARTIFACT_PATH = env_str("INDEX_ARTIFACT_PATH", "")
+
+
+@dataclass
+class SourceProgress:
+    """Ingestion state of one local file or web article."""
+    source: str
+    source_type: str  # local_file or web
+    status: str = "pending"  # pending, parsing, embedding, done, failed, unchanged
+    chunks: int = 0
+    duplicates: int = 0  # chunks collapsed into near-identical ones already indexed
+    error: Optional[str] = None
+    seconds: Optional[float] = None
+
+
+class IngestionProgress:
+    """Per-source progress of the current ingestion run."""
+
+    def __init__(self):
+        self.sources: Dict[str, SourceProgress] = {}
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.interrupted = False
+        self.changes: Dict[str, int] = {}
+
+    def begin(self, sources: List[SourceProgress], changes: Optional[Dict[str, int]] = None) -> None:
+        self.sources = {s.source: s for s in sources}
+        self.changes = changes or {}
+        self.running = True
+        self.started_at = time.time()
+        self.finished_at = None
+        self.interrupted = False
+
+    def finish(self, interrupted: bool = False) -> None:
+        """End the run; an interrupted run (cancelled or crashed) never counts as complete."""
+        self.running = False
+        self.finished_at = time.time()
+        self.interrupted = interrupted
+
+    def update(self, source: str, status: str, **fields: Any) -> None:
+        entry = self.sources[source]
+        entry.status = status
+        for name, value in fields.items():
+            setattr(entry, name, value)
+
+    @property
+    def complete(self) -> bool:
+        """True once every source has been indexed, skipped as unchanged, or has failed."""
+        return self.finished_at is not None and not self.running and not self.interrupted
+
+    def summary(self) -> Dict[str, Any]:
+        statuses = [s.status for s in self.sources.values()]
+        end = self.finished_at or time.time()
+        return {
+            "running": self.running,
+            "complete": self.complete,
+            "sources_total": len(statuses),
+            "sources_done": statuses.count("done"),
+            "sources_failed": statuses.count("failed"),
+            "sources_unchanged": statuses.count("unchanged"),
+            "changes": self.changes,
+            "chunks_indexed": sum(s.chunks for s in self.sources.values()),
+            "duplicates_collapsed": sum(s.duplicates for s in self.sources.values()),
+            "elapsed_seconds": round(end - self.started_at, 2) if self.started_at else None,
+            "sources": [asdict(s) for s in self.sources.values()],
+        }
+
+
+@dataclass
+class UploadJob:
+    """An uploaded file waiting to be, or being, indexed."""
+    job_id: str
+    filename: str
+    size_bytes: int
+    entry: SourceProgress
+    created_at: float
+
+    def summary(self) -> Dict[str, Any]:
+        return {"job_id": self.job_id, "filename": self.filename, "size_bytes": self.size_bytes, **asdict(self.entry)}
+
 
 vector_store = VectorStore()
+# None selects the fixed-size character splitter
+text_splitter: Optional[BoundaryTextSplitter] = (
+    BoundaryTextSplitter(CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, length_function=estimate_tokens)
+    if INGEST_SPLITTER == "boundary" else None
+)
+# Extracted PDF page texts survive restarts, so unchanged files skip parsing
+parse_cache: Optional[ParseCache] = (
+    ParseCache(env_str("PARSE_CACHE_DIR", "") or None, loader_version=LOADER_VERSION)
+    if env_bool("PARSE_CACHE_ENABLED", True) else None
+)
+# What is in the index, so reloads only re-process added or changed sources
+manifest = SourceManifest()
+# Near-duplicate chunks (passages repeated across manuals) are stored and embedded once
+dedup: Optional[MinHashLSH] = (
+    MinHashLSH(threshold=env_float("DEDUP_THRESHOLD", 0.7)) if env_bool("DEDUP_ENABLED", True) else None
+)
+_dedup_lock = asyncio.Lock()
+# Fetched web pages with their ETag/Last-Modified, so refreshes can be conditional
+http_cache: Optional[HttpCache] = (
+    HttpCache(env_str("HTTP_CACHE_DIR", "") or None) if env_bool("HTTP_CACHE_ENABLED", True) else None
+)
+# Serializes ingestion runs and web refreshes (both update the manifest)
+_index_lock = asyncio.Lock()
 _ingestion_complete = False
+_ingestion_task: Optional[asyncio.Task] = None
+_refresh_task: Optional[asyncio.Task] = None
+# Most recent uploads by job id (oldest dropped beyond MAX_UPLOAD_JOBS)
+upload_jobs: "OrderedDict[str, UploadJob]" = OrderedDict()
+_upload_tasks: set = set()
+progress = IngestionProgress()
 
 router = APIRouter(prefix="/api/ingest", tags=["Document Ingestion"])
 
@@ -31,128 +185,603 @@ class StatsResponse(BaseModel):
     ingestion_complete: bool
 
 
-async def load_documents_from_data_folder():
-    """Load all documents from data/ folder and web sources at startup."""
-    global _ingestion_complete
-    
-    if _ingestion_complete:
+def _read_web_sources() -> List[str]:
+    """URLs listed in config/web_sources.json (empty if there is no config)."""
+    config_path = CONFIG_DIR / "web_sources.json"
+    print(f"   CONFIG_DIR: {CONFIG_DIR}")
+    print(f"   Config file exists: {config_path.exists()}")
+    if not config_path.exists():
+        print("ℹ️  No web sources config found (config/web_sources.json)")
+        return []
+    try:
+        with open(config_path, 'r') as f:
+            urls = json.load(f).get('urls', [])
+    except Exception as e:
+        print(f"⚠️  Warning: Could not read web sources config: {e}")
+        return []
+    if not urls:
+        print("ℹ️  No URLs configured in web_sources.json")
+    return urls
+
+
+async def _store_chunks(source: str, chunks: List[Chunk]) -> int:
+    """
+    Embed chunks and append them to the searchable store, collapsing near-duplicates.
+
+    A chunk that near-duplicates one already indexed is not embedded; its
+    metadata is recorded on that chunk (metadata["duplicates"]) instead.
+    Collapsing, embedding and attaching share one hold of the dedup lock:
+    local files and web articles are stored concurrently, and a chunk
+    collapsed onto one that is still being embedded would be attached to
+    nothing and lost.
+
+    Returns:
+        Number of chunks collapsed
+    """
+    async with _dedup_guard():
+        unique, duplicates = await _collapse(chunks)
+        if unique:
+            progress.update(source, "embedding")
+            try:
+                with INGEST_STAGE_SECONDS.labels("embedding").time():
+                    await vector_store.add_documents([text for text, _ in unique], [meta for _, meta in unique])
+            except Exception:
+                # Chunks that were never stored must not swallow their next attempt as "duplicates"
+                if dedup is not None:
+                    for _, meta in unique:
+                        dedup.remove(meta["chunk_uid"])
+                raise
+        return vector_store.attach_duplicates(duplicates) if duplicates else 0
+
+
+def _dedup_guard():
+    """The dedup lock, or a no-op when near-duplicate collapsing is disabled."""
+    return _dedup_lock if dedup is not None else nullcontext()
+
+
+async def _collapse(
+    chunks: List[Chunk], replacing: Optional[str] = None
+) -> Tuple[List[Chunk], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Split chunks into ones to store and near-duplicates of indexed ones (see MinHashLSH.collapse).
+
+    Call under the dedup lock, and store the unique chunks before releasing
+    it. With `replacing`, that source's stored chunks are left out of the
+    comparison: they are about to be swapped for `chunks`.
+    """
+    if dedup is None:
+        return chunks, {}
+    if replacing is not None:
+        for meta in vector_store.metadata:
+            if meta.get("source_id") == replacing:
+                dedup.remove(meta["chunk_uid"])
+    return await asyncio.to_thread(dedup.collapse, chunks)
+
+
+async def _remove_source(source: str) -> int:
+    """Drop a source's chunks from the store and forget them in the duplicate index."""
+    if dedup is None:
+        return vector_store.remove_source(source)
+    # Not while another source is collapsing onto chunks this removal may drop
+    async with _dedup_lock:
+        removed = vector_store.remove_source(source)
+        # Also when nothing was stored: an interrupted load may have left signatures behind
+        await asyncio.to_thread(_sync_dedup_signatures)
+    return removed
+
+
+async def _sync_dedup() -> None:
+    """Make the duplicate index match the store: forget removed chunks, re-add stored ones it lacks."""
+    async with _dedup_lock:
+        await asyncio.to_thread(_sync_dedup_signatures)
+
+
+def _sync_dedup_signatures() -> None:
+    stored = dict(zip((meta["chunk_uid"] for meta in vector_store.metadata), vector_store.documents))
+    dedup.retain(set(stored))
+    for uid, text in stored.items():
+        if uid not in dedup:
+            dedup.insert(uid, dedup.signature(text))
+
+
+async def _index_chunks(source: str, chunks: List[str], metadata: List[Dict[str, Any]], started: float) -> None:
+    """Embed one source's chunks and append them to the searchable store."""
+    duplicates = await _store_chunks(source, list(zip(chunks, metadata))) if chunks else 0
+    progress.update(
+        source, "done", chunks=len(chunks), duplicates=duplicates, seconds=round(time.perf_counter() - started, 2)
+    )
+
+
+async def _index_local_files(files: List[Path], records: Dict[str, FileRecord], executor: Executor) -> None:
+    """
+    Stream local files through parse -> chunk -> embed with the stages overlapped.
+
+    A producer task parses page windows in the worker pool and cuts chunks
+    into embedding batches; this coroutine consumes the batches and appends
+    each one to the vector store as soon as it is embedded. The bounded
+    queue keeps the parser at most a few batches ahead of the embedding API.
+    A file enters the manifest only once all of its chunks are indexed.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EMBED_QUEUE_SIZE)
+    lookahead = max(2, 2 * default_workers())
+    started: Dict[str, float] = {}
+
+    async def produce() -> None:
+        try:
+            for file in files:
+                source = str(file)
+                started[source] = time.perf_counter()
+                progress.update(source, "parsing")
+                batch: List[Chunk] = []
+                # Parse and split time only: waits on the queue are embedding backpressure
+                stage_seconds: Dict[str, float] = {}
+                try:
+                    async for chunk in stream_file_chunks(
+                        file, executor, CHUNK_SIZE, CHUNK_OVERLAP,
+                        window=PAGE_WINDOW, lookahead=lookahead, cache=parse_cache, splitter=text_splitter,
+                        stage_seconds=stage_seconds
+                    ):
+                        batch.append(chunk)
+                        if len(batch) >= EMBED_BATCH_SIZE:
+                            await queue.put((source, batch, False, None))
+                            batch = []
+                    for stage, seconds in stage_seconds.items():
+                        INGEST_STAGE_SECONDS.labels(stage).observe(seconds)
+                    await queue.put((source, batch, True, None))
+                except Exception as e:
+                    await queue.put((source, [], True, e))
+        except Exception as e:
+            print(f"❌ Local file ingestion stopped: {e}")
+        # End of stream (not sent on cancellation - nobody is consuming then)
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            source, batch, last, error = item
+            entry = progress.sources[source]
+            if entry.status == "failed":
+                continue
+            name = Path(source).name
+            try:
+                if error is not None:
+                    raise error
+                if batch:
+                    entry.duplicates += await _store_chunks(source, batch)
+                    entry.chunks += len(batch)
+                if last:
+                    records[source].chunks = entry.chunks
+                    manifest.record_file(records[source])
+                    progress.update(source, "done", seconds=round(time.perf_counter() - started[source], 2))
+                    print(f"✅ Indexed {name}: {entry.chunks} chunks ({entry.duplicates} duplicates collapsed)")
+            except Exception as e:
+                # Drop the chunks already appended so the next reload retries the file cleanly
+                await _remove_source(source)
+                progress.update(source, "failed", error=str(e))
+                print(f"❌ Error loading {name}: {e}")
+    finally:
+        producer.cancel()
+
+
+def _web_chunks(url: str, web_docs: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Split a fetched article into chunks with per-chunk metadata."""
+    splitter = text_splitter or CharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    # chunk_uids name the article version: a refreshed chunk never reuses the uid of one
+    # still stored as the representative of another source's duplicates
+    version = _content_hash(web_docs)[:12]
+    chunks, metadata = [], []
+    for web_doc in web_docs:
+        doc_chunks = splitter.split_text(web_doc['text'])
+        chunks.extend(doc_chunks)
+        metadata.extend(
+            {
+                **web_doc['metadata'],
+                'source_id': url,
+                'chunk_uid': f"{url}@{version}#{i}",
+                'chunk_index': i,
+                'total_chunks': len(doc_chunks)
+            }
+            for i in range(len(doc_chunks))
+        )
+    return chunks, metadata
+
+
+def _content_hash(web_docs: List[Dict[str, Any]]) -> str:
+    """Hash of an article's extracted text (not its HTML, which changes with every ad)."""
+    return hashlib.sha256("\n".join(doc['text'] for doc in web_docs).encode()).hexdigest()
+
+
+def _web_loader(executor: Executor, skip_unmodified: bool = False):
+    """A concurrent web loader configured from the WEB_* settings."""
+    # httpx/trafilatura are ingestion-only - keep them out of cold starts
+    from .web_loader import AsyncWebLoader
+    return AsyncWebLoader(
+        max_connections=WEB_MAX_CONNECTIONS,
+        per_host=WEB_MAX_PER_HOST,
+        timeout=WEB_FETCH_TIMEOUT,
+        total_timeout=WEB_TOTAL_TIMEOUT,
+        executor=executor,
+        http_cache=http_cache,
+        skip_unmodified=skip_unmodified
+    )
+
+
+async def _index_web_articles(urls: List[str], executor: Executor) -> None:
+    """
+    Fetch web articles concurrently and index each one as soon as it arrives.
+
+    HTML extraction runs in the parse executor, so pages are extracted in
+    parallel and the event loop stays free for requests.
+    """
+    if not urls:
         return
+    loader = _web_loader(executor)
+    for url in urls:
+        progress.update(url, "parsing")
+    print(f"🌐 Fetching {len(urls)} web article(s)...")
+    async for result in loader.iter_urls(urls):
+        url = result.url
+        try:
+            INGEST_STAGE_SECONDS.labels("web_fetch").observe(result.seconds)
+            if result.error:
+                raise RuntimeError(result.error)
+            if not result.documents:
+                raise RuntimeError("no content extracted")
+            chunks, metadata = _web_chunks(url, result.documents)
+            await _index_chunks(url, chunks, metadata, time.perf_counter() - result.seconds)
+            manifest.record_url(UrlRecord(url, datetime.now().isoformat(), _content_hash(result.documents), len(chunks)))
+            print(f"✅ Indexed {url}: {len(chunks)} chunks")
+        except Exception as e:
+            progress.update(url, "failed", error=str(e))
+            print(f"⚠️  Warning: Could not load web article {url}: {e}")
+
+
+def _chunking_config() -> Dict[str, Any]:
+    """Settings that decide what the stored chunks are; an index built with others is not reused."""
+    if text_splitter is None:
+        splitter = {"splitter": "character", "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+    else:
+        splitter = {
+            "splitter": "boundary",
+            "chunk_size": text_splitter.chunk_size,
+            "chunk_overlap": text_splitter.chunk_overlap
+        }
+    dedup_threshold = dedup.threshold if dedup is not None else None
+    return {**splitter, "loader_version": LOADER_VERSION, "dedup_threshold": dedup_threshold}
+
+
+def save_index(path: str, complete: bool = True) -> None:
+    """
+    Write the index with its manifest to a deployable artifact (see VectorStore.save).
+
+    Call from the event loop: the store and manifest are captured together,
+    between two indexing steps, so every source the manifest lists is fully
+    stored. `complete` is False for checkpoints of an unfinished build.
+    """
+    vector_store.save(path, {
+        "manifest": manifest.to_dict(),
+        "data_dir": str(DATA_DIR),
+        "chunking": _chunking_config(),
+        "complete": complete,
+        "saved_at": datetime.now().isoformat(),
+    })
+
+
+def _relocated(value: Any, old_dir: str, new_dir: str) -> Any:
+    if isinstance(value, str) and value.startswith(old_dir + os.sep):
+        return new_dir + value[len(old_dir):]
+    return value
+
+
+def _relocate_metadata(meta: Dict[str, Any], old_dir: str, new_dir: str) -> Dict[str, Any]:
+    meta = {
+        **meta,
+        **{key: _relocated(meta[key], old_dir, new_dir) for key in ("source", "source_id", "chunk_uid") if key in meta}
+    }
+    if meta.get("duplicates"):
+        meta["duplicates"] = [_relocate_metadata(dup, old_dir, new_dir) for dup in meta["duplicates"]]
+    return meta
+
+
+async def load_index(path: str) -> bool:
+    """
+    Replace the index and manifest with an artifact written by save_index.
+
+    The next sync then only indexes sources added or changed since the
+    artifact was built. File paths under the data directory it was built
+    from are mapped onto DATA_DIR, so it can be built on another machine.
+
+    Returns:
+        False (and an empty index) if the artifact is missing, unreadable, or
+        was built with another embedding model or chunking settings
+    """
+    if not os.path.exists(path):
+        print(f"ℹ️  No index artifact at {path}")
+        return False
+    try:
+        extra = await asyncio.to_thread(vector_store.load, path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Ignoring index artifact {path}: {e}")
+        vector_store.clear()
+        return False
+    if extra.get("chunking") != _chunking_config():
+        print(f"⚠️  Ignoring index artifact {path}: built with chunking {extra.get('chunking')}")
+        vector_store.clear()
+        return False
+
+    data = extra.get("manifest", {})
+    old_dir, new_dir = extra.get("data_dir"), str(DATA_DIR)
+    if old_dir and old_dir != new_dir:
+        vector_store.map_metadata(lambda meta: _relocate_metadata(meta, old_dir, new_dir))
+        files = [{**record, "path": _relocated(record["path"], old_dir, new_dir)} for record in data.get("files", [])]
+        data = {**data, "files": files}
+    loaded = SourceManifest.from_dict(data)
+    manifest.files, manifest.urls = loaded.files, loaded.urls
+    if dedup is not None:
+        async with _dedup_lock:
+            await asyncio.to_thread(_rebuild_dedup)
+    print(f"📦 Loaded index artifact {path}: {len(vector_store.documents)} chunks, "
+          f"{len(manifest.files)} files, {len(manifest.urls)} URLs (saved {extra.get('saved_at')})")
+    return True
+
+
+def _rebuild_dedup() -> None:
+    dedup.clear()
+    _sync_dedup_signatures()
+
+
+async def _sync_sources(full: bool) -> None:
+    """Diff the data folder and web sources against the manifest and index the differences."""
+    if full:
+        vector_store.clear()
+        manifest.clear()
+        if dedup is not None:
+            dedup.clear()
+    elif INDEX_ARTIFACT_PATH and not vector_store.documents and not (manifest.files or manifest.urls):
+        await load_index(INDEX_ARTIFACT_PATH)
+    
+    print(f"📚 Loading local documents from {DATA_DIR}...")
+    print(f"   API_DIR: {API_DIR}")
+    print(f"   DATA_DIR exists: {DATA_DIR.exists()}")
+    
+    files: List[Path] = []
+    if DATA_DIR.exists():
+        files = discover_files(DATA_DIR)
+        if not files:
+            print(f"⚠️  No local documents found in {DATA_DIR}")
+    else:
+        print(f"❌ ERROR: Data directory does not exist at {DATA_DIR}")
+    
+    print("\n🌐 Loading web articles...")
+    urls = _read_web_sources()
+    
+    file_diff, records = await asyncio.to_thread(manifest.diff_files, [str(file) for file in files], file_digest)
+    url_diff = manifest.diff_urls(urls)
+    for source in file_diff.removed + url_diff.removed:
+        removed = await _remove_source(source)
+        manifest.forget(source)
+        print(f"🗑️  Removed {source}: {removed} chunks")
+    # Edited files lose their old chunks; this also clears leftovers of an interrupted load
+    for source in file_diff.to_index + url_diff.to_index:
+        await _remove_source(source)
+        manifest.forget(source)
+    
+    changes = {
+        name: file_diff.counts()[name] + url_diff.counts()[name]
+        for name in ("added", "changed", "removed", "unchanged")
+    }
+    print(f"📋 Sources: {changes}")
+    progress.begin(
+        [SourceProgress(path, "local_file") for path in file_diff.to_index]
+        + [SourceProgress(url, "web") for url in url_diff.to_index]
+        + [
+            SourceProgress(path, "local_file", "unchanged", chunks=records[path].chunks)
+            for path in file_diff.unchanged
+        ]
+        + [
+            SourceProgress(url, "web", "unchanged", chunks=manifest.urls[url].chunks)
+            for url in url_diff.unchanged
+        ],
+        changes
+    )
+    executor = create_parse_executor()
     
+    interrupted = True
     try:
         # =========================================================================
-        # STEP 1: Load local files
+        # Local files and web articles load side by side, sharing the worker pool:
+        # - local pages are parsed in workers, chunked as they arrive and embedded
+        #   in batches while later pages still parse
+        # - web pages are fetched concurrently and extracted in the same workers
         # =========================================================================
-        print(f"📚 Loading local documents from {DATA_DIR}...")
-        print(f"   API_DIR: {API_DIR}")
-        print(f"   DATA_DIR exists: {DATA_DIR.exists()}")
-        
-        if not DATA_DIR.exists():
-            print(f"❌ ERROR: Data directory does not exist at {DATA_DIR}")
-            return
-        
-        loader = TextFileLoader(str(DATA_DIR))
-        documents = loader.load()
-        
-        if not documents:
-            print(f"⚠️  No local documents found in {DATA_DIR}")
-            print(f"   Files in directory: {list(DATA_DIR.iterdir()) if DATA_DIR.exists() else 'N/A'}")
+        await asyncio.gather(
+            _index_local_files([Path(path) for path in file_diff.to_index], records, executor),
+            _index_web_articles(url_diff.to_index, executor)
+        )
+        interrupted = False
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        progress.finish(interrupted=interrupted)
+    
+    summary = progress.summary()
+    print(f"\n✅ Ingestion complete in {summary['elapsed_seconds']}s!")
+    print(f"   - Sources indexed: {summary['sources_done']}/{summary['sources_total']}"
+          f" ({summary['sources_unchanged']} unchanged)")
+    print(f"   - Total: {vector_store.get_stats()['num_documents']} chunks stored"
+          f" ({summary['duplicates_collapsed']} near-duplicates collapsed)")
+
+
+async def load_documents_from_data_folder(full: bool = False):
+    """
+    Load documents from data/ folder and web sources.
+
+    Only sources missing from the manifest (added, edited, or interrupted by
+    an earlier failure) are parsed and embedded; chunks of removed sources
+    are dropped and unchanged ones are left alone. On the first load every
+    source is new. Chunks are appended to the vector store as soon as they
+    are embedded (a batch at a time for local files), so the index grows
+    progressively and chat works (on a partial index) while loading continues.
+    A failing source is recorded in `progress` and skipped.
+
+    Args:
+        full: Discard the index and manifest and rebuild everything
+    """
+    global _ingestion_complete
+    
+    if _ingestion_complete:
+        return
+    
+    # Never diff the manifest while the web refresher is updating it
+    async with _index_lock:
+        await _sync_sources(full)
+    
+    _ingestion_complete = True
+
+
+def start_background_ingestion(full: bool = False) -> asyncio.Task:
+    """Run ingestion as a background task so the server accepts traffic immediately."""
+    global _ingestion_task
+    if _ingestion_task is None or _ingestion_task.done():
+        _ingestion_task = asyncio.create_task(load_documents_from_data_folder(full))
+    return _ingestion_task
+
+
+async def stop_background_ingestion() -> None:
+    """Cancel a running ingestion task (on shutdown or before a reload)."""
+    global _ingestion_task
+    task, _ingestion_task = _ingestion_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def refresh_web_sources() -> Dict[str, int]:
+    """
+    Revalidate every indexed web article and re-embed only the ones whose text changed.
+
+    Requests are conditional (ETag / If-Modified-Since from the HTTP cache),
+    so an unchanged page usually costs a 304 and no extraction. A page that
+    was re-sent but extracts to the same text is left alone too. Changed
+    pages have their chunks swapped in place; a page that fails to load
+    keeps its old chunks.
+
+    Returns:
+        Counts of pages checked, not_modified, unchanged, updated and failed
+    """
+    outcome = {"checked": 0, "not_modified": 0, "unchanged": 0, "updated": 0, "failed": 0}
+    async with _index_lock:
+        urls = list(manifest.urls)
+        if not urls:
+            return outcome
+        executor = create_parse_executor()
+        try:
+            async for result in _web_loader(executor, skip_unmodified=True).iter_urls(urls):
+                url = result.url
+                outcome["checked"] += 1
+                try:
+                    if result.error:
+                        raise RuntimeError(result.error)
+                    now = datetime.now().isoformat()
+                    if result.not_modified:
+                        manifest.urls[url].fetched_at = now
+                        status = "not_modified"
+                    elif not result.documents:
+                        raise RuntimeError("no content extracted")
+                    elif not manifest.url_changed(url, _content_hash(result.documents)):
+                        manifest.urls[url].fetched_at = now
+                        status = "unchanged"
+                    else:
+                        chunks, metadata = _web_chunks(url, result.documents)
+                        async with _dedup_guard():
+                            unique, duplicates = await _collapse(list(zip(chunks, metadata)), replacing=url)
+                            try:
+                                with INGEST_STAGE_SECONDS.labels("embedding").time():
+                                    await vector_store.replace_source(
+                                        url, [text for text, _ in unique], [meta for _, meta in unique]
+                                    )
+                                if duplicates:
+                                    vector_store.attach_duplicates(duplicates)
+                            finally:
+                                # Forget the old version (or, if the swap failed, the new one) and
+                                # restore signatures of stored chunks left out of the comparison
+                                if dedup is not None:
+                                    await asyncio.to_thread(_sync_dedup_signatures)
+                        manifest.record_url(UrlRecord(url, now, _content_hash(result.documents), len(chunks)))
+                        status = "updated"
+                        print(f"🔄 Updated {url}: {len(chunks)} chunks")
+                except Exception as e:
+                    status = "failed"
+                    print(f"⚠️  Warning: Could not refresh web article {url}: {e}")
+                outcome[status] += 1
+                WEB_REFRESH_PAGES.labels(status).inc()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return outcome
+
+
+async def _refresh_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            print(f"🔄 Web refresh: {await refresh_web_sources()}")
+        except Exception as e:
+            print(f"⚠️  Web refresh failed: {e}")
+
+
+def start_web_refresher() -> Optional[asyncio.Task]:
+    """Revalidate web articles every WEB_REFRESH_INTERVAL seconds in the background."""
+    global _refresh_task
+    if WEB_REFRESH_INTERVAL > 0 and (_refresh_task is None or _refresh_task.done()):
+        _refresh_task = asyncio.create_task(_refresh_periodically(WEB_REFRESH_INTERVAL))
+    return _refresh_task
+
+
+async def stop_web_refresher() -> None:
+    global _refresh_task
+    task, _refresh_task = _refresh_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _index_upload(job: UploadJob, path: Path) -> None:
+    """
+    Index one uploaded file into the live store - cost is O(that file), not O(corpus).
+
+    Waits for any running ingestion or refresh first, so the file is not
+    indexed twice when a reload picks it up at the same time.
+    """
+    source = str(path)
+    async with _index_lock:
+        try:
+            stat = path.stat()
+            record = FileRecord(source, stat.st_size, stat.st_mtime, await asyncio.to_thread(file_digest, source))
+        except OSError as e:
+            job.entry.status, job.entry.error = "failed", str(e)
             return
-        
-        print(f"✅ Loaded {len(documents)} local documents")
-        
-        splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        chunks = splitter.split_documents(documents)
-        
-        print(f"✂️  Split into {len(chunks)} chunks")
-        
-        # Build metadata for local files
-        files = list(DATA_DIR.glob("*.txt")) + list(DATA_DIR.glob("*.pdf"))
-        
-        metadata_list = []
-        for file in files:
-            file_loader = TextFileLoader(str(file))
-            file_docs = file_loader.load()
-            file_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            file_chunks = file_splitter.split_documents(file_docs)
-            
-            for i in range(len(file_chunks)):
-                metadata_list.append({
-                    "filename": file.name,
-                    "source": str(file),
-                    "chunk_index": i,
-                    "source_type": "local_file"
-                })
-        
-        # =========================================================================
-        # STEP 2: Load web articles
-        # =========================================================================
-        print("\n🌐 Loading web articles...")
-        
-        # Read web sources from config
-        config_path = CONFIG_DIR / "web_sources.json"
-        web_chunks = []
-        web_metadata = []
-        
-        print(f"   CONFIG_DIR: {CONFIG_DIR}")
-        print(f"   Config file exists: {config_path.exists()}")
-        
-        if config_path.exists():
-            try:
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    urls = config.get('urls', [])
-                
-                if urls:
-                    print(f"📋 Found {len(urls)} URL(s) to fetch")
-                    
-                    # Load articles
-                    web_docs = load_articles_from_urls(urls)
-                    
-                    if web_docs:
-                        print(f"✅ Loaded {len(web_docs)} web article(s)")
-                        
-                        # Chunk web articles
-                        for web_doc in web_docs:
-                            doc_chunks = splitter.split_text(web_doc['text'])
-                            
-                            for i, chunk in enumerate(doc_chunks):
-                                web_chunks.append(chunk)
-                                web_metadata.append({
-                                    **web_doc['metadata'],
-                                    'chunk_index': i,
-                                    'total_chunks': len(doc_chunks)
-                                })
-                        
-                        print(f"✂️  Created {len(web_chunks)} chunks from web articles")
-                else:
-                    print("ℹ️  No URLs configured in web_sources.json")
-            
-            except Exception as e:
-                print(f"⚠️  Warning: Could not load web articles: {e}")
-                print("   (Continuing with local documents only)")
-        else:
-            print("ℹ️  No web sources config found (config/web_sources.json)")
-        
-        # =========================================================================
-        # STEP 3: Combine and add to vector store
-        # =========================================================================
-        print(f"\n🔄 Generating embeddings...")
-        
-        all_chunks = chunks + web_chunks
-        all_metadata = metadata_list + web_metadata
-        
-        await vector_store.add_documents(all_chunks, all_metadata)
-        
-        stats = vector_store.get_stats()
-        print(f"\n✅ Ingestion complete!")
-        print(f"   - Local chunks: {len(chunks)}")
-        print(f"   - Web chunks: {len(web_chunks)}")
-        print(f"   - Total: {stats['num_documents']} chunks stored")
-        
-        _ingestion_complete = True
-        
-    except Exception as e:
-        print(f"❌ Error loading documents: {e}")
+        await _remove_source(source)
+        manifest.forget(source)
+        # Shows up in /progress alongside the last ingestion run
+        progress.sources[source] = job.entry
+        executor = create_parse_executor()
+        try:
+            await _index_local_files([path], {source: record}, executor)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_ingestion_progress() -> IngestionProgress:
+    """Get the progress tracker of the current ingestion run."""
+    return progress
 
 
 @router.get("/stats", response_model=StatsResponse)
@@ -165,20 +794,142 @@ async def get_stats():
     }
 
 
+@router.get("/progress")
+async def get_progress():
+    """Per-source progress of the current (or last) ingestion run."""
+    return progress.summary()
+
+
+@router.get("/parse-cache")
+async def get_parse_cache_stats():
+    """Entries, size and hit/miss counts of the parsed-text cache."""
+    if parse_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(parse_cache.stats)}
+
+
+@router.delete("/parse-cache")
+async def clear_parse_cache():
+    """Drop every cached page text, forcing PDFs to be re-parsed on the next load."""
+    if parse_cache is None:
+        return {"enabled": False, "removed": 0}
+    removed = await asyncio.to_thread(parse_cache.clear)
+    return {"enabled": True, "removed": removed}
+
+
+@router.post("/refresh-web")
+async def refresh_web():
+    """Revalidate indexed web articles now instead of waiting for the next scheduled refresh."""
+    return await refresh_web_sources()
+
+
+@router.get("/http-cache")
+async def get_http_cache_stats():
+    """Entries, size and 304 count of the on-disk HTTP cache."""
+    if http_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(http_cache.stats)}
+
+
+def _require_upload_token(request: Request) -> None:
+    """Reject the upload unless uploads are enabled and the caller sent the upload token."""
+    if not UPLOAD_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get("x-upload-token", "")
+    if not secrets.compare_digest(supplied.encode(), UPLOAD_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Upload-Token")
+
+
+@router.post("/upload", status_code=202)
+async def upload_document(request: Request, filename: str):
+    """
+    Add a PDF or text file (the raw request body) to data/ and index it without touching the rest of the corpus.
+
+    The body is written to disk as it arrives and the size cap is enforced
+    per received chunk, so an oversized upload is cut off after
+    UPLOAD_MAX_MB rather than read whole. Existing files are never
+    overwritten (409). The file is indexed in the background, page window
+    by page window, while the index keeps serving. Poll the returned job.
+    """
+    _require_upload_token(request)
+    filename = Path(filename).name
+    if Path(filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Only {', '.join(SUPPORTED_EXTENSIONS)} files are supported")
+    too_large = HTTPException(status_code=413, detail=f"File exceeds {UPLOAD_MAX_BYTES // (1024 * 1024)} MB")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > UPLOAD_MAX_BYTES:
+        raise too_large
+    path = DATA_DIR / filename
+    if path.exists():
+        raise HTTPException(status_code=409, detail=f"{filename} already exists")
+    
+    tmp_path = DATA_DIR / f".{filename}.{uuid.uuid4().hex}.upload"
+    size = 0
+    try:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as out:
+            pending = bytearray()
+            async for received in request.stream():
+                size += len(received)
+                if size > UPLOAD_MAX_BYTES:
+                    raise too_large
+                pending += received
+                if len(pending) >= UPLOAD_BLOCK_SIZE:
+                    await asyncio.to_thread(out.write, bytes(pending))
+                    pending.clear()
+            await asyncio.to_thread(out.write, bytes(pending))
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        # Appears under its real name only once complete, so a reload never sees half a
+        # file; linking (unlike renaming) fails if a file of that name appeared meanwhile
+        os.link(tmp_path, path)
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail=f"{filename} already exists")
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Could not save upload: {e}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    
+    job = UploadJob(uuid.uuid4().hex, filename, size, SourceProgress(str(path), "local_file"), time.time())
+    upload_jobs[job.job_id] = job
+    while len(upload_jobs) > MAX_UPLOAD_JOBS:
+        upload_jobs.popitem(last=False)
+    task = asyncio.create_task(_index_upload(job, path))
+    _upload_tasks.add(task)
+    task.add_done_callback(_upload_tasks.discard)
+    print(f"📤 Received {filename} ({size / (1024 * 1024):.1f} MB), job {job.job_id}")
+    return {**job.summary(), "status_url": f"{router.prefix}/upload/{job.job_id}"}
+
+
+@router.get("/upload/{job_id}")
+async def get_upload_job(job_id: str):
+    """Progress of an upload: pending, parsing, embedding, then done or failed, with chunks indexed so far."""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown upload job")
+    return job.summary()
+
+
 @router.post("/reload")
-async def reload_documents():
-    """Reload all documents from data/ folder."""
+async def reload_documents(full: bool = False):
+    """
+    Re-sync the index with data/ and the configured web sources.
+
+    Only added or changed sources are re-embedded and removed ones are
+    dropped; `?full=true` discards everything and rebuilds from scratch.
+    """
     global _ingestion_complete
     
-    vector_store.clear()
+    await stop_background_ingestion()
     _ingestion_complete = False
     
-    await load_documents_from_data_folder()
+    await start_background_ingestion(full)
     
     stats = vector_store.get_stats()
     return {
         "success": True,
-        "message": f"Reloaded {stats['num_documents']} document chunks"
+        "message": f"Reloaded {stats['num_documents']} document chunks",
+        "changes": progress.changes
     }
 
 
@@ -1,9 +1,22 @@
 import os
-from pypdf import PdfReader
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Bump when text extraction changes, so cached page texts are re-parsed
+LOADER_VERSION = "1"
+
 
 class TextFileLoader:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, cache=None):
+        """
+        Args:
+            file_path: File or directory to load
+            cache: Optional ParseCache; PDF page texts are read from / written to it
+        """
         self.file_path = file_path
+        self.cache = cache
 
     def load(self):
         if os.path.isfile(self.file_path):
@@ -23,11 +36,53 @@ class TextFileLoader:
             return file.read()
 
     def load_pdf(self, file_path: str):
-        pages = []
-        reader = PdfReader(file_path)
-        for page in reader.pages:
-            pages.append(page.extract_text())
-        return '\n'.join(pages)
+        return '\n'.join(text for _, text in self.iter_cached_pdf_pages(file_path))
+
+    def iter_cached_pdf_pages(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """Like iter_pdf_pages, but served from the parse cache when the file is unchanged."""
+        if self.cache is None:
+            yield from self.iter_pdf_pages(file_path)
+            return
+        key = self.cache.file_key(file_path)
+        cached = self.cache.open_pages(key)
+        if cached is not None:
+            yield from cached
+            return
+        with self.cache.writer(key, os.path.basename(file_path)) as writer:
+            for page_number, text in self.iter_pdf_pages(file_path):
+                writer.add(page_number, text)
+                yield page_number, text
+
+    def iter_pdf_pages(
+        self,
+        file_path: str,
+        start: int = 0,
+        stop: Optional[int] = None,
+        reader=None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) one page at a time, 1-based.
+
+        Only one page's text is held at once; `start`/`stop` (0-based, stop
+        exclusive) select a window of pages so workers can split a document.
+        Pass an open `reader` to reuse it across windows of the same file.
+        """
+        if reader is None:
+            # pypdf is only needed during ingestion - import it on first use
+            from pypdf import PdfReader
+            reader = PdfReader(file_path)
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for index in range(start, stop):
+            yield index + 1, reader.pages[index].extract_text()
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) for a single file; a .txt file is one page."""
+        if self.file_path.endswith('.pdf'):
+            yield from self.iter_cached_pdf_pages(self.file_path)
+        elif self.file_path.endswith('.txt'):
+            yield 1, self.load_txt(self.file_path)
+        else:
+            raise ValueError(f"File '{self.file_path}' is not a supported file type (.txt or .pdf)")
 
     def load_directory(self):
         documents = []
@@ -81,3 +136,279 @@ class CharacterTextSplitter:
             chunks = self.split_text(doc)
             all_chunks.extend(chunks)
         return all_chunks
+
+
+class StreamingPageSplitter:
+    """
+    Incremental CharacterTextSplitter over a stream of pages.
+
+    Produces exactly the chunks `CharacterTextSplitter.split_text` would for
+    the pages joined with newlines, but only buffers the text from the next
+    chunk's start onwards, so memory stays bounded to about one chunk plus
+    the page being fed. Each chunk carries the pages it spans.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        CharacterTextSplitter(chunk_size, chunk_overlap)  # same validation
+        self.chunk_size = chunk_size
+        self.step = chunk_size - chunk_overlap
+        self._buffer = ""
+        self._buffer_start = 0  # absolute offset of _buffer[0]
+        self._next_start = 0  # absolute offset of the next chunk
+        self._page_offsets: List[int] = []  # absolute start offset of each buffered page
+        self._page_numbers: List[int] = []
+        self._fed = False
+
+    def _page_at(self, offset: int) -> int:
+        return self._page_numbers[max(bisect_right(self._page_offsets, offset) - 1, 0)]
+
+    def _emit(self, final: bool) -> List[Tuple[str, int, int]]:
+        chunks = []
+        end_of_text = self._buffer_start + len(self._buffer)
+        # Mid-stream only full chunks are ready; the final flush takes the short tail too
+        while self._next_start < end_of_text and (final or self._next_start + self.chunk_size <= end_of_text):
+            begin = self._next_start - self._buffer_start
+            chunk = self._buffer[begin:begin + self.chunk_size]
+            last = self._next_start + len(chunk) - 1
+            chunks.append((chunk, self._page_at(self._next_start), self._page_at(last)))
+            self._next_start += self.step
+        # Drop text and pages no future chunk can reach
+        drop = min(self._next_start, end_of_text) - self._buffer_start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+        keep = max(bisect_right(self._page_offsets, self._buffer_start) - 1, 0)
+        del self._page_offsets[:keep]
+        del self._page_numbers[:keep]
+        return chunks
+
+    def feed(self, page_number: int, text: str) -> List[Tuple[str, int, int]]:
+        """Add the next page; returns the (chunk, first_page, last_page) tuples now complete."""
+        if self._fed:
+            self._buffer += '\n'
+        self._fed = True
+        self._page_offsets.append(self._buffer_start + len(self._buffer))
+        self._page_numbers.append(page_number)
+        self._buffer += text or ''
+        return self._emit(final=False)
+
+    def finish(self) -> List[Tuple[str, int, int]]:
+        """Flush the trailing (possibly shorter) chunks."""
+        return self._emit(final=True)
+
+
+def split_pages(
+    pages: Iterable[Tuple[int, str]],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[Tuple[str, int, int]]:
+    """Chunk a stream of (page_number, text) pages, yielding (chunk, first_page, last_page)."""
+    splitter = StreamingPageSplitter(chunk_size, chunk_overlap)
+    for page_number, text in pages:
+        yield from splitter.feed(page_number, text)
+    yield from splitter.finish()
+
+
+# A paragraph break (blank line), or a sentence end: terminal punctuation, closing quotes/brackets, whitespace
+_BOUNDARY = re.compile(r"\n[ \t]*\n\s*|(?<=[.!?])[\"'\u201d\u2019)\]]*\s+")
+_WORD = re.compile(r"\S+")
+
+
+class BoundaryTextSplitter(CharacterTextSplitter):
+    """
+    Splits text into chunks that end on paragraph or sentence boundaries.
+
+    Boundary offsets are found in one regex pass; the text between two
+    boundaries (a segment, usually one sentence) is never cut unless it
+    alone exceeds `chunk_size`, in which case it is cut between words.
+    Segments are packed greedily, and a chunk ends at a paragraph break
+    instead of mid-paragraph when that keeps it at least `min_fill` full.
+    Overlap is whole trailing sentences, at most `chunk_overlap` long.
+
+    Sizes are characters by default; pass `length_function` (e.g.
+    tokens.estimate_tokens) to size chunks in tokens. `split_spans` returns
+    (start, end) offsets into the text rather than copies.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 0,
+        length_function: Optional[Callable[[str], int]] = None,
+        min_fill: float = 0.5
+    ):
+        super().__init__(chunk_size, chunk_overlap)
+        self.length_function = length_function
+        self.min_fill = min_fill
+
+    def segments(self, text: str) -> List[Tuple[int, int, bool, int]]:
+        """
+        (start, end, ends_paragraph, size) of each sentence-level segment, whitespace excluded.
+
+        Each segment is measured once here. Segments longer than chunk_size
+        are pre-cut between words.
+        """
+        segments: List[Tuple[int, int, bool, int]] = []
+        position = 0
+        for match in _BOUNDARY.finditer(text):
+            self._add_segment(text, position, match.start(), match.group().startswith("\n"), segments)
+            position = match.end()
+        self._add_segment(text, position, len(text), True, segments)
+        return segments
+
+    def _measure(self, text: str) -> int:
+        return len(text) if self.length_function is None else self.length_function(text)
+
+    def _add_segment(self, text: str, start: int, end: int, paragraph: bool, segments: List) -> None:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            if segments and paragraph:
+                last_start, last_end, _, last_size = segments[-1]
+                segments[-1] = (last_start, last_end, True, last_size)
+            return
+        size = self._measure(text[start:end])
+        if size <= self.chunk_size:
+            segments.append((start, end, paragraph, size))
+            return
+        # Too long for one chunk: cut between words, and inside a word only if it alone is too long
+        piece_start = piece_end = start
+        piece_size = 0
+        for word in _WORD.finditer(text, start, end):
+            word_start, word_end = word.span()
+            size = self._measure(word.group())
+            if self.length_function is None:
+                fits = word_end - piece_start <= self.chunk_size  # whitespace between words counts too
+            else:
+                fits = piece_size + size <= self.chunk_size
+            if piece_size and not fits:
+                segments.append((piece_start, piece_end, False, piece_size))
+                piece_start, piece_size = word_start, 0
+            while size > self.chunk_size:
+                cut = self._longest_prefix(text, word_start, word_end)
+                segments.append((word_start, cut, False, self._measure(text[word_start:cut])))
+                word_start = piece_start = cut
+                size = self._measure(text[word_start:word_end])
+            piece_end = word_end
+            piece_size = piece_end - piece_start if self.length_function is None else piece_size + size
+        segments.append((piece_start, piece_end, paragraph, piece_size))
+
+    def _longest_prefix(self, text: str, start: int, end: int) -> int:
+        """End of the longest text[start:end] prefix that fits in one chunk (at least one character)."""
+        low, high = start + 1, end
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._measure(text[start:middle]) <= self.chunk_size:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def pack(self, segments: List[Tuple[int, int, bool, int]]) -> List[Tuple[int, int, int]]:
+        """Greedily group segments into chunks; returns (start, end, index of the first segment)."""
+        if self.length_function is None:
+            # Character sizes include the whitespace between segments
+            def size(i: int, j: int) -> int:
+                return segments[j - 1][1] - segments[i][0]
+        else:
+            prefix = [0, *accumulate(segment[3] for segment in segments)]
+
+            def size(i: int, j: int) -> int:
+                return prefix[j] - prefix[i]
+
+        spans = []
+        i, n = 0, len(segments)
+        while i < n:
+            j = i + 1
+            while j < n and size(i, j + 1) <= self.chunk_size:
+                j += 1
+            if j < n:
+                # Prefer ending at a paragraph break if the chunk stays reasonably full
+                for k in range(j - 1, i - 1, -1):
+                    if size(i, k + 1) < self.min_fill * self.chunk_size:
+                        break
+                    if segments[k][2]:
+                        j = k + 1
+                        break
+            spans.append((segments[i][0], segments[j - 1][1], i))
+            if j >= n:
+                break
+            following = j
+            while following - 1 > i and size(following - 1, j) <= self.chunk_overlap:
+                following -= 1
+            i = following
+        return spans
+
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each chunk in `text`."""
+        return [(start, end) for start, end, _ in self.pack(self.segments(text))]
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+
+class StreamingBoundarySplitter:
+    """
+    Incremental BoundaryTextSplitter over a stream of pages.
+
+    Produces exactly the chunks `BoundaryTextSplitter.split_text` would for
+    the pages joined with newlines. Only the text from the start of the
+    last unfinished chunk onwards is buffered; a chunk is emitted once the
+    sentence after it is complete, since that is what decides where it ends.
+    """
+
+    def __init__(self, splitter: BoundaryTextSplitter):
+        self.splitter = splitter
+        self._buffer = ""
+        self._buffer_start = 0  # absolute offset of _buffer[0]
+        self._page_offsets: List[int] = []  # absolute start offset of each buffered page
+        self._page_numbers: List[int] = []
+        self._fed = False
+
+    def _page_at(self, offset: int) -> int:
+        return self._page_numbers[max(bisect_right(self._page_offsets, offset) - 1, 0)]
+
+    def _emit(self, final: bool) -> List[Tuple[str, int, int]]:
+        segments = self.splitter.segments(self._buffer)
+        if not final:
+            # The last segment may still grow with the next page
+            segments = segments[:-1]
+        spans = self.splitter.pack(segments)
+        ready = spans if final else spans[:-1]
+        chunks = [
+            (
+                self._buffer[start:end],
+                self._page_at(self._buffer_start + start),
+                self._page_at(self._buffer_start + end - 1)
+            )
+            for start, end, _ in ready
+        ]
+        if final:
+            self._buffer = ""
+        elif ready:
+            # Resume from the first unfinished chunk - the splitter restarts identically there
+            drop = spans[-1][0]
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+            keep = max(bisect_right(self._page_offsets, self._buffer_start) - 1, 0)
+            del self._page_offsets[:keep]
+            del self._page_numbers[:keep]
+        return chunks
+
+    def feed(self, page_number: int, text: str) -> List[Tuple[str, int, int]]:
+        """Add the next page; returns the (chunk, first_page, last_page) tuples now complete."""
+        if self._fed:
+            self._buffer += '\n'
+        self._fed = True
+        self._page_offsets.append(self._buffer_start + len(self._buffer))
+        self._page_numbers.append(page_number)
+        self._buffer += text or ''
+        return self._emit(final=False)
+
+    def finish(self) -> List[Tuple[str, int, int]]:
+        """Flush the remaining chunks."""
+        if not self._fed:
+            return []
+        return self._emit(final=True)
@@ -0,0 +1,144 @@
+"""Source manifest - what was ingested from where, so a reload only redoes what changed."""
+
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+
+@dataclass
+class FileRecord:
+    """A local file as it was when indexed."""
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    chunks: int = 0
+
+
+@dataclass
+class UrlRecord:
+    """A web article as it was when fetched and indexed."""
+    url: str
+    fetched_at: str
+    sha256: str
+    chunks: int = 0
+
+
+@dataclass
+class ManifestDiff:
+    """Sources sorted by what a reload has to do with them."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def to_index(self) -> List[str]:
+        """Sources that need parsing, chunking and embedding."""
+        return self.added + self.changed
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(sources) for name, sources in asdict(self).items()}
+
+
+class SourceManifest:
+    """
+    Local files (path, size, mtime, content hash) and web URLs (fetch date,
+    content hash) currently in the index, with how many chunks each produced.
+
+    Files are compared by size and mtime first and only hashed when those
+    differ, so a reload over an unchanged folder reads no file contents. A
+    file that was touched but not edited keeps its chunks.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, FileRecord] = {}
+        self.urls: Dict[str, UrlRecord] = {}
+
+    def diff_files(
+        self,
+        paths: List[str],
+        digest: Callable[[str], str]
+    ) -> Tuple[ManifestDiff, Dict[str, FileRecord]]:
+        """
+        Compare the files now on disk with the manifest.
+
+        Args:
+            paths: Files currently in the data folder
+            digest: Content hash function (e.g. parse_cache.file_digest)
+
+        Returns:
+            (diff, {path: current record}) - records of added and changed files
+            are committed with `record_file` once they are indexed
+        """
+        diff = ManifestDiff()
+        current: Dict[str, FileRecord] = {}
+        for path in paths:
+            stat = os.stat(path)
+            known = self.files.get(path)
+            if known is not None and known.size == stat.st_size and known.mtime == stat.st_mtime:
+                diff.unchanged.append(path)
+                current[path] = known
+                continue
+            record = FileRecord(path, stat.st_size, stat.st_mtime, digest(path))
+            if known is None:
+                diff.added.append(path)
+            elif known.sha256 == record.sha256:
+                # Touched but not edited: remember the new mtime, keep the chunks
+                record.chunks = known.chunks
+                self.files[path] = record
+                diff.unchanged.append(path)
+            else:
+                diff.changed.append(path)
+            current[path] = record
+        diff.removed = [path for path in self.files if path not in current]
+        return diff, current
+
+    def diff_urls(self, urls: List[str]) -> ManifestDiff:
+        """
+        Compare the configured URLs with the manifest.
+
+        Only membership is checked here; whether a known page changed is
+        decided by fetching it and comparing `sha256` (see `url_changed`).
+        """
+        configured = set(urls)
+        return ManifestDiff(
+            added=[url for url in urls if url not in self.urls],
+            removed=[url for url in self.urls if url not in configured],
+            unchanged=[url for url in urls if url in self.urls],
+        )
+
+    def url_changed(self, url: str, sha256: str) -> bool:
+        """True if a freshly fetched page differs from what was indexed."""
+        known = self.urls.get(url)
+        return known is None or known.sha256 != sha256
+
+    def record_file(self, record: FileRecord) -> None:
+        self.files[record.path] = record
+
+    def record_url(self, record: UrlRecord) -> None:
+        self.urls[record.url] = record
+
+    def forget(self, source: str) -> None:
+        """Drop a file or URL (its chunks are no longer in the index)."""
+        self.files.pop(source, None)
+        self.urls.pop(source, None)
+
+    def clear(self) -> None:
+        self.files = {}
+        self.urls = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": [asdict(record) for record in self.files.values()],
+            "urls": [asdict(record) for record in self.urls.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SourceManifest":
+        manifest = cls()
+        for record in data.get("files", []):
+            manifest.record_file(FileRecord(**record))
+        for record in data.get("urls", []):
+            manifest.record_url(UrlRecord(**record))
+        return manifest
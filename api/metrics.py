@@ -0,0 +1,334 @@
+"""Metrics - lightweight counters, gauges and histograms rendered in Prometheus text format."""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Latency buckets (seconds) from 5ms to 2 minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Token-count buckets for streamed answers
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric(ABC):
+    """Base class: a named metric with optional labels, one child per label combination."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabeled metrics are exported (as zero) before their first update
+            self._children[()] = self._new_child()
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the per-label-combination child that holds the values."""
+
+    def labels(self, *values: str):
+        """Get the child for a label combination (cache it on hot paths)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels(...)")
+        return self.labels()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for every child."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from `function` at scrape time instead of tracking it."""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # One binary search and three increments - cheap enough for every request
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall time of a block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets (for latency percentiles)."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together on one scrape endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format (0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Process-wide registry and the metrics the API records
+REGISTRY = MetricsRegistry()
+
+CHAT_STAGE_SECONDS = REGISTRY.histogram(
+    "diving_coach_chat_stage_seconds",
+    "Time spent in each /api/chat pipeline stage.",
+    labelnames=("stage",)
+)
+CHAT_TOKENS_STREAMED = REGISTRY.histogram(
+    "diving_coach_chat_tokens_streamed",
+    "Content tokens streamed per generated answer.",
+    buckets=TOKEN_BUCKETS
+)
+CHAT_CONTEXT_TOKENS = REGISTRY.histogram(
+    "diving_coach_chat_context_tokens",
+    "Estimated tokens of retrieved context packed into each prompt.",
+    buckets=TOKEN_BUCKETS
+)
+CHAT_USAGE_TOKENS = REGISTRY.counter(
+    "diving_coach_chat_usage_tokens_total",
+    "LLM tokens reported in completion usage, by kind (prompt, cached_prompt, completion).",
+    labelnames=("kind",)
+)
+CHAT_MODEL_ROUTES = REGISTRY.counter(
+    "diving_coach_chat_model_routes_total",
+    "Chat generations by routing decision (fast, default, strong, explicit) and model.",
+    labelnames=("route", "model")
+)
+CHAT_REQUESTS = REGISTRY.counter(
+    "diving_coach_chat_requests_total",
+    "Chat requests by outcome.",
+    labelnames=("outcome",)
+)
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "diving_coach_ingest_stage_seconds",
+    "Time spent in each document ingestion phase.",
+    labelnames=("stage",)
+)
+OPENAI_POOL_CONNECTIONS = REGISTRY.gauge(
+    "diving_coach_openai_pool_connections",
+    "Connections in the shared OpenAI HTTP pool.",
+    labelnames=("state",)
+)
+CHAT_IN_FLIGHT = REGISTRY.gauge(
+    "diving_coach_chat_in_flight",
+    "Chat pipelines currently running (after single-flight deduplication)."
+)
+SEMANTIC_CACHE_ENTRIES = REGISTRY.gauge(
+    "diving_coach_semantic_cache_entries",
+    "Answers held in the semantic cache."
+)
+VECTOR_STORE_CHUNKS = REGISTRY.gauge(
+    "diving_coach_vector_store_chunks",
+    "Chunks indexed in the vector store."
+)
+WEB_REFRESH_PAGES = REGISTRY.counter(
+    "diving_coach_web_refresh_pages_total",
+    "Web articles revalidated by the background refresher, by outcome.",
+    labelnames=("outcome",)
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "diving_coach_admission_in_flight",
+    "Chat generations holding an admission slot."
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "diving_coach_admission_queue_depth",
+    "Chat requests waiting for an admission slot."
+)
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "diving_coach_admission_rejections_total",
+    "Chat requests shed by admission control.",
+    labelnames=("reason",)
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "diving_coach_admission_wait_seconds",
+    "Time admitted chat requests spent queued for a slot."
+)
@@ -0,0 +1,193 @@
+"""Parsed-text cache - extracted PDF pages on disk, keyed by file content hash and loader version.
+
+Usage (from the repository root):
+    python -m api.parse_cache stats [--dir DIR]
+    python -m api.parse_cache clear [--dir DIR] [FILE ...]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .disk_cache import DiskCache
+from .loaders import LOADER_VERSION
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.absolute() / ".parse_cache"
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CacheWriter:
+    """
+    Writes one file's pages to a temporary entry; `commit()` publishes it atomically.
+
+    Used as a context manager, the entry is committed on a clean exit and
+    discarded if the block raises (e.g. parsing failed half-way).
+    """
+
+    def __init__(self, cache: "ParseCache", key: str, source: str):
+        self.cache = cache
+        self.path = cache._key_path(key)
+        self.tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self.pages = 0
+        self._file = None
+        if not cache._writable:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.tmp_path, "wt", encoding="utf-8", compresslevel=6)
+            self._write({"loader_version": cache.loader_version, "source": source})
+        except OSError as e:
+            cache._write_failed(e)
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def add(self, page_number: int, text: str) -> None:
+        if self._file is None:
+            return
+        try:
+            self._write({"p": page_number, "t": text})
+            self.pages += 1
+        except OSError as e:
+            self.cache._write_failed(e)
+            self.discard()
+
+    def commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+            self.cache.writes += 1
+        except OSError as e:
+            self.cache._write_failed(e)
+            self.discard()
+        self._file = None
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.unlink(self.tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "CacheWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+class ParseCache(DiskCache):
+    """
+    On-disk cache of extracted page texts, stored as gzip-compressed JSON lines.
+
+    Entries are keyed by SHA-256(file contents) plus the loader version, so an
+    edited file or a change to text extraction never returns stale pages, and
+    renaming a file keeps its entry. See DiskCache for write failures.
+    """
+    suffix = ".jsonl.gz"
+    label = "Parse cache"
+
+    def __init__(self, directory: Optional[str] = None, loader_version: str = "1"):
+        super().__init__(directory, DEFAULT_CACHE_DIR)
+        self.loader_version = loader_version
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def file_key(self, path: str) -> str:
+        """Cache key for a file: content hash combined with the loader version."""
+        return hashlib.sha256(f"{file_digest(path)}:{self.loader_version}".encode()).hexdigest()
+
+    def open_pages(self, key: str) -> Optional[Iterator[Tuple[int, str]]]:
+        """
+        Stream a cached file's (page_number, text) pairs, or None on a miss.
+
+        Pages are decompressed lazily, so memory stays bounded to one page.
+        """
+        path = self._key_path(key)
+        try:
+            f = gzip.open(path, "rt", encoding="utf-8")
+            header = json.loads(f.readline())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if header.get("loader_version") != self.loader_version:
+            f.close()
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        def pages() -> Iterator[Tuple[int, str]]:
+            with f:
+                for line in f:
+                    record = json.loads(line)
+                    yield record["p"], record["t"]
+
+        return pages()
+
+    def writer(self, key: str, source: str = "") -> CacheWriter:
+        """Start writing a cache entry (a no-op writer when the cache is not writable)."""
+        return CacheWriter(self, key, source)
+
+    def invalidate(self, path: str) -> bool:
+        """Drop the entry for one file's current contents; returns whether one existed."""
+        try:
+            self._key_path(self.file_key(path)).unlink()
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "loader_version": self.loader_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect or clear the parsed-text cache.")
+    parser.add_argument("command", choices=("stats", "clear"))
+    parser.add_argument("files", nargs="*", help="Only clear the entries of these files")
+    parser.add_argument("--dir", default=os.getenv("PARSE_CACHE_DIR"), help="Cache directory")
+    args = parser.parse_intermixed_args()
+
+    # Same version as the ingestion pipeline, so stats and per-file clears see its entries
+    cache = ParseCache(args.dir, loader_version=LOADER_VERSION)
+    if args.command == "clear" and args.files:
+        removed = sum(cache.invalidate(path) for path in args.files)
+        print(f"🗑️  Removed {removed} cached file(s) from {cache.directory}")
+    elif args.command == "clear":
+        print(f"🗑️  Removed {cache.clear()} cached file(s) from {cache.directory}")
+    else:
+        stats = cache.stats()
+        print(f"📦 {stats['entries']} cached file(s), {stats['size_mb']} MB in {stats['directory']} "
+              f"(loader version {stats['loader_version']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Ingestion pipeline - streams each file's pages through parse, chunk and embed, in parallel workers."""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .loaders import BoundaryTextSplitter, StreamingBoundarySplitter, StreamingPageSplitter, TextFileLoader
+from .parse_cache import ParseCache
+from .settings import env_int
+
+
+Chunk = Tuple[str, Dict[str, Any]]  # (chunk text, metadata)
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+
+
+def discover_files(directory: Path) -> List[Path]:
+    """Supported files in a directory, in a stable (sorted) order."""
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS)
+
+
+@lru_cache(maxsize=2)
+def _pdf_reader(path: str, mtime: float):
+    """Open PDF readers, cached per worker process so its windows of a file reuse one parse."""
+    from pypdf import PdfReader
+    return PdfReader(path)
+
+
+def _open_pdf(path: str):
+    return _pdf_reader(path, os.path.getmtime(path))
+
+
+def count_pages(path: str) -> int:
+    """Number of pages in a file (a .txt file is one page). Runs in a worker."""
+    if path.lower().endswith(".pdf"):
+        return len(_open_pdf(path).pages)
+    return 1
+
+
+def parse_pages(path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extract a window of pages as (page_number, text) pairs. Runs in a worker.
+
+    Must stay a picklable top-level function for the process pool.
+    """
+    loader = TextFileLoader(path)
+    if path.lower().endswith(".pdf"):
+        return list(loader.iter_pdf_pages(path, start, stop, reader=_open_pdf(path)))
+    return list(loader.iter_pages())
+
+
+def page_windows(num_pages: int, window: int) -> List[Tuple[int, int]]:
+    """Split [0, num_pages) into consecutive (start, stop) windows."""
+    return [(start, min(start + window, num_pages)) for start in range(0, num_pages, window)]
+
+
+def default_workers() -> int:
+    """INGEST_WORKERS, or one worker per core (capped at 4); 0 parses in a thread instead."""
+    cores = os.cpu_count() or 1
+    # On a single core a pool only adds process start-up time
+    return env_int("INGEST_WORKERS", min(4, cores) if cores > 1 else 0)
+
+
+def create_parse_executor(workers: Optional[int] = None) -> Executor:
+    """
+    A process pool for CPU-bound parsing, falling back to a single thread.
+
+    pypdf text extraction holds the GIL, so threads would not run it in
+    parallel. Platforms without working multiprocessing (some serverless
+    runtimes lack /dev/shm) get the thread fallback.
+    """
+    workers = default_workers() if workers is None else workers
+    if workers > 0:
+        try:
+            # spawn: children start clean instead of forking a process with live threads
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"⚠️  Process pool unavailable ({e}), parsing in a thread")
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-parse")
+
+
+async def stream_file_chunks(
+    path: Path,
+    executor: Executor,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    window: int = 8,
+    lookahead: int = 4,
+    cache: Optional[ParseCache] = None,
+    splitter: Optional[BoundaryTextSplitter] = None,
+    stage_seconds: Optional[Dict[str, float]] = None
+) -> AsyncIterator[Chunk]:
+    """
+    Yield one file's (chunk, metadata) pairs while its pages are still being parsed.
+
+    Page windows are parsed in the executor with at most `lookahead` windows
+    in flight, and fed in order through a streaming splitter, so memory is
+    bounded to a few windows of pages rather than the whole document.
+    PDF chunks record the pages they span for citations. Whitespace-only
+    chunks (e.g. from scanned pages) are skipped.
+
+    Args:
+        path: File to ingest (.txt or .pdf)
+        executor: Pool that parses page windows
+        chunk_size: Characters per chunk
+        chunk_overlap: Characters shared by consecutive chunks
+        window: Pages per parse task
+        lookahead: Page windows parsed ahead of the chunker
+        cache: Parsed-text cache; unchanged PDFs skip parsing entirely
+        splitter: Boundary-aware splitter to chunk with (its own size and overlap
+            apply); defaults to fixed-size character chunks of chunk_size
+        stage_seconds: If given, seconds spent waiting for parsed pages ("parse") and
+            splitting them ("chunking") are added to it; time the consumer holds a
+            yielded chunk (e.g. blocked on a full queue) counts towards neither
+    """
+    source = str(path)
+    is_pdf = path.suffix.lower() == ".pdf"
+    if splitter is None:
+        pages_splitter = StreamingPageSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    else:
+        pages_splitter = StreamingBoundarySplitter(splitter)
+    chunk_index = 0
+
+    def with_metadata(pieces: List[Tuple[str, int, int]]) -> List[Chunk]:
+        nonlocal chunk_index
+        chunks = []
+        for text, first_page, last_page in pieces:
+            if not text.strip():
+                continue
+            metadata = {
+                "filename": path.name,
+                "source": source,
+                "source_id": source,
+                "chunk_uid": f"{source}#{chunk_index}",
+                "chunk_index": chunk_index,
+                "source_type": "local_file"
+            }
+            if is_pdf:
+                metadata["page"] = first_page
+                metadata["page_end"] = last_page
+            chunks.append((text, metadata))
+            chunk_index += 1
+        return chunks
+
+    # Unchanged PDFs are replayed from the parse cache; others are parsed and written through
+    cached = None
+    writer = None
+    if cache is not None and is_pdf:
+        key = await asyncio.to_thread(cache.file_key, source)
+        cached = await asyncio.to_thread(cache.open_pages, key)
+        if cached is None:
+            writer = cache.writer(key, path.name)
+    windows = _cached_windows(cached, window) if cached is not None else _parsed_windows(
+        source, executor, window, lookahead
+    )
+
+    timings = stage_seconds if stage_seconds is not None else {}
+    for stage in ("parse", "chunking"):
+        timings.setdefault(stage, 0.0)
+    try:
+        while True:
+            started = time.perf_counter()
+            pages = await anext(windows, None)
+            if pages is None:
+                break
+            if writer is not None:
+                for page_number, text in pages:
+                    writer.add(page_number, text)
+            split_started = time.perf_counter()
+            timings["parse"] += split_started - started
+            # A window's chunks are cut before any is yielded, so the timers never span a yield
+            chunks = [
+                chunk for page_number, text in pages
+                for chunk in with_metadata(pages_splitter.feed(page_number, text))
+            ]
+            timings["chunking"] += time.perf_counter() - split_started
+            for chunk in chunks:
+                yield chunk
+        if writer is not None:
+            writer.commit()
+        started = time.perf_counter()
+        chunks = with_metadata(pages_splitter.finish())
+        timings["chunking"] += time.perf_counter() - started
+        for chunk in chunks:
+            yield chunk
+    finally:
+        # Only a fully parsed file is cached
+        if writer is not None:
+            writer.discard()
+        await windows.aclose()
+
+
+async def _parsed_windows(
+    source: str,
+    executor: Executor,
+    window: int,
+    lookahead: int
+) -> AsyncIterator[List[Tuple[int, str]]]:
+    """Parse page windows in the executor, `lookahead` at a time, yielding them in order."""
+    loop = asyncio.get_running_loop()
+    num_pages = await loop.run_in_executor(executor, count_pages, source)
+    windows = iter(page_windows(num_pages, window))
+    pending: Deque[asyncio.Future] = deque()
+
+    def submit_next() -> None:
+        span = next(windows, None)
+        if span is not None:
+            pending.append(loop.run_in_executor(executor, parse_pages, source, *span))
+
+    for _ in range(max(1, lookahead)):
+        submit_next()
+    try:
+        while pending:
+            pages = await pending.popleft()
+            submit_next()
+            yield pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _cached_windows(pages: Iterator[Tuple[int, str]], window: int) -> AsyncIterator[List[Tuple[int, str]]]:
+    """Decompress cached pages a window at a time, off the event loop."""
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(pages, window)))
+        if not batch:
+            return
+        yield batch
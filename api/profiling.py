@@ -0,0 +1,184 @@
+"""On-demand profiling - stack sampling and memory breakdowns for a running worker."""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(seconds: float = 5.0, interval: float = 0.01, max_depth: int = 64) -> Dict[str, Any]:
+    """
+    Sample every thread's Python stack for a while (blocking - run it in a thread).
+
+    Stacks are returned in collapsed form ("root;caller;callee count"), the input
+    format of flamegraph.pl and speedscope.
+
+    Args:
+        seconds: How long to sample
+        interval: Seconds between samples
+        max_depth: Deepest frames kept per stack
+
+    Returns:
+        {"samples": int, "duration": float, "stacks": Counter of collapsed stacks}
+    """
+    me = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks: Counter = Counter()
+    samples = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            frames: List[str] = []
+            while frame is not None and len(frames) < max_depth:
+                frames.append(_frame_label(frame))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(frames))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    return {"samples": samples, "duration": time.perf_counter() - start, "stacks": stacks}
+
+
+def collapsed(stacks: Counter) -> str:
+    """Render sampled stacks as collapsed-stack text, hottest first."""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+def deep_sizeof(obj: Any, max_objects: int = 1_000_000) -> int:
+    """
+    Approximate memory held by an object graph (containers, strings, NumPy arrays).
+
+    Shared objects are counted once; traversal stops after `max_objects`.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, np.ndarray):
+            # getsizeof includes the buffer for arrays owning their data; views count their base once
+            total += sys.getsizeof(current)
+            if current.base is not None:
+                stack.append(current.base)
+            continue
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            stack.append(vars(current))
+        elif hasattr(current, "__slots__"):
+            stack.extend(getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot))
+    return total
+
+
+def process_memory() -> Dict[str, Optional[float]]:
+    """Current and peak resident set size of this process, in MB (where available)."""
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    peak = None
+    try:
+        import resource
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak = peak_kb / (1024 * 1024) if sys.platform == "darwin" else peak_kb / 1024
+    except ImportError:
+        pass
+
+    return {
+        "rss_mb": round(current, 2) if current is not None else None,
+        "peak_rss_mb": round(peak, 2) if peak is not None else None,
+    }
+
+
+def memory_breakdown(components: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Size each named component (deep) and report the process footprint alongside.
+
+    Args:
+        components: Name -> object graph to measure
+
+    Returns:
+        Process RSS plus per-component sizes in MB, largest first
+    """
+    sizes = {name: deep_sizeof(obj) for name, obj in components.items()}
+    return {
+        "process": process_memory(),
+        "components_mb": {
+            name: round(size / (1024 * 1024), 3)
+            for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+        },
+    }
+
+
+class AllocationTracker:
+    """Opt-in tracemalloc wrapper reporting top allocation sites and growth between calls."""
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._previous = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """Top allocation sites by size, and the biggest growth since the previous report."""
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        report: Dict[str, Any] = {
+            "tracing": True,
+            "traced_mb": round(current / (1024 * 1024), 2),
+            "traced_peak_mb": round(peak / (1024 * 1024), 2),
+            "top_allocations": [
+                {"site": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:limit]
+            ],
+        }
+        if self._previous is not None:
+            report["growth_since_last_report"] = [
+                {"site": str(stat.traceback), "size_diff_kb": round(stat.size_diff / 1024, 1)}
+                for stat in snapshot.compare_to(self._previous, "lineno")[:limit]
+            ]
+        self._previous = snapshot
+        return report
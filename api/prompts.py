@@ -3,6 +3,30 @@
 from typing import List, Dict, Any, Tuple, Optional
 import re
 
+from .tokens import estimate_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_QUERY_WORD = re.compile(r"[^\W\d_]{3,}")
+# Too common to say which sentence answers a question
+_STOPWORDS = frozenset(
+    "the and for are but not you your with what when where which who why how can does did has have "
+    "was were this that these those from into about should would could there their them they then "
+    "than will its also any all some more most much many very just only".split()
+)
+
+
+def _system_prefixes(
+    prompts: Dict[str, str], citation_requirement: str, no_context_note: str
+) -> Dict[Tuple[str, bool, bool], str]:
+    """Static system-message prefixes keyed by (template, enforce_citations, has_context)."""
+    prefixes = {}
+    for template, prompt in prompts.items():
+        prefixes[(template, True, True)] = f"{prompt}\n\n{citation_requirement}"
+        prefixes[(template, False, True)] = prompt
+        # Without context there is nothing to cite: the requirement is never added
+        prefixes[(template, False, False)] = f"{prompt}\n\n{no_context_note}"
+    return prefixes
+
 
 class PromptTemplates:
     """Collection of prompt templates for the diving coach with citation support."""
@@ -54,13 +78,233 @@ Guidelines:
 - **Always provide specific source citations using [Source X] format**
 - Reference exact manual sections when available"""
     }
-    
+
+    @staticmethod
+    def format_pages(metadata: Dict[str, Any]) -> str:
+        """Page (or page range) a chunk came from, e.g. "12" or "12-13"; empty if unknown."""
+        page = metadata.get('page')
+        if page is None:
+            return ""
+        page_end = metadata.get('page_end', page)
+        return str(page) if page_end == page else f"{page}-{page_end}"
+
+    @staticmethod
+    def format_also_in(metadata: Dict[str, Any], limit: int = 3) -> str:
+        """Other documents a collapsed near-duplicate chunk appears in, e.g. "AIDA2.pdf p. 14"."""
+        seen = []
+        for duplicate in metadata.get('duplicates') or []:
+            name = duplicate.get('filename') or duplicate.get('title') or duplicate.get('source_id', '')
+            pages = PromptTemplates.format_pages(duplicate)
+            reference = f"{name} p. {pages}" if pages else name
+            if reference and reference not in seen:
+                seen.append(reference)
+        if len(seen) > limit:
+            return ", ".join(seen[:limit]) + f" (+{len(seen) - limit} more)"
+        return ", ".join(seen)
+
+    @staticmethod
+    def _query_terms(query: str) -> set:
+        """Word stems (first 5 letters) of a question's content words."""
+        return {word[:5] for word in _QUERY_WORD.findall(query.lower()) if word not in _STOPWORDS}
+
+    @staticmethod
+    def _join_overlapping(first: str, second: str) -> str:
+        """Concatenate two consecutive chunks, dropping the text they share (their overlap)."""
+        probe = second[:40]
+        position = first.find(probe) if probe else -1
+        while position != -1:
+            if second.startswith(first[position:]):
+                return first[:position] + second
+            position = first.find(probe, position + 1)
+        return f"{first}\n{second}"
+
+    @staticmethod
+    def _merge_adjacent(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge results that are consecutive chunks of the same document into one.
+        
+        A merged result scores as its best chunk and covers the pages of all.
+        """
+        merged: List[Dict[str, Any]] = []
+        by_position = sorted(
+            results,
+            key=lambda r: (
+                str(r.get('metadata', {}).get('source_id') or r.get('metadata', {}).get('filename', '')),
+                r.get('metadata', {}).get('chunk_index', -1)
+            )
+        )
+        for result in by_position:
+            metadata = result.get('metadata', {})
+            source = metadata.get('source_id') or metadata.get('filename')
+            index = metadata.get('chunk_index')
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None and source is not None and isinstance(index, int)
+                and previous['source'] == source and previous['last_index'] == index - 1
+            ):
+                previous['text'] = PromptTemplates._join_overlapping(previous['text'], result.get('text', ''))
+                previous['score'] = max(previous['score'], result.get('score', 0))
+                previous['last_index'] = index
+                previous['chunks'] += 1
+                page_end = metadata.get('page_end', metadata.get('page'))
+                if page_end is not None:
+                    previous['metadata']['page_end'] = page_end
+                continue
+            merged.append({
+                'text': result.get('text', ''),
+                'score': result.get('score', 0),
+                'metadata': dict(metadata),
+                'source': source,
+                'last_index': index,
+                'chunks': 1,
+            })
+        return merged
+
+    @staticmethod
+    def _sentence_window(text: str, terms: set, token_limit: int) -> Optional[str]:
+        """
+        The run of consecutive sentences that fits `token_limit` and mentions the most query terms.
+        
+        Returns None if not even one sentence fits.
+        """
+        token_limit -= 2  # the "…" marking each cut
+        sentences = [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+        costs = [estimate_tokens(sentence) for sentence in sentences]
+        hits = [
+            len(terms & {word[:5] for word in _QUERY_WORD.findall(sentence.lower())})
+            for sentence in sentences
+        ]
+        best: Optional[Tuple[int, int]] = None
+        best_key = (-1, -1)
+        start, cost, window_hits = 0, 0, 0
+        for end in range(len(sentences)):
+            cost += costs[end]
+            window_hits += hits[end]
+            while cost > token_limit and start <= end:
+                cost -= costs[start]
+                window_hits -= hits[start]
+                start += 1
+            # Most query terms, then the most text
+            if start <= end and (window_hits, cost) > best_key:
+                best, best_key = (start, end + 1), (window_hits, cost)
+        if best is None:
+            return None
+        window = " ".join(sentences[best[0]:best[1]])
+        return ("… " if best[0] > 0 else "") + window + (" …" if best[1] < len(sentences) else "")
+
+    @staticmethod
+    def pack_context(
+        search_results: List[Dict[str, Any]],
+        token_budget: int,
+        query: str = "",
+        min_score: float = 0.3,
+        max_sources: Optional[int] = None,
+        min_trim_tokens: int = 40
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Format search results into a context string that fits a token budget.
+        
+        Consecutive chunks of the same document are merged first. The best
+        result always goes in; the rest are added by score per token while
+        they fit. A result that does not fit is trimmed to the window of
+        sentences that mentions the query most, if at least `min_trim_tokens`
+        are left for it. Sources are listed best first, with one-line
+        citation headers instead of decorated blocks. Token counts are
+        local estimates (tokens.estimate_tokens).
+        
+        Args:
+            search_results: List of search results with text, score, metadata
+            token_budget: Maximum tokens for the whole context string
+            query: The user's question, used to pick sentences when trimming
+            min_score: Minimum similarity score to include
+            max_sources: Maximum number of sources to include (None = as many as fit)
+            min_trim_tokens: Smallest trimmed excerpt worth including
+        
+        Returns:
+            (context string, report with tokens_used, token_budget, sources,
+            candidates, merged, trimmed and dropped counts)
+        """
+        candidates = [
+            r for r in search_results
+            if r.get('score', 0) >= min_score and r.get('text', '').strip()
+        ]
+        groups = PromptTemplates._merge_adjacent(candidates)
+        report = {
+            'tokens_used': 0,
+            'token_budget': token_budget,
+            'sources': 0,
+            'candidates': len(candidates),
+            'merged': len(candidates) - len(groups),
+            'trimmed': 0,
+            'dropped': 0,
+        }
+        if not groups:
+            return "", report
+
+        heading = "Relevant information from AIDA training materials:"
+        footer = "Cite these sources in your answer as [Source 1], [Source 2], etc."
+
+        def source_header(number: int, group: Dict[str, Any]) -> str:
+            metadata = group['metadata']
+            header = f"[Source {number}] {metadata.get('filename') or metadata.get('title') or 'Unknown source'}"
+            pages = PromptTemplates.format_pages(metadata)
+            if pages:
+                header += f", p. {pages}"
+            also_in = PromptTemplates.format_also_in(metadata)
+            if also_in:
+                header += f" (also in: {also_in})"
+            return header
+
+        terms = PromptTemplates._query_terms(query)
+        remaining = token_budget - estimate_tokens(heading) - estimate_tokens(footer)
+        ranked = sorted(groups, key=lambda g: g['score'], reverse=True)
+        # The best evidence first, then whatever buys the most relevance per token
+        order = ranked[:1] + sorted(
+            ranked[1:], key=lambda g: g['score'] / max(1, estimate_tokens(g['text'])), reverse=True
+        )
+        chosen = []
+        for group in order:
+            if max_sources is not None and len(chosen) >= max_sources:
+                report['dropped'] += 1
+                continue
+            header_tokens = estimate_tokens(source_header(len(chosen) + 1, group))
+            text = group['text'].strip()
+            cost = header_tokens + estimate_tokens(text)
+            if cost > remaining:
+                allowance = remaining - header_tokens
+                text = (
+                    PromptTemplates._sentence_window(text, terms, allowance)
+                    if allowance >= min_trim_tokens else None
+                )
+                if text is None:
+                    report['dropped'] += 1
+                    continue
+                report['trimmed'] += 1
+                cost = header_tokens + estimate_tokens(text)
+            remaining -= cost
+            chosen.append((group, text))
+
+        if not chosen:
+            return "", report
+
+        chosen.sort(key=lambda item: item[0]['score'], reverse=True)
+        parts = [heading]
+        for number, (group, text) in enumerate(chosen, 1):
+            parts.append(f"\n{source_header(number, group)}\n{text}")
+        parts.append(f"\n{footer}")
+        context = "\n".join(parts)
+        report['sources'] = len(chosen)
+        report['tokens_used'] = estimate_tokens(context)
+        return context, report
+
     @staticmethod
     def format_context(
         search_results: List[Dict[str, Any]], 
         max_sources: int = 3,
         min_score: float = 0.3,
-        structured_citations: bool = True
+        structured_citations: bool = True,
+        token_budget: Optional[int] = None,
+        query: str = ""
     ) -> str:
         """
         Format search results into context string with structured citations.
@@ -70,12 +314,18 @@ Guidelines:
             max_sources: Maximum number of sources to include
             min_score: Minimum similarity score to include (default 0.3)
             structured_citations: Whether to include rich citation metadata
+            token_budget: Pack sources into this many tokens instead (see pack_context)
+            query: The user's question, used when trimming to a token budget
         
         Returns:
             Formatted context string with citation information
         """
         if not search_results:
             return ""
+        if token_budget is not None:
+            return PromptTemplates.pack_context(
+                search_results, token_budget, query=query, min_score=min_score, max_sources=max_sources
+            )[0]
         
         context_parts = ["📚 Relevant information from AIDA training materials:\n"]
         
@@ -94,6 +344,8 @@ Guidelines:
             metadata = result.get('metadata', {})
             filename = metadata.get('filename', 'Unknown source')
             chunk_index = metadata.get('chunk_index', 'N/A')
+            pages = PromptTemplates.format_pages(metadata)
+            also_in = PromptTemplates.format_also_in(metadata)
             text = result.get('text', '')
             
             if structured_citations:
@@ -101,6 +353,10 @@ Guidelines:
                 context_parts.append(f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
                 context_parts.append(f"[Source {source_count}]")
                 context_parts.append(f"📄 Document: {filename}")
+                if pages:
+                    context_parts.append(f"📖 Page: {pages}")
+                if also_in:
+                    context_parts.append(f"📑 Also in: {also_in}")
                 context_parts.append(f"🔍 Relevance: {score:.2%}")
                 context_parts.append(f"📍 Chunk: {chunk_index}")
                 context_parts.append(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
@@ -121,6 +377,32 @@ Guidelines:
         
         return "\n".join(context_parts)
     
+    # Appended to every template when citations are enforced and there is context to cite
+    CITATION_REQUIREMENT = (
+        "⚠️  CITATION REQUIREMENT: You MUST cite sources when using information from the materials below."
+    )
+    # Appended instead when nothing was retrieved
+    NO_CONTEXT_NOTE = (
+        "📝 Note: No specific manual references found. Provide general guidance based on freediving knowledge."
+        "\nClearly state that you're providing general guidance without specific manual references."
+    )
+    # Precomputed static prefixes by (template, enforce_citations, has_context)
+    SYSTEM_PREFIXES = _system_prefixes(SYSTEM_PROMPTS, CITATION_REQUIREMENT, NO_CONTEXT_NOTE)
+
+    @staticmethod
+    def system_prefix(template: str = "default", enforce_citations: bool = True, has_context: bool = True) -> str:
+        """
+        The static start of a template's system message (see SYSTEM_PREFIXES).
+        
+        It is byte-identical across requests, so the provider's prompt cache
+        can reuse its prefill; everything request-specific follows it.
+        Messages with retrieved context carry the citation requirement, ones
+        without carry the no-context note instead.
+        """
+        if template not in PromptTemplates.SYSTEM_PROMPTS:
+            template = "default"
+        return PromptTemplates.SYSTEM_PREFIXES[(template, enforce_citations and has_context, has_context)]
+
     @staticmethod
     def build_system_message(
         template: str = "default",
@@ -131,6 +413,10 @@ Guidelines:
         """
         Build the complete system message with citation requirements.
         
+        Layout: the template's static prefix (with the citation requirement,
+        or the no-context note when there is no context), then custom
+        instructions, then the retrieved context last.
+        
         Args:
             template: Which system prompt template to use
             context: Retrieved context from vector search
@@ -140,24 +426,17 @@ Guidelines:
         Returns:
             Complete system message
         """
-        # Get base system prompt
-        system_prompt = PromptTemplates.SYSTEM_PROMPTS.get(template, PromptTemplates.SYSTEM_PROMPTS["default"])
-        
-        # Add context if available
-        if context:
-            system_prompt += f"\n\n{context}"
-            
-            if enforce_citations:
-                system_prompt += "\n\n⚠️  CITATION REQUIREMENT: You MUST cite sources when using information from the materials above."
-        else:
-            system_prompt += "\n\n📝 Note: No specific manual references found. Provide general guidance based on freediving knowledge."
-            system_prompt += "\nClearly state that you're providing general guidance without specific manual references."
+        parts = [PromptTemplates.system_prefix(template, enforce_citations, has_context=bool(context))]
         
         # Add custom instructions
         if custom_instructions:
-            system_prompt += f"\n\n💡 Additional Instructions:\n{custom_instructions}"
+            parts.append(f"💡 Additional Instructions:\n{custom_instructions}")
+        
+        # Retrieved context goes last - it changes with every question
+        if context:
+            parts.append(context)
         
-        return system_prompt
+        return "\n\n".join(parts)
     
     @staticmethod
     def build_rag_prompt(
@@ -168,7 +447,8 @@ Guidelines:
         min_score: float = 0.3,
         structured_citations: bool = True,
         enforce_citations: bool = True,
-        custom_instructions: Optional[str] = None
+        custom_instructions: Optional[str] = None,
+        token_budget: Optional[int] = None
     ) -> Tuple[str, str]:
         """
         Build complete RAG prompt with structured citations.
@@ -182,6 +462,7 @@ Guidelines:
             structured_citations: Whether to use rich citation format
             enforce_citations: Whether to require AI to cite sources
             custom_instructions: Additional custom instructions
+            token_budget: Pack the context into this many tokens (see pack_context)
         
         Returns:
             Tuple of (system_message, user_message)
@@ -191,7 +472,9 @@ Guidelines:
             search_results, 
             max_sources=max_sources,
             min_score=min_score,
-            structured_citations=structured_citations
+            structured_citations=structured_citations,
+            token_budget=token_budget,
+            query=user_query
         )
         
         # Build system message with context and citation requirements
@@ -258,10 +541,12 @@ Guidelines:
             metadata = result.get('metadata', {})
             filename = metadata.get('filename', 'Unknown')
             chunk_index = metadata.get('chunk_index', 'N/A')
+            pages = PromptTemplates.format_pages(metadata)
             score = result.get('score', 0)
+            location = f"p. {pages}" if pages else f"Chunk {chunk_index}"
             
             references.append(
-                f"[{i}] {filename} (Chunk {chunk_index}, Relevance: {score:.0%})"
+                f"[{i}] {filename} ({location}, Relevance: {score:.0%})"
             )
         
         return "\n".join(references) if len(references) > 1 else ""
@@ -0,0 +1,312 @@
+"""RAG statistics - constant-memory streaming aggregates for retrieval quality and usage."""
+
+import heapq
+import json
+import math
+import os
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class RunningStats:
+    """Running count, mean, variance, min and max (Welford's algorithm) in O(1) memory."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine another aggregate into this one (Chan et al. parallel update)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style).
+
+    Values are counted in logarithmic buckets, so any quantile is reported
+    within `relative_accuracy` of its true value. Memory is capped at
+    `max_buckets`; beyond that the smallest buckets are collapsed together.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of the bucket's range
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def _collapse(self, buckets: Dict[int, int]) -> None:
+        while len(buckets) > self.max_buckets:
+            lowest, second = heapq.nsmallest(2, buckets)
+            buckets[second] += buckets.pop(lowest)
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.count += count
+        if value > self.min_value:
+            buckets = self._positive
+            index = self._index(value)
+        elif value < -self.min_value:
+            buckets = self._negative
+            index = self._index(-value)
+        else:
+            self.zero_count += count
+            return
+        buckets[index] = buckets.get(index, 0) + count
+        if len(buckets) > self.max_buckets:
+            self._collapse(buckets)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's counts (both must use the same relative accuracy)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Can only merge sketches with the same relative accuracy")
+        for mine, theirs in ((self._positive, other._positive), (self._negative, other._negative)):
+            for index, count in theirs.items():
+                mine[index] = mine.get(index, 0) + count
+            self._collapse(mine)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the approximate q-quantile (0 <= q <= 1), or None if empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for index in sorted(self._negative, reverse=True):
+            seen += self._negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self._positive):
+            seen += self._positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self._positive))
+
+    def __len__(self) -> int:
+        return len(self._positive) + len(self._negative)
+
+
+class TimeBucketedCounter:
+    """Counts events per fixed time bucket, keeping only the most recent `num_buckets` buckets."""
+
+    def __init__(self, bucket_seconds: int = 60, num_buckets: int = 1440):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: Deque[List[int]] = deque(maxlen=num_buckets)  # [bucket_start, count]
+
+    def add(self, count: int = 1, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        start = int(now // self.bucket_seconds) * self.bucket_seconds
+        if self._buckets and self._buckets[-1][0] == start:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([start, count])
+
+    def series(self) -> List[Dict[str, Any]]:
+        return [
+            {"timestamp": datetime.fromtimestamp(start).isoformat(), "count": count}
+            for start, count in self._buckets
+        ]
+
+
+class RAGStatistics:
+    """
+    Retrieval quality and usage statistics with flat memory and O(1) updates.
+
+    Replaces ever-growing lists of scores and query timestamps with running
+    moments, a quantile sketch, a ring buffer of recent queries and per-minute
+    counters. Only `source_usage` grows, and only with the number of distinct sources.
+    """
+
+    def __init__(self, recent_size: int = 100, bucket_seconds: int = 60, num_buckets: int = 1440):
+        self.total_queries = 0
+        self.total_documents_retrieved = 0
+        self.similarity_method_usage: Counter = Counter({"cosine": 0, "euclidean": 0})
+        self.source_usage: Counter = Counter()
+        self.scores = RunningStats()
+        self.score_sketch = QuantileSketch()
+        self.recent_queries: Deque[Dict[str, Any]] = deque(maxlen=recent_size)
+        self.queries_over_time = TimeBucketedCounter(bucket_seconds, num_buckets)
+        # Bumped on every update so snapshots know when to rebuild
+        self.version = 0
+
+    def record(self, search_results: List[Dict[str, Any]], similarity_method: str, now: Optional[float] = None) -> None:
+        """Update statistics with one query's search results."""
+        now = time.time() if now is None else now
+        self.version += 1
+        self.total_queries += 1
+        self.total_documents_retrieved += len(search_results)
+        self.similarity_method_usage[similarity_method] += 1
+
+        # Track query timestamp
+        self.recent_queries.append({
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "num_results": len(search_results)
+        })
+        self.queries_over_time.add(now=now)
+
+        # Track relevance scores and source usage
+        for result in search_results:
+            score = result.get("score", 0.0)
+            self.scores.add(score)
+            self.score_sketch.add(score)
+
+            # Track source from metadata
+            metadata = result.get("metadata", {})
+            source = metadata.get("source", "unknown")
+            if source and source != "unknown":
+                # Extract filename from path
+                source_name = os.path.basename(source) if "/" in source or "\\" in source else source
+                self.source_usage[source_name] += 1
+
+    @property
+    def avg_relevance_score(self) -> float:
+        return self.scores.mean
+
+    def top_sources(self, n: int = 5) -> List[Tuple[str, int]]:
+        """The n most frequently retrieved sources (partial selection, no full sort)."""
+        return heapq.nlargest(n, self.source_usage.items(), key=lambda item: item[1])
+
+    def score_percentiles(self) -> Dict[str, Optional[float]]:
+        percentiles = {}
+        for q in (0.5, 0.9, 0.99):
+            value = self.score_sketch.quantile(q)
+            percentiles[f"p{int(q * 100)}"] = round(value, 3) if value is not None else None
+        return percentiles
+
+
+class PromptCacheStats:
+    """
+    Prompt and cached-prompt token totals per template, from completion usage data.
+
+    Providers reuse the prefill of a prompt prefix they have seen recently;
+    `cached_tokens` is how much of each prompt was served that way.
+    """
+
+    def __init__(self):
+        self.requests: Counter = Counter()
+        self.cache_hits: Counter = Counter()
+        self.prompt_tokens: Counter = Counter()
+        self.cached_tokens: Counter = Counter()
+        self.completion_tokens: Counter = Counter()
+        self.version = 0
+
+    def record(self, template: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        self.version += 1
+        self.requests[template] += 1
+        self.cache_hits[template] += cached_tokens > 0
+        self.prompt_tokens[template] += prompt_tokens
+        self.cached_tokens[template] += cached_tokens
+        self.completion_tokens[template] += completion_tokens
+
+    @staticmethod
+    def _summary(requests: int, hits: int, prompt: int, cached: int, completion: int) -> Dict[str, Any]:
+        return {
+            "requests": requests,
+            "requests_with_cache_hits": hits,
+            "prompt_tokens": prompt,
+            "cached_tokens": cached,
+            "completion_tokens": completion,
+            "cached_ratio": round(cached / prompt, 3) if prompt else 0.0,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        counters = (self.requests, self.cache_hits, self.prompt_tokens, self.cached_tokens, self.completion_tokens)
+        return {
+            **self._summary(*(sum(counter.values()) for counter in counters)),
+            "by_template": {
+                template: self._summary(*(counter[template] for counter in counters))
+                for template in self.requests
+            },
+        }
+
+
+class VersionedSnapshot:
+    """
+    A pre-serialized payload that is rebuilt only when its version changes.
+
+    Readers get the cached JSON body and an ETag derived from the version, so
+    repeated polls cost a version comparison (or a 304) instead of a rebuild.
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], version: Callable[[], Hashable]):
+        """
+        Args:
+            build: Produces the payload from live statistics
+            version: Cheap function whose result changes whenever the payload would
+        """
+        self._build = build
+        self._version = version
+        self._built_version: Any = None
+        # ETags must not repeat across restarts, when counters start over
+        self._boot_id = uuid.uuid4().hex[:8]
+        self.etag = ""
+        self.payload: Dict[str, Any] = {}
+        self.body = b""
+
+    def get(self) -> Tuple[str, Dict[str, Any], bytes]:
+        """Return (etag, payload, json_body), rebuilding only if the version moved."""
+        version = self._version()
+        if version != self._built_version or not self.etag:
+            self.payload = self._build()
+            self.body = json.dumps(self.payload).encode()
+            self.etag = f'"{self._boot_id}-{abs(hash(version)):x}"'
+            self._built_version = version
+        return self.etag, self.payload, self.body
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header matches the current ETag."""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or self.etag in candidates
+
+
+def snapshot_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Top-level keys whose values changed between two snapshots."""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
@@ -0,0 +1,169 @@
+"""Model routing - pick the chat model per request from cheap local signals."""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .rag_stats import QuantileSketch
+from .settings import env_float, env_int, env_str
+from .tokens import estimate_tokens
+
+# Questions asking for a fact or a definition
+SIMPLE_PATTERNS = (
+    r"^(what|who) (is|are|was|does) ", r"^define\b", r"\bdefinition of\b", r"\bmeaning of\b",
+    r"\bstand for\b", r"\bwhat does .+ mean\b", r"^(how (deep|long|many|much)|when|where) ",
+)
+# Questions that need reasoning, comparison or a plan
+COMPLEX_PATTERNS = (
+    r"\bwhy\b", r"\bexplain\b", r"\bcompare\b", r"\bcomparison\b", r"\bdifference between\b",
+    r"\bversus\b", r"\bvs\.?\b", r"\bpros and cons\b", r"\btrade-?offs?\b", r"\bstep[- ]by[- ]step\b",
+    r"\b(plan|program|programme|schedule|routine)\b", r"\bhow (should|would|can) i\b",
+    r"\bphysiolog", r"\bmechanism\b", r"\bwhat happens\b", r"\banaly[sz]e\b",
+)
+
+
+def cosine_equivalent(score: float, similarity_method: str) -> float:
+    """
+    Express a search score on the cosine scale, so one set of thresholds fits both methods.
+
+    Euclidean scores are 1 / (1 + distance); for unit-length embeddings the
+    distance d and cosine similarity are related by cos = 1 - d² / 2.
+    """
+    if similarity_method != "euclidean" or score <= 0:
+        return score
+    distance = 1 / score - 1
+    return 1 - distance * distance / 2
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The model chosen for one request, and why."""
+    model: str
+    route: str   # fast, default, strong or explicit
+    reason: str
+
+
+@dataclass
+class ModelRouter:
+    """
+    Chooses fast, default or strong model for a chat request.
+
+    Rules are checked in order, first match wins:
+      1. template in `strong_templates`      -> strong
+      2. reasoning keywords (why, compare..)  -> strong
+      3. query longer than `long_query_tokens` -> strong
+      4. definitional keywords or a query of at most `short_query_tokens`,
+         with a top retrieval score of at least `confident_score` -> fast
+      5. otherwise                             -> default
+
+    A fast answer must be grounded in well-matching context; when retrieval is
+    weak the default model answers instead.
+    """
+    fast_model: str = "gpt-4.1-nano"
+    default_model: str = "gpt-4.1-mini"
+    strong_model: str = "gpt-4.1"
+    strong_templates: Sequence[str] = ("advanced",)
+    short_query_tokens: int = 12
+    long_query_tokens: int = 60
+    confident_score: float = 0.5
+
+    def __post_init__(self):
+        self._simple = re.compile("|".join(SIMPLE_PATTERNS))
+        self._complex = re.compile("|".join(COMPLEX_PATTERNS))
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Build a router from CHAT_ROUTER_* environment variables."""
+        templates = env_str("CHAT_ROUTER_STRONG_TEMPLATES", ",".join(cls.strong_templates))
+        return cls(
+            fast_model=env_str("CHAT_ROUTER_FAST_MODEL", cls.fast_model),
+            default_model=env_str("CHAT_ROUTER_DEFAULT_MODEL", cls.default_model),
+            strong_model=env_str("CHAT_ROUTER_STRONG_MODEL", cls.strong_model),
+            strong_templates=tuple(t.strip() for t in templates.split(",") if t.strip()),
+            short_query_tokens=env_int("CHAT_ROUTER_SHORT_QUERY_TOKENS", cls.short_query_tokens),
+            long_query_tokens=env_int("CHAT_ROUTER_LONG_QUERY_TOKENS", cls.long_query_tokens),
+            confident_score=env_float("CHAT_ROUTER_CONFIDENT_SCORE", cls.confident_score),
+        )
+
+    def classify(self, query: str) -> Optional[str]:
+        """Keyword classifier: "complex", "simple", or None when neither matches."""
+        text = " ".join(query.lower().split())
+        if self._complex.search(text):
+            return "complex"
+        if self._simple.search(text):
+            return "simple"
+        return None
+
+    def route(
+        self,
+        query: str,
+        template: str,
+        search_results: List[Dict[str, Any]],
+        similarity_method: str = "cosine",
+    ) -> RouteDecision:
+        """
+        Pick a model for one request.
+
+        Args:
+            query: The user's message
+            template: Prompt template in use
+            search_results: Retrieved chunks (with 'score'), best first
+            similarity_method: How the scores were computed (cosine or euclidean)
+
+        Returns:
+            RouteDecision with the model, the route and the rule that matched
+        """
+        if template in self.strong_templates:
+            return RouteDecision(self.strong_model, "strong", f"{template} template")
+        kind = self.classify(query)
+        if kind == "complex":
+            return RouteDecision(self.strong_model, "strong", "reasoning keywords")
+        tokens = estimate_tokens(query)
+        if tokens > self.long_query_tokens:
+            return RouteDecision(self.strong_model, "strong", "long query")
+
+        top_score = max(
+            (cosine_equivalent(r["score"], similarity_method) for r in search_results), default=0.0
+        )
+        if kind == "simple" or tokens <= self.short_query_tokens:
+            if top_score >= self.confident_score:
+                return RouteDecision(
+                    self.fast_model, "fast", "definitional" if kind == "simple" else "short query"
+                )
+            return RouteDecision(self.default_model, "default", "weak retrieval")
+        return RouteDecision(self.default_model, "default", "no rule matched")
+
+
+class RouteStats:
+    """Routing decisions and time to first token per route, in constant memory."""
+
+    def __init__(self):
+        self.routes: Counter = Counter()
+        self.models: Counter = Counter()
+        self.reasons: Counter = Counter()
+        self.ttft: Dict[str, QuantileSketch] = {}
+        self.version = 0
+
+    def record(self, decision: RouteDecision) -> None:
+        self.version += 1
+        self.routes[decision.route] += 1
+        self.models[decision.model] += 1
+        self.reasons[f"{decision.route}: {decision.reason}"] += 1
+
+    def observe_ttft(self, decision: RouteDecision, seconds: float) -> None:
+        """Record pipeline start -> first token for a routed request."""
+        self.version += 1
+        self.ttft.setdefault(decision.route, QuantileSketch()).add(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        def percentiles(sketch: QuantileSketch) -> Dict[str, float]:
+            return {f"p{int(q * 100)}": round(sketch.quantile(q), 3) for q in (0.5, 0.9)}
+
+        return {
+            "requests": sum(self.routes.values()),
+            "routes": dict(self.routes),
+            "models": dict(self.models),
+            "reasons": dict(self.reasons),
+            "ttft_seconds": {route: percentiles(sketch) for route, sketch in self.ttft.items()},
+        }
@@ -0,0 +1,240 @@
+"""Semantic answer cache - replays answers to paraphrased questions."""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+CacheKey = Tuple[str, str, str]  # (template, model, similarity_method)
+
+_UNSET = object()
+
+
+def _exact_text(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class CacheEntry:
+    """One cached answer and the query embedding it was produced for."""
+    entry_id: int
+    key: CacheKey
+    query: str
+    chunks: List[str]
+    created_at: float
+    hits: int = 0
+
+    @property
+    def answer(self) -> str:
+        return "".join(self.chunks)
+
+
+@dataclass
+class _Partition:
+    """Entries sharing a cache key, with their normalized query embeddings stacked in a matrix."""
+    entry_ids: List[int] = field(default_factory=list)
+    matrix: Optional[np.ndarray] = None
+
+    def add(self, entry_id: int, vector: np.ndarray) -> None:
+        self.entry_ids.append(entry_id)
+        row = vector.reshape(1, -1)
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+
+    def remove(self, entry_id: int) -> None:
+        position = self.entry_ids.index(entry_id)
+        self.entry_ids.pop(position)
+        self.matrix = np.delete(self.matrix, position, axis=0) if self.entry_ids else None
+
+
+class SemanticCache:
+    """
+    In-memory cache of chat answers, looked up by query-embedding similarity.
+
+    Entries are partitioned by (template, model, similarity_method); a lookup
+    computes cosine similarity between the query and every cached query in its
+    partition with one matrix-vector product. Entries expire after a TTL, the
+    least recently used entry is evicted once the cache is full, and everything
+    is dropped when the vector store's index version changes.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity between queries to count as a hit
+            max_entries: Maximum number of cached answers (LRU eviction beyond this)
+            ttl_seconds: Seconds an answer stays valid (0 disables expiry)
+            clock: Time source, injectable for tests
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()  # LRU order, oldest first
+        self._partitions: Dict[CacheKey, _Partition] = {}
+        # (key, case/whitespace-normalized query) -> entry id, for embedding-free probes
+        self._exact: Dict[Tuple[CacheKey, str], int] = {}
+        self._ids = itertools.count()
+        self._index_version: Any = _UNSET
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Bumped when entries are stored, evicted or cleared so stats snapshots know when
+        # to rebuild; not on lookups, which would rebuild them after every chat
+        self.version = 0
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, index_version: Any) -> None:
+        if index_version != self._index_version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self._index_version = index_version
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.created_at > self.ttl_seconds
+
+    def _evict_expired(self, entry_ids: List[int], now: float) -> None:
+        for entry_id in [i for i in entry_ids if self._expired(self._entries[i], now)]:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id: int) -> None:
+        self.version += 1
+        entry = self._entries.pop(entry_id)
+        exact_key = (entry.key, _exact_text(entry.query))
+        if self._exact.get(exact_key) == entry_id:
+            del self._exact[exact_key]
+        partition = self._partitions[entry.key]
+        partition.remove(entry_id)
+        if not partition.entry_ids:
+            del self._partitions[entry.key]
+
+    def contains(self, key: CacheKey, query: str, index_version: Any = None) -> bool:
+        """
+        Cheap check (no embedding) whether this exact question has a live cached answer.
+
+        Does not count as a lookup; used to route likely cache hits ahead of generations.
+        """
+        if index_version != self._index_version:
+            return False
+        entry_id = self._exact.get((key, _exact_text(query)))
+        if entry_id is None:
+            return False
+        return not self._expired(self._entries[entry_id], self.clock())
+
+    def lookup(self, key: CacheKey, query_vector: np.ndarray, index_version: Any = None) -> Optional[CacheEntry]:
+        """
+        Find a cached answer for a query similar enough to this one.
+
+        Args:
+            key: (template, model, similarity_method)
+            query_vector: Embedding of the incoming query
+            index_version: Current vector store index version
+
+        Returns:
+            The best matching entry, or None on a miss
+        """
+        self._check_version(index_version)
+        partition = self._partitions.get(key)
+        if partition is not None:
+            # Drop expired answers first, so a stale best match cannot hide a live one
+            self._evict_expired(partition.entry_ids, self.clock())
+            partition = self._partitions.get(key)
+        if partition is None:
+            self.misses += 1
+            return None
+
+        similarities = partition.matrix @ self._normalize(query_vector)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        entry = self._entries[partition.entry_ids[best]]
+        entry.hits += 1
+        self.hits += 1
+        self._entries.move_to_end(entry.entry_id)
+        return entry
+
+    def store(
+        self,
+        key: CacheKey,
+        query: str,
+        query_vector: np.ndarray,
+        chunks: List[str],
+        index_version: Any = None
+    ) -> Optional[CacheEntry]:
+        """Cache a completed answer (as the chunks it was streamed in)."""
+        if not chunks or self.max_entries <= 0:
+            return None
+        if self._index_version is _UNSET:
+            self._index_version = index_version
+        elif index_version != self._index_version:
+            # The index changed while this answer was generated - it may cite stale context
+            return None
+
+        self.version += 1
+        now = self.clock()
+        self._evict_expired(list(self._entries), now)
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+        entry = CacheEntry(entry_id=next(self._ids), key=key, query=query, chunks=list(chunks), created_at=now)
+        self._entries[entry.entry_id] = entry
+        self._partitions.setdefault(key, _Partition()).add(entry.entry_id, self._normalize(query_vector))
+        self._exact[(key, _exact_text(query))] = entry.entry_id
+        return entry
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self.version += 1
+        self._entries.clear()
+        self._partitions.clear()
+        self._exact.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by cached embeddings and answers."""
+        matrices = sum(p.matrix.nbytes for p in self._partitions.values() if p.matrix is not None)
+        answers = sum(len(c) for e in self._entries.values() for c in e.chunks)
+        return matrices + answers
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "threshold": self.threshold,
+        }
+
+
+async def replay(chunks: List[str]) -> AsyncIterator[str]:
+    """Stream a cached answer back chunk by chunk, like a live generation."""
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(0)
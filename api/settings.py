@@ -0,0 +1,41 @@
+"""Runtime settings helpers - read tunables from environment variables."""
+
+import os
+
+
+def env_str(name: str, default: str) -> str:
+    """Read a string setting, falling back to default when unset or blank."""
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to default when unset or invalid."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"⚠️  Invalid integer for {name}={value!r}, using {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to default when unset or invalid."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"⚠️  Invalid number for {name}={value!r}, using {default}")
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/true/yes/on), falling back to default when unset."""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,161 @@
+"""Single-flight deduplication - identical concurrent requests share one upstream pipeline."""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a user message for request deduplication (case, whitespace, trailing punctuation)."""
+    return " ".join(message.lower().split()).rstrip("?!. ")
+
+
+class Flight:
+    """
+    One in-flight pipeline run whose output is fanned out to every subscriber.
+
+    The producer runs in its own task so no single client owns it. Every chunk
+    is buffered, so subscribers that join late first get the prefix replayed.
+    When the last subscriber leaves before the run finishes, the producer is
+    cancelled (which closes the upstream LLM stream). An error raised after
+    the first chunk is re-raised in every subscriber's stream, so nobody
+    mistakes a truncated answer for a complete one.
+    """
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        # Response details set by the producer before its first chunk (e.g. cache status)
+        self.info: Dict[str, str] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, factory: Callable[["Flight"], AsyncIterator[str]], on_done: Callable[[], None]) -> None:
+        async def produce() -> None:
+            try:
+                async for chunk in factory(self):
+                    self.chunks.append(chunk)
+                    self._notify()
+            except asyncio.CancelledError:
+                self.error = asyncio.CancelledError()
+            except Exception as e:
+                self.error = e
+            finally:
+                self.done = True
+                self._notify()
+                on_done()
+
+        self._task = asyncio.create_task(produce())
+
+    def _notify(self) -> None:
+        wake, self._wake = self._wake, asyncio.Event()
+        wake.set()
+
+    def _leave(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers <= 0 and not self.done and self._task is not None:
+            # Nobody is listening any more - stop paying for generation
+            self._task.cancel()
+
+
+class Subscription:
+    """One subscriber's view of a flight."""
+
+    def __init__(self, flight: Flight, leader: bool):
+        self.flight = flight
+        self.leader = leader
+        self._left = False
+
+    async def ready(self) -> None:
+        """
+        Wait until the flight produced its first chunk or finished.
+
+        Raises the producer's exception if it failed before producing output,
+        so callers can still turn it into a proper error response.
+        """
+        flight = self.flight
+        try:
+            while not flight.chunks and not flight.done:
+                await flight._wake.wait()
+        except BaseException:
+            self.leave()
+            raise
+        if not flight.chunks and flight.error is not None:
+            self.leave()
+            raise flight.error
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Yield the buffered prefix, then live chunks until the flight finishes (or raise its error)."""
+        flight = self.flight
+        position = 0
+        try:
+            while True:
+                while position < len(flight.chunks):
+                    yield flight.chunks[position]
+                    position += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight._wake.wait()
+        finally:
+            self.leave()
+
+    def leave(self) -> None:
+        if not self._left:
+            self._left = True
+            self.flight._leave()
+
+
+class SingleFlight:
+    """Registry of in-flight pipelines keyed by request identity."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Flight] = {}
+        self.started = 0
+        self.joined = 0
+        # Bumped whenever a flight starts, is joined or finishes
+        self.version = 0
+
+    def subscribe(self, key: Hashable, factory: Callable[[Flight], AsyncIterator[str]]) -> Subscription:
+        """
+        Join the flight for `key`, starting it with `factory` if none is running.
+
+        Args:
+            key: Request identity (identical requests share a key)
+            factory: Called with the new flight; returns the pipeline's chunk iterator
+
+        Returns:
+            A subscription to the (new or existing) flight
+        """
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = Flight(key)
+            self._flights[key] = flight
+
+            def on_done(flight: Flight = flight) -> None:
+                self.version += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.start(factory, on_done)
+            self.started += 1
+        else:
+            self.joined += 1
+
+        self.version += 1
+        flight.subscribers += 1
+        return Subscription(flight, leader)
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "deduplicated": self.joined,
+        }
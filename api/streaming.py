@@ -0,0 +1,180 @@
+"""Streaming helpers - per-stage deadlines and disconnect-aware token relay."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from starlette.requests import Request
+
+from .settings import env_float
+
+T = TypeVar("T")
+
+
+@dataclass
+class PipelineDeadlines:
+    """
+    Deadlines (seconds) for each stage of the chat pipeline.
+
+    A value of 0 disables the deadline for that stage.
+    """
+    embedding: float = 10.0
+    search: float = 5.0
+    first_token: float = 30.0
+    token_idle: float = 30.0
+    disconnect_check_interval: float = 0.25
+
+    @classmethod
+    def from_env(cls) -> "PipelineDeadlines":
+        """Build deadlines from CHAT_* environment variables."""
+        return cls(
+            embedding=env_float("CHAT_EMBEDDING_TIMEOUT", cls.embedding),
+            search=env_float("CHAT_SEARCH_TIMEOUT", cls.search),
+            first_token=env_float("CHAT_FIRST_TOKEN_TIMEOUT", cls.first_token),
+            token_idle=env_float("CHAT_TOKEN_IDLE_TIMEOUT", cls.token_idle),
+            disconnect_check_interval=env_float("CHAT_DISCONNECT_CHECK_INTERVAL", cls.disconnect_check_interval),
+        )
+
+
+class StageTimeoutError(Exception):
+    """Raised when a pipeline stage exceeds its deadline."""
+
+    def __init__(self, stage: str, seconds: float):
+        self.stage = stage
+        self.seconds = seconds
+        super().__init__(f"{stage} stage exceeded its {seconds:g}s deadline")
+
+
+async def with_deadline(awaitable: Awaitable[T], seconds: float, stage: str) -> T:
+    """
+    Await a stage, raising StageTimeoutError if it takes longer than `seconds`.
+
+    Args:
+        awaitable: The stage to run
+        seconds: Deadline in seconds (0 or less disables it)
+        stage: Stage name used in the error message
+
+    Returns:
+        The stage's result
+    """
+    if seconds <= 0:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=seconds)
+    except asyncio.TimeoutError:
+        raise StageTimeoutError(stage, seconds) from None
+
+
+class TokenStream:
+    """Reads content tokens from an OpenAI chat completion stream."""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self._chunks = stream.__aiter__()
+        # Token usage, sent in a final chunk when requested with stream_options={"include_usage": True}
+        self.usage: Any = None
+
+    async def next_token(self) -> Optional[str]:
+        """Return the next non-empty content token, or None when the stream ends."""
+        async for chunk in self._chunks:
+            if getattr(chunk, "usage", None) is not None:
+                self.usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                return chunk.choices[0].delta.content
+        return None
+
+    async def aclose(self) -> None:
+        """Close the upstream HTTP stream so no further tokens are generated or billed."""
+        await self.stream.close()
+
+
+async def open_token_stream(
+    create: Awaitable[Any],
+    first_token_timeout: float
+) -> Tuple[TokenStream, Optional[str]]:
+    """
+    Open a completion stream and wait for its first token under a deadline.
+
+    Waiting for the first token before the HTTP response starts means a slow
+    upstream surfaces as a clean error status instead of a hung, empty body.
+
+    Args:
+        create: The pending `chat.completions.create(..., stream=True)` call
+        first_token_timeout: Time-to-first-token deadline in seconds
+
+    Returns:
+        Tuple of (token_stream, first_token)
+    """
+    async def _first() -> Tuple[TokenStream, Optional[str]]:
+        token_stream = TokenStream(await create)
+        try:
+            return token_stream, await token_stream.next_token()
+        except BaseException:
+            await token_stream.aclose()
+            raise
+
+    return await with_deadline(_first(), first_token_timeout, "first_token")
+
+
+async def relay_tokens(
+    token_stream: TokenStream,
+    first_token: Optional[str],
+    on_complete: Optional[Callable[[List[str]], None]] = None,
+    token_timeout: float = 0
+) -> AsyncIterator[str]:
+    """
+    Relay tokens from an open upstream stream, closing it however the relay ends.
+
+    Args:
+        token_stream: Open upstream stream
+        first_token: Token already read by open_token_stream
+        on_complete: Called with every token once the upstream stream finished normally
+        token_timeout: Longest wait for each further token (0 disables); a stream
+            that stalls mid-answer raises StageTimeoutError("stream")
+    """
+    tokens: List[str] = []
+    try:
+        if first_token:
+            tokens.append(first_token)
+            yield first_token
+
+        while True:
+            token = await with_deadline(token_stream.next_token(), token_timeout, "stream")
+            if token is None:
+                if on_complete is not None:
+                    on_complete(tokens)
+                break
+
+            tokens.append(token)
+            yield token
+    finally:
+        # Runs on normal completion, on early exit, and when the consuming task is cancelled
+        await token_stream.aclose()
+
+
+async def stop_on_disconnect(
+    chunks: AsyncIterator[str],
+    request: Request,
+    check_interval: float = 0.25
+) -> AsyncIterator[str]:
+    """
+    Forward chunks to the client until it disconnects, then close the source.
+
+    Args:
+        chunks: Source of response chunks (closed on exit)
+        request: Incoming request, polled for disconnects between chunks
+        check_interval: Minimum seconds between disconnect polls
+    """
+    last_check = time.monotonic()
+    try:
+        async for chunk in chunks:
+            now = time.monotonic()
+            if now - last_check >= check_interval:
+                last_check = now
+                if await request.is_disconnected():
+                    print("🔌 Client disconnected - stopping stream")
+                    break
+            yield chunk
+    finally:
+        await chunks.aclose()
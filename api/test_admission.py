@@ -0,0 +1,117 @@
+"""Tests for chat admission control."""
+
+import asyncio
+from admission import AdmissionController, AdmissionRejected
+
+
+async def _hold(controller: AdmissionController, log: list, name: str, seconds: float, priority: bool = False):
+    await controller.acquire(priority)
+    log.append(name)
+    await asyncio.sleep(seconds)
+    controller.release(seconds)
+
+
+def test_limits_in_flight_and_queues():
+    print("🧪 Testing admission limits...\n")
+
+    async def scenario():
+        controller = AdmissionController(max_in_flight=2, max_queue=10, queue_timeout=5)
+        peak = 0
+
+        async def job(i):
+            nonlocal peak
+            await controller.acquire()
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+            controller.release()
+
+        await asyncio.gather(*(job(i) for i in range(8)))
+        return controller, peak
+
+    controller, peak = asyncio.run(scenario())
+    assert peak == 2, "Never more than max_in_flight slots in use"
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+    assert controller.admitted == 8
+    print(f"✅ 8 requests served with at most {peak} in flight")
+
+
+def test_sheds_when_queue_full_or_timed_out():
+    print("\n🧪 Testing load shedding...\n")
+
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+
+        try:
+            await controller.acquire()
+            raise AssertionError("Expected queue_full rejection")
+        except AdmissionRejected as e:
+            assert e.status_code == 429 and e.reason == "queue_full" and e.retry_after >= 1
+
+        try:
+            await waiter
+            raise AssertionError("Expected queue_timeout rejection")
+        except AdmissionRejected as e:
+            assert e.status_code == 503 and e.reason == "queue_timeout"
+
+        controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+    assert controller.rejected_queue_full == 1 and controller.rejected_timeout == 1
+    print("✅ Full queue gets 429, queue timeout gets 503, slots are not leaked")
+
+
+def test_priority_lane_goes_first():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5)
+        log = []
+        await controller.acquire()
+        tasks = [
+            asyncio.create_task(_hold(controller, log, "normal-1", 0)),
+            asyncio.create_task(_hold(controller, log, "normal-2", 0)),
+            asyncio.create_task(_hold(controller, log, "cache-hit", 0, priority=True)),
+        ]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+        return log
+
+    log = asyncio.run(scenario())
+    assert log == ["cache-hit", "normal-1", "normal-2"], log
+    print("\n✅ Priority waiters are admitted before normal waiters")
+
+
+def test_run_releases_when_consumer_stops():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+        closed = []
+
+        async def tokens():
+            try:
+                for i in range(100):
+                    yield str(i)
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(True)
+
+        stream = controller.run(tokens)
+        assert await stream.__anext__() == "0"
+        assert controller.in_flight == 1
+        await stream.aclose()
+        return controller, closed
+
+    controller, closed = asyncio.run(scenario())
+    assert closed and controller.in_flight == 0
+    print("\n✅ Abandoned streams close upstream and free their slot")
+
+
+if __name__ == "__main__":
+    test_limits_in_flight_and_queues()
+    test_sheds_when_queue_full_or_timed_out()
+    test_priority_lane_goes_first()
+    test_run_releases_when_consumer_stops()
+    print("\n✅ All admission tests passed!")
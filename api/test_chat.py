@@ -0,0 +1,156 @@
+"""Tests for the composed /api/chat path: admission, semantic cache, single-flight, routing and streaming."""
+
+import asyncio
+import tempfile
+import types
+from pathlib import Path
+
+import httpx
+
+from test_ingest import _prose, _reset, ingest
+from api import app as chat_app
+from api import clients
+from api.admission import AdmissionController
+from api.rag_stats import PromptCacheStats
+from api.routing import ModelRouter, RouteStats
+from api.semantic_cache import SemanticCache
+from api.single_flight import SingleFlight
+
+ANSWER = ["Equalize ", "early ", "and often."]
+
+
+class FakeCompletionStream:
+    """Streams ANSWER once `gate` is set, then a final usage chunk, like stream_options={"include_usage": True}."""
+
+    def __init__(self, gate):
+        self.gate = gate
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        await self.gate.wait()
+        for token in ANSWER:
+            yield types.SimpleNamespace(
+                choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=token))], usage=None
+            )
+        details = types.SimpleNamespace(cached_tokens=64)
+        usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=3, prompt_tokens_details=details)
+        yield types.SimpleNamespace(choices=[], usage=usage)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    """chat.completions of a fake AsyncOpenAI client; answers are held back until `release` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.streams = []
+        self.release = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.streams.append(FakeCompletionStream(self.release))
+        return self.streams[-1]
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=chat_app.app), base_url="http://test")
+
+
+async def _ask(client, message):
+    return await client.post("/api/chat", json={"user_message": message})
+
+
+async def _until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out waiting for the chat pipeline")
+
+
+def test_chat_pipeline():
+    print("🧪 Testing /api/chat end to end...\n")
+    completions = FakeCompletions()
+
+    async def scenario():
+        async with _client() as client:
+            # Identical concurrent requests: one admission slot, one upstream call
+            requests = [asyncio.create_task(_ask(client, "How do I equalize?")) for _ in range(3)]
+            await _until(lambda: completions.calls)
+            await asyncio.sleep(0.05)  # the others join the flight while the answer is held back
+            completions.release.set()
+            shared = await asyncio.gather(*requests)
+
+            # The same question again is replayed from the semantic cache
+            repeat = await _ask(client, "How do I equalize?")
+
+            # A new question holds the only slot; with no queue, the next one is shed
+            completions.release = asyncio.Event()
+            holding = asyncio.create_task(_ask(client, "Why does my mask fog up?"))
+            await _until(lambda: len(completions.calls) == 2)
+            shed = await _ask(client, "What is a safety stop?")
+            completions.release.set()
+            held = await holding
+        return shared, repeat, shed, held
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text(_prose(15, 60))
+        _reset(tmp)
+        asyncio.run(ingest.load_documents_from_data_folder())
+
+        swapped = {
+            "semantic_cache": SemanticCache(threshold=0.92),
+            "single_flight": SingleFlight(),
+            "admission": AdmissionController(max_in_flight=1, max_queue=0),
+            "model_router": ModelRouter(),
+            "route_stats": RouteStats(),
+            "prompt_cache_stats": PromptCacheStats(),
+        }
+        saved = {name: getattr(chat_app, name) for name in swapped}
+        fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        shared_clients, clients._clients = clients._clients, types.SimpleNamespace(async_client=fake_client)
+        for name, value in swapped.items():
+            setattr(chat_app, name, value)
+        try:
+            shared, repeat, shed, held = asyncio.run(scenario())
+        finally:
+            clients._clients = shared_clients
+            for name, value in saved.items():
+                setattr(chat_app, name, value)
+
+    assert [response.status_code for response in shared] == [200] * 3
+    assert all(response.text == "".join(ANSWER) for response in shared)
+    assert sorted(response.headers["X-Single-Flight"] for response in shared) == ["follower", "follower", "leader"]
+    assert all(response.headers["X-Cache"] == "MISS" for response in shared)
+    print("✅ Three identical concurrent requests: one upstream call, one answer streamed to all")
+
+    # Routing: no model in the request, so the router picked one and the upstream call used it
+    route = shared[0].headers["X-Model-Route"]
+    assert route.split(" ")[0] in ("fast", "default", "strong")
+    assert completions.calls[0]["model"] == shared[0].headers["X-Model"]
+    assert sum(swapped["route_stats"].routes.values()) == 2, swapped["route_stats"].routes
+    print(f"✅ X-Model-Route: {route} -> {shared[0].headers['X-Model']}")
+
+    assert repeat.status_code == 200 and repeat.headers["X-Cache"] == "HIT" and repeat.text == "".join(ANSWER)
+    assert len(swapped["semantic_cache"]) == 2 and swapped["semantic_cache"].hits == 1
+    print("✅ Repeated question replayed from the semantic cache without an upstream call")
+
+    assert shed.status_code == 429 and int(shed.headers["Retry-After"]) >= 1
+    assert held.status_code == 200 and len(completions.calls) == 2
+    print(f"✅ Saturated: 429 with Retry-After {shed.headers['Retry-After']}s, upstream not called")
+
+    # Usage from the final stream chunk was recorded once per generation; upstream streams were closed
+    usage = swapped["prompt_cache_stats"].summary()
+    assert (usage["requests"], usage["prompt_tokens"], usage["cached_tokens"]) == (2, 200, 128)
+    assert all(stream.closed for stream in completions.streams)
+    print(f"✅ Usage recorded per generation: {usage['requests']} requests, {usage['cached_tokens']} cached tokens")
+
+
+if __name__ == "__main__":
+    test_chat_pipeline()
+    print("\n✅ All chat tests passed!")
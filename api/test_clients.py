@@ -0,0 +1,92 @@
+"""Tests for the shared, pooled OpenAI clients."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# clients uses package-relative imports, so it is imported as api.clients
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import clients
+from api.clients import ClientSettings, close_clients, current_clients, get_clients, init_clients
+
+
+def test_settings_from_env():
+    print("🧪 Testing client settings...\n")
+    env = {
+        "OPENAI_MAX_CONNECTIONS": "8",
+        "OPENAI_MAX_KEEPALIVE_CONNECTIONS": "4",
+        "OPENAI_KEEPALIVE_EXPIRY": "12.5",
+        "OPENAI_CONNECT_TIMEOUT": "1.5",
+        "OPENAI_READ_TIMEOUT": "45",
+        "OPENAI_WRITE_TIMEOUT": "",
+        "OPENAI_POOL_TIMEOUT": "soon",
+        "OPENAI_MAX_RETRIES": "0",
+    }
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        settings = ClientSettings.from_env()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+
+    assert settings == ClientSettings(
+        max_connections=8, max_keepalive_connections=4, keepalive_expiry=12.5, connect_timeout=1.5,
+        read_timeout=45.0, write_timeout=ClientSettings.write_timeout, pool_timeout=ClientSettings.pool_timeout,
+        max_retries=0,
+    )
+    limits, timeout = settings.limits(), settings.timeout()
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (8, 4, 12.5)
+    assert (timeout.connect, timeout.read, timeout.write, timeout.pool) == (1.5, 45.0, 10.0, 10.0)
+    print("✅ OPENAI_* settings parsed; blank or invalid values fall back to defaults")
+
+
+def test_init_and_close_are_idempotent():
+    print("\n🧪 Testing the shared client lifecycle...\n")
+    settings = ClientSettings(max_connections=3, max_retries=0)
+
+    async def lifecycle():
+        first = init_clients(api_key="sk-test", settings=settings)
+        again = init_clients(api_key="sk-other")
+        shared = get_clients()
+        await close_clients()
+        closed = current_clients()
+        await close_clients()
+        return first, again, shared, closed
+
+    asyncio.run(close_clients())  # start from no shared client
+    first, again, shared, closed = asyncio.run(lifecycle())
+    assert first is again is shared and first.api_key == "sk-test"
+    assert first.async_client.max_retries == 0 and first.async_client.is_closed()
+    assert closed is None and clients._clients is None
+    print("✅ init_clients returns the one shared client; close_clients closes it once and can repeat")
+
+    # A later start creates a fresh client rather than reusing the closed one
+    recreated = init_clients(api_key="sk-test", settings=settings)
+    try:
+        assert recreated is not first and not recreated.async_client.is_closed()
+    finally:
+        asyncio.run(close_clients())
+
+    saved_key = os.environ.pop("OPENAI_API_KEY", None)
+    try:
+        init_clients()
+        raise AssertionError("creating clients without an API key must fail")
+    except ValueError as e:
+        assert "OPENAI_API_KEY" in str(e)
+    finally:
+        if saved_key is not None:
+            os.environ["OPENAI_API_KEY"] = saved_key
+    assert current_clients() is None
+    print("✅ Clients are recreated after a close; a missing API key is an error, not a half-set client")
+
+
+if __name__ == "__main__":
+    test_settings_from_env()
+    test_init_and_close_are_idempotent()
+    print("\n✅ All client tests passed!")
@@ -0,0 +1,28 @@
+"""Cold-start regression test - fails when startup imports or time-to-first-response regress."""
+
+from bench_cold_start import check_budget, measure_imports, run_benchmark, LAZY_MODULES
+
+
+def test_ingestion_and_debug_dependencies_load_lazily():
+    print("🧪 Checking the startup import graph...\n")
+
+    _, modules = measure_imports()
+    eager = [name for name in LAZY_MODULES if name in modules]
+    assert not eager, f"Imported at startup but only needed on first use: {eager}"
+    print(f"✅ None of {', '.join(LAZY_MODULES)} are imported by `import api.app`")
+
+
+def test_cold_start_within_budget():
+    print("\n🧪 Measuring cold start...\n")
+
+    report = run_benchmark(runs=3)
+    print(f"   import: {report['import_ms']:.0f}ms, first response: {report['first_response_ms']:.0f}ms")
+    failures = check_budget(report)
+    assert not failures, "; ".join(failures)
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    test_ingestion_and_debug_dependencies_load_lazily()
+    test_cold_start_within_budget()
+    print("\n✅ All cold-start tests passed!")
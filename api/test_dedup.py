@@ -0,0 +1,67 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import random
+import time
+from dedup import MinHashLSH, shingles
+
+
+SAFETY = (
+    "Never freedive alone. Always dive with a buddy who watches you from the surface "
+    "during the whole dive and for at least thirty seconds after you surface, because "
+    "most blackouts happen in the last meters of the ascent or just after surfacing. "
+    "Your buddy should be trained in rescue techniques and know how to recognize a "
+    "loss of motor control, a samba, or a shallow water blackout."
+)
+
+
+def _chunk(text, source, index):
+    return text, {"source_id": source, "chunk_index": index, "chunk_uid": f"{source}#{index}"}
+
+
+def test_near_duplicates_are_found():
+    print("🧪 Testing MinHash/LSH near-duplicate detection...\n")
+    lsh = MinHashLSH(threshold=0.8)
+
+    # Same passage, re-typeset in another manual: case, punctuation and a changed word
+    reworded = SAFETY.upper().replace(",", "").replace("thirty", "30")
+    assert len(shingles(SAFETY) & shingles(reworded)) / len(shingles(SAFETY) | shingles(reworded)) > 0.8
+
+    unrelated = (
+        "Equalization is the process of adding air to the middle ear to balance the "
+        "increasing water pressure. The Frenzel technique uses the tongue as a piston "
+        "while the glottis is closed, which works well in a head-down position."
+    )
+    unique, duplicates = lsh.collapse([
+        _chunk(SAFETY, "AIDA1.pdf", 3),
+        _chunk(unrelated, "AIDA2.pdf", 8),
+        _chunk(reworded, "AIDA2.pdf", 9),
+    ])
+    assert [meta["chunk_uid"] for _, meta in unique] == ["AIDA1.pdf#3", "AIDA2.pdf#8"]
+    assert [meta["chunk_uid"] for meta in duplicates["AIDA1.pdf#3"]] == ["AIDA2.pdf#9"]
+    print("✅ Re-typeset passage collapsed onto the first copy; different topic kept")
+
+    # A later batch matches chunks indexed earlier; forgetting a key stops matches
+    unique, duplicates = lsh.collapse([_chunk(SAFETY, "AIDA3.pdf", 1)])
+    assert not unique and list(duplicates) == ["AIDA1.pdf#3"]
+    lsh.retain({"AIDA2.pdf#8"})
+    assert len(lsh) == 1 and lsh.query(lsh.signature(SAFETY)) is None
+    print("✅ Matches span batches; retain() forgets removed chunks")
+
+
+def test_roughly_linear_and_no_false_positives():
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    texts = [" ".join(rng.choice(vocabulary) for _ in range(150)) for _ in range(2000)]
+    lsh = MinHashLSH()
+
+    started = time.perf_counter()
+    unique, duplicates = lsh.collapse([_chunk(text, "corpus", i) for i, text in enumerate(texts)])
+    elapsed = time.perf_counter() - started
+
+    assert len(unique) == 2000 and not duplicates
+    print(f"\n✅ 2000 unrelated chunks: no false positives, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_near_duplicates_are_found()
+    test_roughly_linear_and_no_false_positives()
@@ -0,0 +1,96 @@
+"""Tests for background ingestion, readiness and shutdown."""
+
+import asyncio
+import tempfile
+import types
+from pathlib import Path
+
+import httpx
+
+from test_ingest import FakeEmbeddings, _prose, _reset, ingest
+from api.app import app
+from api.embeddings import EmbeddingModel
+
+
+class GatedEmbeddings(FakeEmbeddings):
+    """Embeddings that wait for `release` to be set, so ingestion can be observed mid-run."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def create(self, model, input):
+        self.waiting.set()
+        await self.release.wait()
+        return await super().create(model, input)
+
+
+def _gate(tmp):
+    _reset(tmp)
+    embeddings = GatedEmbeddings()
+    ingest.vector_store.embedding_model = EmbeddingModel(client=types.SimpleNamespace(embeddings=embeddings))
+    return embeddings
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_ready_once_indexed():
+    print("🧪 Testing readiness during background ingestion...\n")
+
+    async def scenario(embeddings):
+        async with _client() as client:
+            task = ingest.start_background_ingestion()
+            await embeddings.waiting.wait()
+            # Serving while the index fills in
+            live = await client.get("/api/health/live")
+            loading = await client.get("/api/health/ready")
+            embeddings.release.set()
+            await task
+            ready = await client.get("/api/health/ready")
+        return live, loading, ready
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text(_prose(11, 40))
+        live, loading, ready = asyncio.run(scenario(_gate(tmp)))
+    assert live.status_code == 200
+    assert loading.status_code == 503 and loading.json()["status"] == "loading"
+    assert ready.status_code == 200 and ready.json()["status"] == "ready"
+    assert ready.json()["num_documents"] == ready.json()["chunks_indexed"] > 0
+    print(f"✅ 503 while indexing, 200 once done ({ready.json()['num_documents']} chunks)")
+
+
+def test_shutdown_cancels_ingestion():
+    print("\n🧪 Testing shutdown during ingestion...\n")
+
+    async def scenario(embeddings):
+        # The app lifespan starts ingestion; leaving it is a server shutdown
+        async with app.router.lifespan_context(app):
+            await embeddings.waiting.wait()
+            task = ingest._ingestion_task
+            assert task is not None and not task.done()
+        return task
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text(_prose(12, 40))
+        embeddings = _gate(tmp)
+        task = asyncio.run(scenario(embeddings))
+        assert task.cancelled() and ingest._ingestion_task is None
+        # Nothing half-indexed is remembered: the next start indexes the file again
+        assert not ingest.progress.running and not ingest.progress.complete
+        assert not ingest.manifest.files and not ingest._ingestion_complete
+
+        async def readiness():
+            async with _client() as client:
+                return await client.get("/api/health/ready")
+
+        assert asyncio.run(readiness()).status_code == 503
+    print("✅ Shutdown cancels the running ingestion; it is not reported as complete")
+
+
+if __name__ == "__main__":
+    test_ready_once_indexed()
+    test_shutdown_cancels_ingestion()
+    print("\n✅ All health tests passed!")
@@ -0,0 +1,115 @@
+"""Tests for the on-disk HTTP cache and conditional web fetching (local HTTP server)."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# http_cache uses package-relative imports, so it is imported as api.http_cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.http_cache import HttpCache
+from api.web_loader import AsyncWebLoader
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/etag validates with an ETag, /dated with Last-Modified; bodies sent are counted."""
+    version = "v1"
+    bodies_sent = 0
+
+    def do_GET(self):
+        etag = f'"{self.version}"'
+        last_modified = "Mon, 05 Oct 2026 10:00:00 GMT" if self.version == "v1" else "Tue, 06 Oct 2026 10:00:00 GMT"
+        if self.path == "/etag" and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        if self.path == "/dated" and self.headers.get("If-Modified-Since") == last_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"<p>{self.path} {self.version}</p>".encode()
+        _Handler.bodies_sent += 1
+        self.send_response(200)
+        if self.path == "/etag":
+            self.send_header("ETag", etag)
+        else:
+            self.send_header("Last-Modified", last_modified)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fake_extract(html, url):
+    return [{"text": html, "metadata": {"source_url": url}}]
+
+
+def test_cache_round_trip():
+    print("🧪 Testing HTTP cache...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(tmp)
+        assert cache.get("https://example.com/a") is None
+        cache.put("https://example.com/a", "<p>Apnée</p>", etag='"abc"', last_modified="Mon, 05 Oct 2026 10:00:00 GMT")
+        cached = cache.get("https://example.com/a")
+        assert cached.body == "<p>Apnée</p>"
+        assert cached.conditional_headers() == {
+            "If-None-Match": '"abc"', "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT"
+        }
+        assert cache.stats()["entries"] == 1 and cache.clear() == 1
+        print("✅ Pages and validators round-trip")
+
+        # Unwritable cache degrades to no caching
+        blocker = os.path.join(tmp, "file")
+        open(blocker, "w").close()
+        broken = HttpCache(os.path.join(blocker, "cache"))
+        broken.put("https://example.com/a", "x")
+        assert broken.get("https://example.com/a") is None and not broken.stats()["writable"]
+        print("✅ Unwritable directory disables writes instead of failing")
+
+
+def test_conditional_requests():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/etag", f"{base}/dated"]
+    _Handler.version, _Handler.bodies_sent = "v1", 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HttpCache(tmp)
+
+            async def load(**kwargs):
+                loader = AsyncWebLoader(extract=fake_extract, http_cache=cache, **kwargs)
+                return {r.url: r async for r in loader.iter_urls(urls)}
+
+            first = asyncio.run(load())
+            assert _Handler.bodies_sent == 2 and not any(r.not_modified for r in first.values())
+
+            # Revalidation: both answer 304 - nothing downloaded, nothing extracted
+            second = asyncio.run(load(skip_unmodified=True))
+            assert _Handler.bodies_sent == 2 and cache.revalidated == 2
+            assert all(r.not_modified and not r.documents for r in second.values())
+            print("\n✅ Unchanged pages revalidate with 304 (ETag and Last-Modified)")
+
+            # Without skip_unmodified (e.g. after a restart) the cached body is extracted
+            third = asyncio.run(load())
+            assert third[f"{base}/etag"].documents[0]["text"] == "<p>/etag v1</p>"
+
+            # A changed page is downloaded again
+            _Handler.version = "v2"
+            fourth = asyncio.run(load(skip_unmodified=True))
+            assert _Handler.bodies_sent == 4
+            assert fourth[f"{base}/dated"].documents[0]["text"] == "<p>/dated v2</p>"
+            print("✅ Cached bodies are reused after a 304; changed pages are re-fetched")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_cache_round_trip()
+    test_conditional_requests()
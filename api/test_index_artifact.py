@@ -0,0 +1,147 @@
+"""Tests for index artifacts - save/load round trips, relocated data folders and resumable builds."""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import types
+from pathlib import Path
+
+import numpy as np
+
+from test_ingest import FakeEmbeddings, _prose, _reset, ingest
+from api import build_index
+from api.embeddings import EmbeddingModel
+from api.vector_store import VectorStore
+
+
+def _store(embeddings=None, model="text-embedding-3-small"):
+    client = types.SimpleNamespace(embeddings=embeddings or FakeEmbeddings())
+    return VectorStore(EmbeddingModel(model=model, client=client))
+
+
+def test_save_load_round_trip():
+    print("🧪 Testing index save/load...\n")
+    store = _store()
+    metadata = [{"source_id": f"doc{i}", "chunk_uid": f"doc{i}#0", "page": i} for i in range(3)]
+    asyncio.run(store.add_documents(["Relax before the dive.", "Exhale on the way up.", "Never dive alone."], metadata))
+    store.attach_duplicates({"doc2#0": [{"source_id": "other.pdf", "chunk_uid": "other.pdf#7", "page": 12}]})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.npz")
+        store.save(path, {"note": "ünïcode"})
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+
+        loaded = _store()
+        version = loaded.index_version
+        assert loaded.load(path) == {"note": "ünïcode"}
+        assert loaded.documents == store.documents and loaded.metadata == store.metadata
+        assert loaded.metadata[2]["duplicates"][0]["chunk_uid"] == "other.pdf#7"
+        assert np.array_equal(loaded.embeddings, store.embeddings)
+        # Caches keyed on the index version must see the load as a change
+        assert loaded.index_version > version
+        print("✅ Vectors, documents, metadata and collapsed duplicates survive a round trip")
+
+        other_model = _store(model="text-embedding-3-large")
+        try:
+            other_model.load(path)
+            raise AssertionError("an index from another embedding model must not load")
+        except ValueError as e:
+            assert "text-embedding-3-small" in str(e)
+        assert other_model.documents == []
+
+        empty = _store()
+        empty.save(path)
+        assert _store().load(path) == {} and empty.embeddings is None
+        print("✅ Other embedding models are rejected; empty indexes round-trip")
+
+
+def test_load_index_from_moved_data_dir():
+    print("\n🧪 Testing an index built from another data folder...\n")
+    with tempfile.TemporaryDirectory() as build_dir, tempfile.TemporaryDirectory() as serve_dir:
+        for name, seed in (("a.txt", 7), ("b.txt", 8)):
+            (Path(build_dir) / name).write_text(_prose(seed, 60))
+        _reset(build_dir)
+        asyncio.run(ingest.load_documents_from_data_folder())
+        chunks = len(ingest.vector_store.documents)
+        artifact = os.path.join(build_dir, "index.npz")
+        ingest.save_index(artifact)
+
+        # The server sees the same files under another path (copied, so mtimes differ)
+        for name in ("a.txt", "b.txt"):
+            shutil.copy(Path(build_dir) / name, Path(serve_dir) / name)
+        embeddings = _reset(serve_dir)
+        assert asyncio.run(ingest.load_index(artifact))
+        assert all(meta["source_id"].startswith(serve_dir) for meta in ingest.vector_store.metadata)
+        assert all(path.startswith(serve_dir) for path in ingest.manifest.files)
+
+        asyncio.run(ingest.load_documents_from_data_folder())
+        assert embeddings.texts == 0 and len(ingest.vector_store.documents) == chunks
+        assert ingest.progress.summary()["sources_unchanged"] == 2
+        print(f"✅ Relocated index loaded: {chunks} chunks, nothing re-embedded")
+
+
+class BlockingEmbeddings(FakeEmbeddings):
+    """Embeddings that hang on texts containing `marker`, until the test interrupts the build."""
+
+    def __init__(self, marker):
+        super().__init__()
+        self.marker = marker
+        self.blocked = asyncio.Event()
+
+    async def create(self, model, input):
+        inputs = [input] if isinstance(input, str) else input
+        if any(self.marker in text for text in inputs):
+            self.blocked.set()
+            await asyncio.Event().wait()
+        return await super().create(model, inputs)
+
+
+def test_resume_partial_build():
+    print("\n🧪 Testing an interrupted, resumed index build...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        data_dir.mkdir()
+        (data_dir / "a.txt").write_text(_prose(9, 60))
+        (data_dir / "b.txt").write_text(_prose(10, 60))
+        output = os.path.join(tmp, "index.npz")
+        args = argparse.Namespace(
+            output=output, workers=0, batch_size=None, web_connections=None, data_dir=str(data_dir),
+            config_dir=str(data_dir), checkpoint_every=30.0, fresh=False
+        )
+
+        async def interrupted_build():
+            embeddings = BlockingEmbeddings(marker="W10x")
+            ingest.vector_store.embedding_model = EmbeddingModel(client=types.SimpleNamespace(embeddings=embeddings))
+            build = asyncio.create_task(build_index.build(args))
+            await embeddings.blocked.wait()
+            build.cancel()
+            try:
+                await build
+            except asyncio.CancelledError:
+                pass
+            return embeddings.texts
+
+        _reset(data_dir)
+        first_run = asyncio.run(interrupted_build())
+        assert os.path.exists(output) and first_run > 0
+        print(f"✅ Interrupted while embedding b.txt; checkpoint holds a.txt ({first_run} chunks)")
+
+        # A new process: empty index, resumes from the checkpoint
+        embeddings = _reset(data_dir)
+        assert asyncio.run(build_index.build(args)) == 0
+        b_chunks = ingest.progress.sources[str(data_dir / "b.txt")].chunks
+        assert embeddings.texts == b_chunks
+        assert len(ingest.vector_store.documents) == first_run + b_chunks
+
+        embeddings = _reset(data_dir)
+        assert asyncio.run(build_index.build(args)) == 0 and embeddings.texts == 0
+        print(f"✅ Resume embedded only b.txt ({b_chunks} chunks); a rerun embeds nothing")
+
+
+if __name__ == "__main__":
+    test_save_load_round_trip()
+    test_load_index_from_moved_data_dir()
+    test_resume_partial_build()
+    print("\n✅ All index artifact tests passed!")
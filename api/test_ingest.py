@@ -0,0 +1,225 @@
+"""Tests for incremental ingestion - failure recovery and the near-duplicate index."""
+
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+# ingest uses package-relative imports, so it is imported as api.ingest
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("INGEST_WORKERS", "0")
+
+from api import ingest
+from api.dedup import MinHashLSH
+from api.embeddings import EmbeddingModel
+from api.manifest import UrlRecord
+from api.pipeline import create_parse_executor, stream_file_chunks
+from api.web_loader import WebFetchResult
+
+URL = "https://example.com/blackout"
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-words embeddings; `fail` makes every request raise."""
+
+    def __init__(self):
+        self.fail = False
+        self.texts = 0
+
+    async def create(self, model, input):
+        if self.fail:
+            raise RuntimeError("embedding API unavailable")
+        inputs = [input] if isinstance(input, str) else input
+        self.texts += len(inputs)
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=_vector(text)) for text in inputs])
+
+
+def _vector(text, dim=32):
+    vector = np.zeros(dim)
+    for word in text.lower().split():
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dim] += 1
+    return list(vector / (np.linalg.norm(vector) or 1))
+
+
+def _prose(seed, sentences):
+    rng = random.Random(seed)
+    vocabulary = [f"w{seed}x{i}" for i in range(3000)]
+    return " ".join(" ".join(rng.choice(vocabulary) for _ in range(14)).capitalize() + "." for _ in range(sentences))
+
+
+def _reset(data_dir, config_dir=None):
+    """Point ingestion at a temporary corpus with an empty index and fake embeddings."""
+    embeddings = FakeEmbeddings()
+    ingest.vector_store.embedding_model = EmbeddingModel(client=types.SimpleNamespace(embeddings=embeddings))
+    ingest.vector_store.clear()
+    ingest.manifest.clear()
+    ingest.dedup = MinHashLSH(threshold=0.7)
+    ingest.parse_cache = None
+    ingest.DATA_DIR = Path(data_dir)
+    ingest.CONFIG_DIR = Path(config_dir or data_dir)
+    ingest._ingestion_complete = False
+    return embeddings
+
+
+async def _load():
+    ingest._ingestion_complete = False
+    await ingest.load_documents_from_data_folder()
+
+
+def _stored_uids():
+    return {meta["chunk_uid"] for meta in ingest.vector_store.metadata}
+
+
+def test_failed_embedding_leaves_no_duplicate_signatures():
+    print("🧪 Testing recovery from a failed embedding request...\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text(_prose(1, 300))
+        embeddings = _reset(tmp)
+
+        embeddings.fail = True
+        asyncio.run(_load())
+        source = str(Path(tmp) / "manual.txt")
+        assert ingest.progress.sources[source].status == "failed"
+        assert not ingest.vector_store.documents and len(ingest.dedup) == 0
+        print("✅ Failed load stores nothing and forgets the chunks' signatures")
+
+        # The retry must index every chunk instead of collapsing them onto their own stale signatures
+        embeddings.fail = False
+        asyncio.run(_load())
+        entry = ingest.progress.sources[source]
+        assert entry.status == "done" and entry.duplicates == 0
+        assert len(ingest.vector_store.documents) == entry.chunks > 1
+        assert ingest.manifest.files[source].chunks == entry.chunks
+        assert len(ingest.dedup) == len(_stored_uids()) and all(uid in ingest.dedup for uid in _stored_uids())
+        print(f"✅ Retry indexes all {entry.chunks} chunks")
+
+
+def test_web_refresh_collapses_duplicates():
+    print("\n🧪 Testing near-duplicate collapsing on web refresh...\n")
+    shared, fresh = _prose(2, 20), _prose(3, 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text(shared)
+        embeddings = _reset(tmp)
+        asyncio.run(_load())
+        manual_uids = _stored_uids()
+
+        # Version 1 of the article, indexed earlier
+        old_text = _prose(4, 20)
+        chunks, metadata = ingest._web_chunks(URL, [{"text": old_text, "metadata": {"source_url": URL}}])
+        old_uids = {meta["chunk_uid"] for meta in metadata}
+        asyncio.run(ingest.vector_store.add_documents(chunks, metadata))
+        asyncio.run(ingest._sync_dedup())
+        ingest.manifest.record_url(UrlRecord(URL, "2026-01-01T00:00:00", "old", len(chunks)))
+
+        class Loader:
+            async def iter_urls(self, urls):
+                # Version 2 quotes the manual and adds a new section
+                yield WebFetchResult(URL, [{"text": shared + "\n\n" + fresh, "metadata": {"source_url": URL}}])
+
+        web_loader, ingest._web_loader = ingest._web_loader, lambda executor, skip_unmodified=False: Loader()
+        try:
+            embedded_before = embeddings.texts
+            outcome = asyncio.run(ingest.refresh_web_sources())
+        finally:
+            ingest._web_loader = web_loader
+
+        assert outcome["updated"] == 1
+        web_chunks = [meta for meta in ingest.vector_store.metadata if meta["source_id"] == URL]
+        collapsed = [
+            dup for meta in ingest.vector_store.metadata if meta["chunk_uid"] in manual_uids
+            for dup in meta.get("duplicates") or []
+        ]
+        assert web_chunks and collapsed and all(dup["source_id"] == URL for dup in collapsed)
+        assert embeddings.texts - embedded_before == len(web_chunks)
+        # The old version is gone from both the store and the duplicate index
+        assert not old_uids & _stored_uids() and not any(uid in ingest.dedup for uid in old_uids)
+        assert len(ingest.dedup) == len(_stored_uids()) and all(uid in ingest.dedup for uid in _stored_uids())
+        print(f"✅ Refreshed page: {len(collapsed)} quoted chunk(s) collapsed, {len(web_chunks)} embedded")
+
+
+class SlowEmbeddings(FakeEmbeddings):
+    """Embeddings that take `delay` seconds for texts containing `slow`."""
+
+    def __init__(self, slow, delay):
+        super().__init__()
+        self.slow = slow
+        self.delay = delay
+
+    async def create(self, model, input):
+        inputs = [input] if isinstance(input, str) else input
+        await asyncio.sleep(self.delay if any(self.slow in text for text in inputs) else 0)
+        return await super().create(model, inputs)
+
+
+def test_concurrent_sources_keep_their_duplicates():
+    print("\n🧪 Testing near-duplicates of a chunk that is still being embedded...\n")
+    shared, fresh = _prose(13, 20), _prose(14, 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        _reset(tmp)
+        embeddings = SlowEmbeddings(slow="w13x", delay=0.1)
+        ingest.vector_store.embedding_model = EmbeddingModel(client=types.SimpleNamespace(embeddings=embeddings))
+        manual = str(Path(tmp) / "manual.txt")
+        ingest.progress.begin([ingest.SourceProgress(manual, "local_file"), ingest.SourceProgress(URL, "web")])
+
+        async def store_side_by_side():
+            # The manual's batch is mid-embedding when the article quoting it arrives
+            local = asyncio.create_task(
+                ingest._store_chunks(manual, [(shared, {"source_id": manual, "chunk_uid": f"{manual}#0"})])
+            )
+            await asyncio.sleep(0.01)
+            web = await ingest._store_chunks(URL, [
+                (shared, {"source_id": URL, "chunk_uid": f"{URL}#0"}),
+                (fresh, {"source_id": URL, "chunk_uid": f"{URL}#1"}),
+            ])
+            return await local, web
+
+        local, web = asyncio.run(store_side_by_side())
+        assert (local, web) == (0, 1)
+        referenced = {meta["chunk_uid"] for meta in ingest.vector_store.metadata} | {
+            dup["chunk_uid"] for meta in ingest.vector_store.metadata for dup in meta.get("duplicates") or []
+        }
+        assert referenced == {f"{manual}#0", f"{URL}#0", f"{URL}#1"} and embeddings.texts == 2
+        print("✅ The quoted chunk is attached to the manual's chunk once it is stored, not dropped")
+
+
+def test_stage_timings_exclude_backpressure():
+    print("\n🧪 Testing parse/chunking stage timings...\n")
+
+    async def consume(path, executor, stage_seconds):
+        chunks = 0
+        async for _ in stream_file_chunks(path, executor, stage_seconds=stage_seconds):
+            chunks += 1
+            await asyncio.sleep(0.02)  # a consumer blocked on a full embedding queue
+        return chunks
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "manual.txt"
+        path.write_text(_prose(6, 100))
+        executor = create_parse_executor(workers=0)
+        stage_seconds = {}
+        try:
+            started = time.perf_counter()
+            chunks = asyncio.run(consume(path, executor, stage_seconds))
+            elapsed = time.perf_counter() - started
+        finally:
+            executor.shutdown()
+    assert set(stage_seconds) == {"parse", "chunking"} and chunks > 5
+    assert sum(stage_seconds.values()) < 0.02 * chunks / 2 < elapsed
+    print(f"✅ {chunks} chunks in {elapsed:.2f}s; parse {stage_seconds['parse'] * 1000:.1f}ms, "
+          f"chunking {stage_seconds['chunking'] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    test_failed_embedding_leaves_no_duplicate_signatures()
+    test_web_refresh_collapses_duplicates()
+    test_concurrent_sources_keep_their_duplicates()
+    test_stage_timings_exclude_backpressure()
+    print("\n✅ All ingestion tests passed!")
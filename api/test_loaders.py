@@ -0,0 +1,120 @@
+"""Tests for the streaming page splitter and the boundary-aware splitter."""
+
+import random
+from loaders import (
+    BoundaryTextSplitter, CharacterTextSplitter, StreamingBoundarySplitter, StreamingPageSplitter, split_pages
+)
+from tokens import estimate_tokens
+
+
+def test_streaming_split_matches_whole_document_split():
+    print("🧪 Testing streaming page splitter...\n")
+
+    random.seed(7)
+    for _ in range(200):
+        pages = [
+            (number, "".join(random.choice("ab \n") for _ in range(random.choice([0, 3, 199, 200, 1000, 2500]))))
+            for number in range(1, random.randint(1, 8) + 1)
+        ]
+        size = random.choice([10, 100, 1000])
+        overlap = random.choice([0, size // 5, size - 1])
+
+        expected = CharacterTextSplitter(size, overlap).split_text("\n".join(text for _, text in pages))
+        streamed = [chunk for chunk, _, _ in split_pages(pages, size, overlap)]
+        assert streamed == expected
+
+    print("✅ Same chunks as splitting the joined document")
+
+
+def test_chunks_know_their_pages():
+    pages = [(1, "a" * 150), (2, "b" * 150), (3, "c" * 150)]
+    chunks = list(split_pages(pages, chunk_size=100, chunk_overlap=0))
+
+    assert [(first, last) for _, first, last in chunks] == [(1, 1), (1, 2), (2, 2), (2, 3), (3, 3)]
+    print("\n✅ Chunks record the first and last page they span")
+
+
+def test_memory_is_bounded_to_the_current_window():
+    splitter = StreamingPageSplitter(chunk_size=100, chunk_overlap=20)
+    for number in range(1, 1001):
+        splitter.feed(number, "x" * 500)
+        assert len(splitter._buffer) < 100 + 500
+        assert len(splitter._page_offsets) <= 2
+    assert splitter.finish()
+    print("\n✅ Buffered text stays under one chunk plus one page")
+
+
+def test_boundary_splitter_ends_chunks_on_sentences():
+    print("\n🧪 Testing boundary-aware splitter...\n")
+    text = (
+        "Relax before the dive. Exhale passively and breathe slowly!\n\n"
+        "Equalize early and often. Stop the descent if it hurts.\n\n"
+        "Surface with your buddy watching. Do the recovery breathing."
+    )
+    splitter = BoundaryTextSplitter(chunk_size=70, chunk_overlap=30)
+    spans = splitter.split_spans(text)
+    chunks = [text[start:end] for start, end in spans]
+
+    assert chunks == [
+        "Relax before the dive. Exhale passively and breathe slowly!",
+        "Equalize early and often. Stop the descent if it hurts.",
+        "Stop the descent if it hurts.\n\nSurface with your buddy watching.",
+        "Do the recovery breathing.",
+    ]
+    assert splitter.split_text(text) == chunks
+    print("✅ Chunks end on sentences, prefer paragraph breaks, overlap by whole sentences of at most 30 chars")
+
+    # A sentence longer than a chunk is cut between words, a word longer than a chunk anywhere
+    long_text = "word " * 50 + "x" * 45
+    for start, end in BoundaryTextSplitter(chunk_size=20).split_spans(long_text):
+        assert end - start <= 20 and long_text[start] != " " and long_text[end - 1] != " "
+    print("✅ Oversized sentences are cut between words")
+
+
+def test_boundary_splitter_sizes_chunks_in_tokens():
+    text = " ".join(f"Sentence number {i} is about equalization." for i in range(200))
+    splitter = BoundaryTextSplitter(chunk_size=64, chunk_overlap=8, length_function=estimate_tokens)
+    chunks = splitter.split_text(text)
+
+    assert all(48 <= estimate_tokens(chunk) <= 64 for chunk in chunks[:-1])
+    assert all(chunk.endswith(".") for chunk in chunks)
+    # Overlap is at most 8 tokens - one 7-token sentence - instead of a fixed 20% of every chunk
+    assert sum(map(estimate_tokens, chunks)) <= estimate_tokens(text) * 1.15
+    print(f"\n✅ {len(chunks)} chunks of at most 64 tokens, overlap one sentence")
+
+
+def test_streaming_boundary_split_matches_whole_document_split():
+    random.seed(11)
+    sentences = ["Hold your breath.", "Relax!", "Is the buddy ready?", "Equalize every meter or so.", "x" * 120]
+    for _ in range(100):
+        pages = [
+            (number, random.choice(["", "\n\n"]).join(
+                " ".join(random.choice(sentences) for _ in range(random.randint(0, 12))) for _ in range(3)
+            ))
+            for number in range(1, random.randint(1, 8) + 1)
+        ]
+        length_function = random.choice([None, estimate_tokens])
+        size = random.choice([30, 100]) if length_function is None else random.choice([8, 40])
+        splitter = BoundaryTextSplitter(size, size // 4, length_function=length_function)
+
+        expected = splitter.split_text("\n".join(text for _, text in pages))
+        streaming = StreamingBoundarySplitter(splitter)
+        streamed = [chunk for number, text in pages for chunk in streaming.feed(number, text)]
+        streamed += streaming.finish()
+        assert [chunk for chunk, _, _ in streamed] == expected
+        # First/last pages are those the chunk's first and last words came from
+        page_texts = dict(pages)
+        for chunk, first, last in streamed:
+            assert chunk.split()[0] in page_texts[first] and chunk.split()[-1] in page_texts[last]
+
+    print("\n✅ Streaming boundary splitter matches splitting the joined document")
+
+
+if __name__ == "__main__":
+    test_streaming_split_matches_whole_document_split()
+    test_chunks_know_their_pages()
+    test_memory_is_bounded_to_the_current_window()
+    test_boundary_splitter_ends_chunks_on_sentences()
+    test_boundary_splitter_sizes_chunks_in_tokens()
+    test_streaming_boundary_split_matches_whole_document_split()
+    print("\n✅ All loader tests passed!")
@@ -0,0 +1,90 @@
+"""Tests for the source manifest behind incremental reloads."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# parse_cache uses package-relative imports, so it is imported as api.parse_cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.manifest import FileRecord, SourceManifest, UrlRecord
+from api.parse_cache import file_digest
+
+
+def _write(path: str, content: bytes, mtime: float) -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _commit(manifest: SourceManifest, diff, records, chunks: int = 3) -> None:
+    for path in diff.to_index:
+        records[path].chunks = chunks
+        manifest.record_file(records[path])
+
+
+def test_file_diff():
+    print("🧪 Testing manifest file diff...\n")
+
+    hashed = []
+
+    def digest(path: str) -> str:
+        hashed.append(os.path.basename(path))
+        return file_digest(path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        a = _write(os.path.join(tmp, "a.txt"), b"apnea", 1000)
+        b = _write(os.path.join(tmp, "b.txt"), b"equalization", 1000)
+        manifest = SourceManifest()
+
+        diff, records = manifest.diff_files([a, b], digest)
+        assert diff.added == [a, b] and not diff.removed
+        _commit(manifest, diff, records)
+        print(f"✅ First load indexes everything: {diff.counts()}")
+
+        # Nothing changed: no file is even hashed
+        hashed.clear()
+        diff, _ = manifest.diff_files([a, b], digest)
+        assert diff.unchanged == [a, b] and not diff.to_index and hashed == []
+        print("✅ Unchanged folder reads no file contents")
+
+        # Touched (new mtime, same bytes) stays unchanged; edited and new files are re-indexed
+        _write(a, b"apnea", 2000)
+        _write(b, b"equalisation", 2000)
+        c = _write(os.path.join(tmp, "c.txt"), b"safety", 2000)
+        diff, records = manifest.diff_files([a, b, c], digest)
+        assert diff.unchanged == [a] and diff.changed == [b] and diff.added == [c]
+        assert manifest.files[a].mtime == 2000 and manifest.files[a].chunks == 3
+        _commit(manifest, diff, records)
+
+        # Deleted files are reported as removed
+        diff, _ = manifest.diff_files([a, c], digest)
+        assert diff.removed == [b] and diff.unchanged == [a, c]
+        print(f"✅ Touched/edited/added/removed detected: {diff.counts()}")
+
+
+def test_url_diff_and_round_trip():
+    manifest = SourceManifest()
+    manifest.record_url(UrlRecord("https://a.example/1", "2026-01-01T00:00:00", "h1", 4))
+    manifest.record_url(UrlRecord("https://a.example/2", "2026-01-01T00:00:00", "h2", 2))
+
+    diff = manifest.diff_urls(["https://a.example/2", "https://a.example/3"])
+    assert diff.added == ["https://a.example/3"]
+    assert diff.removed == ["https://a.example/1"]
+    assert diff.unchanged == ["https://a.example/2"]
+    assert manifest.url_changed("https://a.example/2", "h2-edited")
+    assert not manifest.url_changed("https://a.example/2", "h2")
+
+    manifest.record_file(FileRecord("/data/a.pdf", 10, 1.5, "h3", 7))
+    manifest.forget("https://a.example/1")
+    restored = SourceManifest.from_dict(manifest.to_dict())
+    assert restored.files == manifest.files and restored.urls == manifest.urls
+    assert list(restored.urls) == ["https://a.example/2"]
+    print("\n✅ URL diff, forget and dict round trip work")
+
+
+if __name__ == "__main__":
+    test_file_diff()
+    test_url_diff_and_round_trip()
@@ -0,0 +1,53 @@
+"""Tests for Prometheus-style metrics."""
+
+from metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    print("🧪 Testing histogram rendering...\n")
+
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage latency.", labelnames=("stage",), buckets=(0.1, 1.0))
+    search = stages.labels("search")
+    for value in (0.05, 0.5, 0.7, 3.0):
+        search.observe(value)
+
+    text = registry.render()
+    print(text)
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="search",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="search",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="search",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="search"} 4' in text
+    assert 'stage_seconds_sum{stage="search"} 4.25' in text
+    print("✅ Buckets are cumulative with sum and count")
+
+
+def test_counters_and_gauges():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", labelnames=("outcome",))
+    requests.labels("cache_hit").inc()
+    requests.labels("cache_hit").inc()
+    depth = registry.gauge("queue_depth", "Queue depth.")
+    depth.set_function(lambda: 7)
+    idle = registry.gauge("idle", "Never updated.")
+
+    text = registry.render()
+    assert 'requests_total{outcome="cache_hit"} 2' in text
+    assert "queue_depth 7" in text
+    assert "idle 0" in text, "Unlabeled metrics are exported before first update"
+    print("\n✅ Counters, callback gauges and defaults render correctly")
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("files_total", "Files.", labelnames=("name",)).labels('AIDA "2"\\manual').inc()
+    assert 'files_total{name="AIDA \\"2\\"\\\\manual"} 1' in registry.render()
+    print("\n✅ Label values are escaped")
+
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_counters_and_gauges()
+    test_label_values_are_escaped()
+    print("\n✅ All metrics tests passed!")
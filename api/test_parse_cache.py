@@ -0,0 +1,108 @@
+"""Tests for the on-disk parsed-text cache."""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# parse_cache uses package-relative imports, so it is imported as api.parse_cache
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api import parse_cache
+from api.parse_cache import ParseCache
+
+
+def _write(path: str, content: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_round_trip_and_content_keys():
+    print("🧪 Testing parse cache round trip...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(os.path.join(tmp, "cache"), loader_version="1")
+        manual = _write(os.path.join(tmp, "manual.pdf"), b"%PDF fake bytes")
+        key = cache.file_key(manual)
+
+        assert cache.open_pages(key) is None
+        with cache.writer(key, "manual.pdf") as writer:
+            writer.add(1, "Équalisation – page one")
+            writer.add(2, "")
+        assert list(cache.open_pages(key)) == [(1, "Équalisation – page one"), (2, "")]
+        print("✅ Pages (including unicode and empty pages) round-trip")
+
+        # Same bytes under another name share the entry; edited bytes do not
+        copy = _write(os.path.join(tmp, "renamed.pdf"), b"%PDF fake bytes")
+        assert cache.file_key(copy) == key
+        _write(manual, b"%PDF edited bytes")
+        assert cache.file_key(manual) != key
+        # A new loader version never reads old extractions
+        assert ParseCache(cache.directory, loader_version="2").file_key(copy) != key
+
+        stats = cache.stats()
+        assert stats["entries"] == 1 and stats["hits"] == 1 and stats["misses"] == 1 and stats["writes"] == 1
+        print(f"✅ Keyed by content hash + loader version: {stats}")
+
+
+def test_failed_parse_is_not_cached_and_clear():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        try:
+            with cache.writer("ab" * 32) as writer:
+                writer.add(1, "half a document")
+                raise RuntimeError("parser crashed")
+        except RuntimeError:
+            pass
+        assert cache.open_pages("ab" * 32) is None
+        assert not any(name.endswith(".tmp") for _, _, files in os.walk(tmp) for name in files)
+
+        with cache.writer("cd" * 32) as writer:
+            writer.add(1, "ok")
+        assert cache.clear() == 1 and cache.stats()["entries"] == 0
+    print("\n✅ Partial writes are discarded; clear() removes entries")
+
+
+def test_unwritable_directory_degrades_gracefully():
+    with tempfile.TemporaryDirectory() as tmp:
+        blocker = _write(os.path.join(tmp, "not-a-dir"), b"")
+        cache = ParseCache(os.path.join(blocker, "cache"))
+        with cache.writer("ef" * 32) as writer:
+            writer.add(1, "text")
+        assert cache.stats()["writable"] is False
+        assert cache.open_pages("ef" * 32) is None
+    print("\n✅ An unwritable cache directory is skipped, not fatal")
+
+
+def test_cli_uses_pipeline_loader_version():
+    with tempfile.TemporaryDirectory() as tmp:
+        manual = _write(os.path.join(tmp, "manual.pdf"), b"%PDF fake bytes")
+        directory = os.path.join(tmp, "cache")
+        loader_version, argv = parse_cache.LOADER_VERSION, sys.argv
+        # After a loader version bump, the pipeline's entries are keyed with the new version
+        parse_cache.LOADER_VERSION = "7"
+        try:
+            cache = ParseCache(directory, loader_version="7")
+            with cache.writer(cache.file_key(manual), "manual.pdf") as writer:
+                writer.add(1, "text")
+
+            sys.argv = ["parse_cache.py", "clear", "--dir", directory, manual]
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                assert parse_cache.main() == 0
+        finally:
+            parse_cache.LOADER_VERSION, sys.argv = loader_version, argv
+        assert "Removed 1 cached file(s)" in output.getvalue()
+        assert cache.stats()["entries"] == 0
+    print("\n✅ The CLI clears entries written with the pipeline's loader version")
+
+
+if __name__ == "__main__":
+    test_round_trip_and_content_keys()
+    test_failed_parse_is_not_cached_and_clear()
+    test_unwritable_directory_degrades_gracefully()
+    test_cli_uses_pipeline_loader_version()
+    print("\n✅ All parse cache tests passed!")
@@ -0,0 +1,69 @@
+"""Tests for the on-demand profiling helpers."""
+
+import threading
+import numpy as np
+from profiling import AllocationTracker, collapsed, deep_sizeof, memory_breakdown, sample_stacks
+
+
+def _spin_in_marker_function(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_sees_busy_thread():
+    print("🧪 Testing stack sampler...\n")
+
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin_in_marker_function, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        result = sample_stacks(seconds=0.3, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result["samples"] > 10
+    hot = [stack for stack in result["stacks"] if stack.startswith("busy-worker;")]
+    assert hot and all("_spin_in_marker_function" in stack for stack in hot)
+
+    text = collapsed(result["stacks"])
+    first = text.splitlines()[0]
+    assert first.rsplit(" ", 1)[1].isdigit(), "Collapsed lines end with a sample count"
+    print(f"✅ {result['samples']} samples, hottest stack:\n   {first[:120]}")
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    matrix = np.zeros((100, 64), dtype=np.float32)
+    assert deep_sizeof(matrix) >= matrix.nbytes
+    assert deep_sizeof([matrix, matrix[:10]]) < 2 * matrix.nbytes, "Views and repeats share their buffer"
+
+    texts = [str(i) * 1000 for i in range(10)]
+    assert deep_sizeof(texts) > 10 * 1000
+
+    report = memory_breakdown({"matrix": matrix, "texts": texts})
+    assert list(report["components_mb"]) == ["matrix", "texts"], "Largest component first"
+    print("\n✅ Deep sizes count buffers and shared objects once")
+
+
+def test_allocation_tracker_reports_growth():
+    tracker = AllocationTracker()
+    assert tracker.report() == {"tracing": False}
+    tracker.start()
+    try:
+        first = tracker.report(limit=5)
+        hoard = [bytearray(10_000) for _ in range(100)]
+        second = tracker.report(limit=5)
+    finally:
+        tracker.stop()
+
+    assert first["tracing"] and "growth_since_last_report" not in first
+    assert second["growth_since_last_report"][0]["size_diff_kb"] > 900
+    assert len(hoard) == 100
+    print("\n✅ tracemalloc reports show allocation growth between calls")
+
+
+if __name__ == "__main__":
+    test_sampler_sees_busy_thread()
+    test_deep_sizeof_counts_shared_objects_once()
+    test_allocation_tracker_reports_growth()
+    print("\n✅ All profiling tests passed!")
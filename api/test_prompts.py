@@ -1,6 +1,13 @@
 """Test and compare different prompt templates."""
 
-from prompts import PromptTemplates
+import sys
+from pathlib import Path
+
+# prompts uses package-relative imports, so it is imported as api.prompts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.prompts import PromptTemplates
+from api.tokens import estimate_tokens
 
 
 def test_prompt_templates():
@@ -185,12 +192,96 @@ def test_custom_instructions():
     print()
 
 
+def test_collapsed_duplicates():
+    """A chunk collapsed from several manuals lists where else it appears."""
+    
+    mock_results = [
+        {
+            "text": "Never freedive alone.",
+            "score": 0.85,
+            "metadata": {
+                "filename": "AIDA1 Manual.pdf", "chunk_index": 3, "page": 4, "page_end": 4,
+                "duplicates": [
+                    {"filename": "AIDA2 Manual.pdf", "chunk_index": 9, "page": 14, "page_end": 15},
+                    {"filename": "AIDA3 Manual.pdf", "chunk_index": 2, "page": 3, "page_end": 3},
+                ]
+            }
+        }
+    ]
+    
+    context = PromptTemplates.format_context(mock_results)
+    assert "📑 Also in: AIDA2 Manual.pdf p. 14-15, AIDA3 Manual.pdf p. 3" in context
+    assert context.count("📄 Document:") == 1
+    print("✅ Collapsed duplicates are cited once, with the other manuals listed")
+
+
+def test_static_prefix():
+    """Each template's system message starts with the same bytes; request-specific text comes last."""
+    context = PromptTemplates.format_context([
+        {"text": "Never freedive alone.", "score": 0.9, "metadata": {"filename": "AIDA1.pdf", "chunk_index": 1}}
+    ])
+    for template in PromptTemplates.SYSTEM_PROMPTS:
+        prefix = PromptTemplates.system_prefix(template)
+        with_context = PromptTemplates.build_system_message(template, context=context, custom_instructions="Be brief.")
+        assert with_context.startswith(prefix) and with_context.endswith(context)
+        assert PromptTemplates.CITATION_REQUIREMENT in prefix
+    assert PromptTemplates.system_prefix("unknown") == PromptTemplates.system_prefix("default")
+    print("✅ Templates share a static prefix; context goes last")
+
+
+def test_no_context_message():
+    """Without retrieved context the message has the no-context note and no citation requirement."""
+    for template in PromptTemplates.SYSTEM_PROMPTS:
+        message = PromptTemplates.build_system_message(template, custom_instructions="Be brief.")
+        assert message.startswith(PromptTemplates.system_prefix(template, has_context=False))
+        assert PromptTemplates.NO_CONTEXT_NOTE in message
+        assert PromptTemplates.CITATION_REQUIREMENT not in message
+    assert PromptTemplates.build_system_message("default", enforce_citations=False) == (
+        PromptTemplates.build_system_message("default")
+    )
+    print("✅ No-context messages drop the citation requirement")
+
+
+def test_token_budget_packing():
+    """Packing to a token budget merges neighbours, keeps the best source and trims the rest."""
+    filler = " ".join(f"Sentence {i} is about fin technique and streamlining." for i in range(40))
+    mock_results = [
+        {"text": "Equalize with the Frenzel technique. Close the glottis and push with the tongue.",
+         "score": 0.82, "metadata": {"filename": "AIDA2.pdf", "source_id": "AIDA2.pdf", "chunk_index": 7, "page": 20}},
+        {"text": "Push with the tongue. Equalize every meter during the descent.",
+         "score": 0.74, "metadata": {"filename": "AIDA2.pdf", "source_id": "AIDA2.pdf", "chunk_index": 8, "page": 21}},
+        {"text": filler + " The Frenzel technique also works head down. " + filler,
+         "score": 0.70, "metadata": {"filename": "AIDA3.pdf", "source_id": "AIDA3.pdf", "chunk_index": 30}},
+        {"text": "Unrelated low-scoring text.", "score": 0.2, "metadata": {"filename": "AIDA1.pdf"}},
+    ]
+    
+    context, report = PromptTemplates.pack_context(
+        mock_results, token_budget=150, query="How does the Frenzel technique work?"
+    )
+    assert report["tokens_used"] == estimate_tokens(context) <= 150
+    assert report["merged"] == 1 and report["trimmed"] == 1 and report["sources"] == 2
+    # Consecutive chunks merged without repeating their overlap, pages spanned
+    assert "[Source 1] AIDA2.pdf, p. 20-21" in context
+    assert context.count("Push with the tongue") == 1
+    # The long chunk is cut down to the sentences about the question
+    assert "[Source 2] AIDA3.pdf" in context and "works head down" in context and "…" in context
+    assert "Unrelated" not in context and "━━" not in context
+    
+    verbatim = PromptTemplates.format_context(mock_results)
+    print(f"✅ Packed {report['sources']} sources into {report['tokens_used']} tokens "
+          f"(verbatim context: {estimate_tokens(verbatim)})")
+
+
 if __name__ == "__main__":
     test_prompt_templates()
     test_no_context()
     test_low_relevance()
     show_template_comparison()
     test_custom_instructions()
+    test_collapsed_duplicates()
+    test_static_prefix()
+    test_no_context_message()
+    test_token_budget_packing()
     
     print("=" * 70)
     print("✅ All prompt template tests complete!")
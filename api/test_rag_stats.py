@@ -0,0 +1,105 @@
+"""Tests for constant-memory RAG statistics."""
+
+import random
+import statistics
+from rag_stats import PromptCacheStats, RAGStatistics, RunningStats, QuantileSketch, TimeBucketedCounter
+
+
+def test_running_stats_match_exact():
+    print("🧪 Testing running mean/variance...\n")
+
+    values = [random.random() for _ in range(1000)]
+    left, right = RunningStats(), RunningStats()
+    for v in values[:400]:
+        left.add(v)
+    for v in values[400:]:
+        right.add(v)
+    left.merge(right)
+
+    assert left.count == 1000
+    assert abs(left.mean - statistics.fmean(values)) < 1e-9
+    assert abs(left.variance - statistics.pvariance(values)) < 1e-9
+    assert left.min == min(values) and left.max == max(values)
+    print("✅ Merged running stats match exact mean and variance")
+
+
+def test_quantile_sketch_accuracy():
+    print("\n🧪 Testing quantile sketch...\n")
+
+    values = [random.uniform(0.2, 0.95) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        approx = sketch.quantile(q)
+        assert abs(approx - exact) / exact <= 0.011, f"p{int(q * 100)}: {approx} vs {exact}"
+        print(f"  p{int(q * 100)}: exact={exact:.4f} sketch={approx:.4f}")
+
+    # Bounded memory: a few hundred buckets for 20k values
+    assert len(sketch) < 200
+    print(f"✅ Quantiles within 1% using {len(sketch)} buckets")
+
+    # Mergeable: two halves give the same answer as the whole
+    a, b = QuantileSketch(), QuantileSketch()
+    for i, v in enumerate(values):
+        (a if i % 2 else b).add(v)
+    a.merge(b)
+    assert a.quantile(0.9) == sketch.quantile(0.9)
+    print("✅ Merged sketches agree with a single sketch")
+
+
+def test_time_buckets_are_bounded():
+    counter = TimeBucketedCounter(bucket_seconds=60, num_buckets=3)
+    for minute in range(10):
+        counter.add(now=minute * 60)
+        counter.add(now=minute * 60 + 30)
+    series = counter.series()
+    assert len(series) == 3
+    assert all(bucket["count"] == 2 for bucket in series)
+    print("\n✅ Time-bucketed counter keeps only the most recent buckets")
+
+
+def test_rag_statistics_flat_memory():
+    print("\n🧪 Testing RAGStatistics...\n")
+
+    stats = RAGStatistics(recent_size=10)
+    for i in range(5000):
+        results = [
+            {"score": 0.8, "metadata": {"source": "/data/AIDA2 Manual.pdf"}},
+            {"score": 0.6, "metadata": {"source": "AIDA3 Manual.pdf"}},
+        ]
+        stats.record(results, "cosine" if i % 2 else "euclidean", now=1_700_000_000 + i)
+
+    assert stats.total_queries == 5000
+    assert stats.total_documents_retrieved == 10000
+    assert abs(stats.avg_relevance_score - 0.7) < 1e-9
+    assert len(stats.recent_queries) == 10, "Recent queries are a ring buffer"
+    assert stats.top_sources(1) == [("AIDA2 Manual.pdf", 5000)]
+    assert stats.similarity_method_usage["cosine"] == 2500
+    print(f"✅ Stats correct, percentiles: {stats.score_percentiles()}")
+
+
+def test_prompt_cache_stats():
+    stats = PromptCacheStats()
+    stats.record("default", prompt_tokens=1500, cached_tokens=0, completion_tokens=200)
+    stats.record("default", prompt_tokens=1600, cached_tokens=1280, completion_tokens=150)
+    stats.record("advanced", prompt_tokens=1400, cached_tokens=1024, completion_tokens=300)
+
+    summary = stats.summary()
+    assert summary["requests"] == 3 and summary["requests_with_cache_hits"] == 2
+    assert summary["cached_tokens"] == 2304 and summary["cached_ratio"] == round(2304 / 4500, 3)
+    assert summary["by_template"]["default"]["cached_ratio"] == round(1280 / 3100, 3)
+    assert stats.version == 3
+    print(f"\n✅ Prompt cache stats: {summary['cached_ratio']:.0%} of prompt tokens served from cache")
+
+
+if __name__ == "__main__":
+    test_running_stats_match_exact()
+    test_quantile_sketch_accuracy()
+    test_time_buckets_are_bounded()
+    test_rag_statistics_flat_memory()
+    test_prompt_cache_stats()
+    print("\n✅ All RAG statistics tests passed!")
@@ -0,0 +1,73 @@
+"""Tests for model routing."""
+
+import sys
+from pathlib import Path
+
+# routing uses package-relative imports, so it is imported as api.routing
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.routing import ModelRouter, RouteDecision, RouteStats, cosine_equivalent
+
+GOOD_MATCH = [{"text": "Frenzel equalization uses the tongue as a piston.", "score": 0.72}]
+WEAK_MATCH = [{"text": "Fins come in many lengths.", "score": 0.21}]
+
+
+def test_routing_rules():
+    print("🧪 Testing model routing rules...\n")
+    router = ModelRouter()
+
+    assert router.route("What is the Frenzel technique?", "default", GOOD_MATCH) == RouteDecision(
+        "gpt-4.1-nano", "fast", "definitional"
+    )
+    assert router.route("frenzel tips", "beginner", GOOD_MATCH).reason == "short query"
+    # A fast answer needs well-matching context
+    assert router.route("What is the Frenzel technique?", "default", WEAK_MATCH).route == "default"
+    assert router.route("What is the Frenzel technique?", "default", []).route == "default"
+    print("✅ Short and definitional questions with good context go to the fast model")
+
+    assert router.route("Why does CO2 trigger the urge to breathe?", "default", GOOD_MATCH).route == "strong"
+    assert router.route("Compare Frenzel and Valsalva", "beginner", GOOD_MATCH).reason == "reasoning keywords"
+    assert router.route("What is the Frenzel technique?", "advanced", GOOD_MATCH).reason == "advanced template"
+    long_query = "I have been diving for two years and " + "my ears hurt on the way down " * 8
+    assert router.route(long_query, "default", GOOD_MATCH).reason == "long query"
+    print("✅ Reasoning, long queries and the advanced template go to the strong model")
+
+    medium = "Tell me about the equipment freedivers usually bring to a pool training session with their club"
+    assert router.route(medium, "default", GOOD_MATCH).route == "default"
+    print("✅ Everything else stays on the default model")
+
+
+def test_routing_configuration():
+    router = ModelRouter(fast_model="small", strong_model="large", strong_templates=(), confident_score=0.8)
+    assert router.route("What is the Frenzel technique?", "advanced", GOOD_MATCH).route == "default"
+    assert router.route("Why relax?", "default", GOOD_MATCH).model == "large"
+
+    # Euclidean scores are compared on the cosine scale
+    assert abs(cosine_equivalent(0.5, "euclidean") - 0.5) < 1e-9
+    assert cosine_equivalent(0.72, "cosine") == 0.72
+    euclidean = [{"text": "...", "score": 1 / (1 + 0.5)}]  # distance 0.5 -> cosine 0.875
+    assert router.route("frenzel tips", "default", euclidean, similarity_method="euclidean").model == "small"
+    print("✅ Models, templates and thresholds are configurable")
+
+
+def test_route_stats():
+    stats = RouteStats()
+    fast = RouteDecision("gpt-4.1-nano", "fast", "definitional")
+    strong = RouteDecision("gpt-4.1", "strong", "reasoning keywords")
+    for decision, ttft in ((fast, 0.4), (fast, 0.5), (strong, 1.2)):
+        stats.record(decision)
+        stats.observe_ttft(decision, ttft)
+
+    summary = stats.summary()
+    assert summary["requests"] == 3
+    assert summary["routes"] == {"fast": 2, "strong": 1}
+    assert summary["models"] == {"gpt-4.1-nano": 2, "gpt-4.1": 1}
+    assert summary["reasons"]["fast: definitional"] == 2
+    assert abs(summary["ttft_seconds"]["strong"]["p50"] - 1.2) < 0.03
+    print(f"✅ Route stats: {summary['routes']}, TTFT {summary['ttft_seconds']}")
+
+
+if __name__ == "__main__":
+    test_routing_rules()
+    test_routing_configuration()
+    test_route_stats()
@@ -0,0 +1,114 @@
+"""Tests for the semantic answer cache."""
+
+import asyncio
+import numpy as np
+from semantic_cache import SemanticCache, replay
+
+
+KEY = ("default", "gpt-4.1-mini", "cosine")
+
+
+def _vector(*values):
+    return np.array(values, dtype=float)
+
+
+def test_similar_query_hits():
+    print("🧪 Testing semantic cache hits and misses...\n")
+
+    cache = SemanticCache(threshold=0.9)
+    cache.store(KEY, "how do I equalize", _vector(1.0, 0.0, 0.1), ["Use ", "Frenzel."], index_version=1)
+    version = cache.version
+
+    # A paraphrase lands close to the cached query
+    entry = cache.lookup(KEY, _vector(0.95, 0.05, 0.1), index_version=1)
+    assert entry is not None, "Paraphrase should hit"
+    assert entry.answer == "Use Frenzel."
+    print("✅ Paraphrase hits")
+
+    # An unrelated question does not
+    assert cache.lookup(KEY, _vector(0.0, 1.0, 0.0), index_version=1) is None
+    print("✅ Unrelated query misses")
+
+    # Same question under another template is a different partition
+    assert cache.lookup(("beginner", "gpt-4.1-mini", "cosine"), _vector(1.0, 0.0, 0.1), index_version=1) is None
+    print("✅ Partitioned by template/model/similarity method")
+
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+    # Lookups leave the version alone, so stats snapshots are not rebuilt after every chat
+    assert cache.version == version
+
+    # Exact repeats can be recognised without embedding the question
+    assert cache.contains(KEY, "How do I  equalize", index_version=1)
+    assert not cache.contains(KEY, "how do I equalize", index_version=2)
+    assert cache.stats()["hits"] == 1, "contains() is not a lookup"
+    print("✅ Exact repeats are detected without an embedding")
+
+
+def test_ttl_and_size_eviction():
+    print("\n🧪 Testing TTL and LRU eviction...\n")
+
+    now = [0.0]
+    cache = SemanticCache(threshold=0.99, max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.store(KEY, "a", _vector(1, 0, 0), ["A"])
+    cache.store(KEY, "b", _vector(0, 1, 0), ["B"])
+
+    # Touch "a" so "b" becomes least recently used
+    assert cache.lookup(KEY, _vector(1, 0, 0)) is not None
+    cache.store(KEY, "c", _vector(0, 0, 1), ["C"])
+    assert len(cache) == 2
+    assert cache.lookup(KEY, _vector(0, 1, 0)) is None, "LRU entry should be evicted"
+    assert cache.evictions == 1
+    print("✅ Least recently used entry evicted")
+
+    now[0] = 11.0
+    version = cache.version
+    assert cache.lookup(KEY, _vector(1, 0, 0)) is None, "Expired entry should miss"
+    assert cache.version > version, "Evicting expired entries is a change"
+    print("✅ Expired entries miss")
+
+
+def test_expired_best_match_does_not_hide_live_one():
+    now = [0.0]
+    cache = SemanticCache(threshold=0.95, ttl_seconds=10, clock=lambda: now[0])
+    cache.store(KEY, "how do I equalize", _vector(1, 0, 0), ["Old answer."])
+    now[0] = 8.0
+    cache.store(KEY, "how should I equalize", _vector(0.98, 0.2, 0), ["New answer."])
+
+    # The old entry is the closer match, but it has expired
+    now[0] = 11.0
+    entry = cache.lookup(KEY, _vector(1, 0, 0))
+    assert entry is not None and entry.answer == "New answer."
+    assert len(cache) == 1 and cache.stats()["hits"] == 1
+    print("\n✅ An expired best match is evicted; the next live match is served")
+
+
+def test_index_version_invalidation():
+    print("\n🧪 Testing invalidation on index version change...\n")
+
+    cache = SemanticCache(threshold=0.9)
+    cache.store(KEY, "q", _vector(1, 0), ["answer"], index_version=1)
+    assert cache.lookup(KEY, _vector(1, 0), index_version=2) is None
+    assert len(cache) == 0 and cache.invalidations == 1
+    print("✅ Cache cleared when the vector store changes")
+
+    # An answer generated against the old index is not stored
+    assert cache.store(KEY, "q", _vector(1, 0), ["stale"], index_version=1) is None
+    assert len(cache) == 0
+    print("✅ Stale answers are not cached")
+
+
+def test_replay_streams_chunks():
+    async def collect():
+        return [chunk async for chunk in replay(["a", "b", "c"])]
+
+    assert asyncio.run(collect()) == ["a", "b", "c"]
+    print("\n✅ Cached answers replay chunk by chunk")
+
+
+if __name__ == "__main__":
+    test_similar_query_hits()
+    test_ttl_and_size_eviction()
+    test_expired_best_match_does_not_hide_live_one()
+    test_index_version_invalidation()
+    test_replay_streams_chunks()
+    print("\n✅ All semantic cache tests passed!")
@@ -0,0 +1,124 @@
+"""Tests for single-flight request deduplication."""
+
+import asyncio
+from single_flight import SingleFlight, normalize_message
+
+
+def test_normalize_message():
+    assert normalize_message("  How do I   Equalize? ") == normalize_message("how do i equalize")
+    print("✅ Messages normalize case, whitespace and trailing punctuation")
+
+
+async def _identical_requests_share_one_run():
+    print("\n🧪 Testing identical concurrent requests...\n")
+
+    group = SingleFlight()
+    runs = []
+
+    async def pipeline(flight):
+        runs.append(flight.key)
+        for token in ["Equalize ", "early ", "and ", "often."]:
+            await asyncio.sleep(0.03)
+            yield token
+
+    async def request(delay):
+        await asyncio.sleep(delay)
+        subscription = group.subscribe("equalize", pipeline)
+        await subscription.ready()
+        return "".join([chunk async for chunk in subscription.stream()])
+
+    # Late joiners arrive mid-stream and still get the full answer
+    answers = await asyncio.gather(*[request(i * 0.015) for i in range(5)])
+
+    assert len(runs) == 1, f"Expected one pipeline run, got {len(runs)}"
+    assert all(answer == "Equalize early and often." for answer in answers)
+    assert len(group) == 0, "Finished flights are removed"
+    assert group.stats()["deduplicated"] == 4
+    print("✅ Five requests, one pipeline run, identical answers")
+
+
+async def _errors_reach_every_subscriber():
+    print("\n🧪 Testing pipeline errors...\n")
+
+    group = SingleFlight()
+
+    async def failing(flight):
+        await asyncio.sleep(0.01)
+        raise TimeoutError("embedding stage exceeded its 1s deadline")
+        yield  # pragma: no cover - makes this an async generator
+
+    subscriptions = [group.subscribe("q", failing) for _ in range(3)]
+    for subscription in subscriptions:
+        try:
+            await subscription.ready()
+            raise AssertionError("ready() should raise")
+        except TimeoutError:
+            pass
+    print("✅ Every subscriber sees the pipeline error")
+
+    async def stalls_mid_answer(flight):
+        yield "Equalize "
+        await asyncio.sleep(0.02)
+        raise TimeoutError("stream stage exceeded its 1s deadline")
+
+    async def request():
+        subscription = group.subscribe("stall", stalls_mid_answer)
+        await subscription.ready()
+        received = []
+        try:
+            async for chunk in subscription.stream():
+                received.append(chunk)
+        except TimeoutError:
+            return received
+        raise AssertionError("stream() should raise after the partial answer")
+
+    received = await asyncio.gather(*[request() for _ in range(3)])
+    assert received == [["Equalize "]] * 3 and len(group) == 0
+    print("✅ A mid-stream error reaches every subscriber after the partial answer")
+
+
+async def _last_subscriber_leaving_cancels_run():
+    print("\n🧪 Testing cancellation when everyone leaves...\n")
+
+    group = SingleFlight()
+    closed = asyncio.Event()
+
+    async def endless(flight):
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "token "
+        finally:
+            closed.set()
+
+    first = group.subscribe("q", endless)
+    second = group.subscribe("q", endless)
+    await first.ready()
+
+    first.leave()
+    await asyncio.sleep(0.03)
+    assert not closed.is_set(), "Run continues while someone is listening"
+
+    second.leave()
+    await asyncio.wait_for(closed.wait(), timeout=1)
+    print("✅ Upstream run cancelled once the last subscriber left")
+
+
+def test_identical_requests_share_one_run():
+    asyncio.run(_identical_requests_share_one_run())
+
+
+def test_errors_reach_every_subscriber():
+    asyncio.run(_errors_reach_every_subscriber())
+
+
+def test_last_subscriber_leaving_cancels_run():
+    asyncio.run(_last_subscriber_leaving_cancels_run())
+
+
+if __name__ == "__main__":
+    test_normalize_message()
+    test_identical_requests_share_one_run()
+    test_errors_reach_every_subscriber()
+    test_last_subscriber_leaving_cancels_run()
+    print("\n✅ All single-flight tests passed!")
@@ -0,0 +1,166 @@
+"""Tests for stage deadlines and disconnect handling of streamed answers."""
+
+import asyncio
+import os
+import sys
+import types
+from pathlib import Path
+
+# streaming uses package-relative imports, so it is imported as api.streaming
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.streaming import (
+    PipelineDeadlines, StageTimeoutError, open_token_stream, relay_tokens, stop_on_disconnect, with_deadline
+)
+
+
+class FakeStream:
+    """A completion stream that sends `tokens`, then stalls forever if `stall` is set."""
+
+    def __init__(self, tokens, stall=False):
+        self.tokens = tokens
+        self.stall = stall
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for token in self.tokens:
+            await asyncio.sleep(0)
+            self.sent += 1
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=token))])
+        if self.stall:
+            await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+async def _create(stream):
+    return stream
+
+
+class FakeRequest:
+    """Reports a disconnect from the `disconnect_after`-th poll on."""
+
+    def __init__(self, disconnect_after):
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+def test_first_token_deadline():
+    print("🧪 Testing the first-token deadline...\n")
+    stream = FakeStream([], stall=True)
+    try:
+        asyncio.run(open_token_stream(_create(stream), first_token_timeout=0.05))
+        raise AssertionError("a stalled stream must time out")
+    except StageTimeoutError as e:
+        assert e.stage == "first_token" and "0.05s" in str(e)
+    assert stream.closed
+    print("✅ Stalled before the first token: StageTimeoutError, upstream closed")
+
+    async def slow_stage():
+        await asyncio.sleep(1)
+
+    try:
+        asyncio.run(with_deadline(slow_stage(), 0.01, "search"))
+        raise AssertionError("a slow stage must time out")
+    except StageTimeoutError as e:
+        assert e.stage == "search"
+    assert asyncio.run(with_deadline(asyncio.sleep(0.02, "done"), 0, "search")) == "done"
+    print("✅ Stage deadlines raise StageTimeoutError; 0 disables them")
+
+
+def test_mid_stream_stall():
+    print("\n🧪 Testing a stream that stalls mid-answer...\n")
+    stream = FakeStream(["Relax ", "and ", "exhale"], stall=True)
+    completed = []
+
+    async def relay():
+        token_stream, first = await open_token_stream(_create(stream), first_token_timeout=1)
+        received = []
+        try:
+            async for token in relay_tokens(token_stream, first, on_complete=completed.append, token_timeout=0.05):
+                received.append(token)
+        except StageTimeoutError as e:
+            return received, e
+        return received, None
+
+    received, error = asyncio.run(relay())
+    assert received == ["Relax ", "and ", "exhale"]
+    assert error is not None and error.stage == "stream"
+    assert stream.closed and not completed
+    print("✅ Stalled mid-stream: tokens so far relayed, then StageTimeoutError; upstream closed, nothing cached")
+
+    stream = FakeStream(["Never ", "alone"])
+    answer = asyncio.run(_relay_all(stream, completed))
+    assert answer == "Never alone" and completed == [["Never ", "alone"]] and stream.closed
+    print("✅ A complete stream is cached and closed")
+
+
+async def _relay_all(stream, completed):
+    token_stream, first = await open_token_stream(_create(stream), first_token_timeout=1)
+    tokens = [token async for token in relay_tokens(token_stream, first, completed.append, token_timeout=1)]
+    return "".join(tokens)
+
+
+def test_disconnect_closes_upstream():
+    print("\n🧪 Testing client disconnects...\n")
+    stream = FakeStream([f"t{i} " for i in range(100)])
+
+    async def serve():
+        token_stream, first = await open_token_stream(_create(stream), first_token_timeout=1)
+        request = FakeRequest(disconnect_after=3)
+        chunks = relay_tokens(token_stream, first)
+        return [chunk async for chunk in stop_on_disconnect(chunks, request, check_interval=0)]
+
+    forwarded = asyncio.run(serve())
+    assert len(forwarded) == 2 and stream.sent < 100 and stream.closed
+    print(f"✅ Disconnect after {len(forwarded)} chunks: upstream closed after {stream.sent} of 100 tokens")
+
+    # A cancelled consumer (e.g. the server shutting down) closes the upstream stream too
+    stream = FakeStream(["Hello"], stall=True)
+
+    async def cancel_mid_stream():
+        token_stream, first = await open_token_stream(_create(stream), first_token_timeout=1)
+
+        async def consume():
+            async for _ in relay_tokens(token_stream, first):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_mid_stream())
+    assert stream.closed
+    print("✅ Cancelled relay closes the upstream stream")
+
+
+def test_deadlines_from_env():
+    os.environ["CHAT_TOKEN_IDLE_TIMEOUT"] = "7.5"
+    os.environ["CHAT_FIRST_TOKEN_TIMEOUT"] = "not-a-number"
+    try:
+        deadlines = PipelineDeadlines.from_env()
+    finally:
+        del os.environ["CHAT_TOKEN_IDLE_TIMEOUT"], os.environ["CHAT_FIRST_TOKEN_TIMEOUT"]
+    assert deadlines.token_idle == 7.5 and deadlines.first_token == PipelineDeadlines.first_token
+    print("\n✅ Deadlines read from CHAT_* settings; invalid values fall back to defaults")
+
+
+if __name__ == "__main__":
+    test_first_token_deadline()
+    test_mid_stream_stall()
+    test_disconnect_closes_upstream()
+    test_deadlines_from_env()
+    print("\n✅ All streaming tests passed!")
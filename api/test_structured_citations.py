@@ -5,9 +5,15 @@ This demonstrates the enhanced prompt system with structured citations.
 """
 
 import asyncio
-from prompts import PromptTemplates
-from vector_store import VectorStore
-from ingest import get_vector_store, load_documents_from_data_folder
+import sys
+from pathlib import Path
+
+# The api modules use package-relative imports, so they are imported as api.*
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.prompts import PromptTemplates
+from api.vector_store import VectorStore
+from api.ingest import get_vector_store, load_documents_from_data_folder
 
 
 async def demo_structured_citations():
@@ -0,0 +1,22 @@
+"""Tests for token estimates."""
+
+from tokens import estimate_tokens
+
+
+def test_estimate_tokens():
+    print("🧪 Testing token estimates...\n")
+    assert estimate_tokens("") == 0 and estimate_tokens("   \n") == 0
+    assert estimate_tokens("Relax, then dive.") == 5
+    # Long words and numbers cost more than one token
+    assert estimate_tokens("hyperventilation") == 3
+    assert estimate_tokens("1234567") == 3
+    assert estimate_tokens("Apnée à 20 m") == 4
+    print("✅ Words, numbers and punctuation are counted like BPE pieces")
+
+    text = "The mammalian dive reflex slows the heart rate by 10-25% on immersion. " * 20
+    assert estimate_tokens(text) == 18 * 20
+    print("✅ Estimates add up across sentences")
+
+
+if __name__ == "__main__":
+    test_estimate_tokens()
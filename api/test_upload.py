@@ -0,0 +1,104 @@
+"""Tests for the streaming upload endpoint."""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+
+from test_ingest import _prose, _reset, ingest
+
+TOKEN = "upload-secret"
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(ingest.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _upload(client, filename, body, token=TOKEN):
+    headers = {"X-Upload-Token": token} if token is not None else {}
+    return await client.post("/api/ingest/upload", params={"filename": filename}, content=body, headers=headers)
+
+
+async def _wait_for(client, job_id):
+    for _ in range(200):
+        job = (await client.get(f"/api/ingest/upload/{job_id}")).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"upload job {job_id} did not finish")
+
+
+def test_upload_is_indexed():
+    print("🧪 Testing uploads...\n")
+
+    async def scenario(tmp):
+        async with _client() as client:
+            response = await _upload(client, "../notes.txt", _prose(5, 40).encode())
+            assert response.status_code == 202, response.text
+            job = await _wait_for(client, response.json()["job_id"])
+            return job
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _reset(tmp)
+        ingest.UPLOAD_TOKEN = TOKEN
+        job = asyncio.run(scenario(tmp))
+        # The path component is stripped: the file lands in data/
+        assert (Path(tmp) / "notes.txt").exists() and job["filename"] == "notes.txt"
+        assert job["status"] == "done" and job["chunks"] == len(ingest.vector_store.documents) > 0
+        assert not list(Path(tmp).glob(".*.upload"))
+        print(f"✅ Uploaded file saved and indexed: {job['chunks']} chunks")
+
+
+def test_upload_rejections():
+    async def scenario(tmp):
+        async with _client() as client:
+            statuses = {}
+            ingest.UPLOAD_TOKEN = ""
+            statuses["disabled"] = (await _upload(client, "a.txt", b"text")).status_code
+            ingest.UPLOAD_TOKEN = TOKEN
+            statuses["no token"] = (await _upload(client, "a.txt", b"text", token=None)).status_code
+            statuses["wrong token"] = (await _upload(client, "a.txt", b"text", token="guess")).status_code
+            statuses["type"] = (await _upload(client, "slides.pptx", b"text")).status_code
+            statuses["empty"] = (await _upload(client, "empty.txt", b"")).status_code
+            statuses["collision"] = (await _upload(client, "manual.txt", b"replacement")).status_code
+
+            ingest.UPLOAD_MAX_BYTES = 100 * 1024
+            statuses["declared size"] = (await _upload(client, "big.txt", b"x" * (200 * 1024))).status_code
+
+            # Without a Content-Length the cap is enforced on the chunks as they arrive
+            sent = []
+
+            async def body():
+                for _ in range(50):
+                    sent.append(1)
+                    yield b"x" * (16 * 1024)
+
+            statuses["streamed size"] = (await _upload(client, "big.txt", body())).status_code
+            return statuses, len(sent)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "manual.txt").write_text("The original manual.")
+        _reset(tmp)
+        max_bytes = ingest.UPLOAD_MAX_BYTES
+        try:
+            statuses, sent = asyncio.run(scenario(tmp))
+        finally:
+            ingest.UPLOAD_MAX_BYTES = max_bytes
+        assert statuses == {
+            "disabled": 404, "no token": 401, "wrong token": 401, "type": 415, "empty": 400,
+            "collision": 409, "declared size": 413, "streamed size": 413,
+        }, statuses
+        assert sent < 50
+        assert (Path(tmp) / "manual.txt").read_text() == "The original manual."
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["manual.txt"]
+        print(f"✅ Rejected: {statuses}; streamed upload cut off after {sent} of 50 chunks")
+
+
+if __name__ == "__main__":
+    test_upload_is_indexed()
+    test_upload_rejections()
+    print("\n✅ All upload tests passed!")
@@ -0,0 +1,142 @@
+"""Tests for the concurrent web loader, against a local HTTP server (no internet needed)."""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from web_loader import AsyncWebLoader
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves /page?delay=S after sleeping S seconds; /missing is a 404."""
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def do_GET(self):
+        host = self.headers["Host"].split(":")[0]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            url = urlsplit(self.path)
+            time.sleep(float(parse_qs(url.query).get("delay", ["0"])[0]))
+            if url.path == "/missing":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = f"<html><body>Article {url.query}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def fake_extract(html, url):
+    return [{"text": html, "metadata": {"source_url": url}}]
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _Handler.peak.clear()
+    return server, server.server_address[1]
+
+
+def test_concurrent_fetch_tracks_slowest_site():
+    print("🧪 Testing concurrent web loading...\n")
+    server, port = _serve()
+    try:
+        # 12 pages of 0.3s each on two hosts: serially 3.6s
+        urls = [f"http://{host}:{port}/page?delay=0.3&n={i}" for host in ("127.0.0.1", "localhost") for i in range(6)]
+        loader = AsyncWebLoader(max_connections=8, per_host=3, extract=fake_extract)
+
+        started = time.perf_counter()
+        documents = asyncio.run(loader.load_from_urls(urls))
+        elapsed = time.perf_counter() - started
+
+        assert len(documents) == 12
+        assert {doc["metadata"]["source_url"] for doc in documents} == set(urls)
+        assert _Handler.peak == {"127.0.0.1": 3, "localhost": 3}, _Handler.peak
+        assert elapsed < 1.5, elapsed
+        print(f"✅ 12 pages in {elapsed:.2f}s (3.6s serially), per-host peak {_Handler.peak}")
+    finally:
+        server.shutdown()
+
+
+def test_failures_and_total_budget():
+    server, port = _serve()
+    try:
+        base = f"http://127.0.0.1:{port}"
+        loader = AsyncWebLoader(per_host=4, total_timeout=0.8, extract=fake_extract)
+
+        async def run():
+            return [result async for result in loader.iter_urls(
+                [f"{base}/page?delay=0", f"{base}/missing", f"{base}/page?delay=3"]
+            )]
+
+        started = time.perf_counter()
+        results = {result.url: result for result in asyncio.run(run())}
+        elapsed = time.perf_counter() - started
+
+        assert results[f"{base}/page?delay=0"].error is None
+        assert "404" in results[f"{base}/missing"].error
+        assert "budget" in results[f"{base}/page?delay=3"].error
+        assert elapsed < 2, elapsed
+        print(f"\n✅ 404 and over-budget URLs reported, not raised (run stopped after {elapsed:.2f}s)")
+    finally:
+        server.shutdown()
+
+
+def test_slow_consumer_does_not_use_the_budget():
+    server, port = _serve()
+    try:
+        # All fetched within 0.5s, while consuming them takes 3s
+        urls = [f"http://127.0.0.1:{port}/page?delay={0.05 * i:.2f}&n={i}" for i in range(10)]
+        loader = AsyncWebLoader(per_host=10, total_timeout=1.0, extract=fake_extract)
+
+        async def run():
+            results = []
+            async for result in loader.iter_urls(urls):
+                results.append(result)
+                await asyncio.sleep(0.3)  # embedding each article before taking the next
+            return results
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+
+        assert elapsed > 1.0 and len(results) == 10
+        assert [result.error for result in results] == [None] * 10
+        print(f"✅ Pages fetched within the budget are kept by a slow consumer ({elapsed:.2f}s run, 1.0s budget)")
+    finally:
+        server.shutdown()
+
+
+def test_host_delay_spaces_requests():
+    server, port = _serve()
+    try:
+        urls = [f"http://127.0.0.1:{port}/page?n={i}" for i in range(4)]
+        loader = AsyncWebLoader(per_host=4, host_delay=0.2, extract=fake_extract)
+        started = time.perf_counter()
+        documents = asyncio.run(loader.load_from_urls(urls))
+        elapsed = time.perf_counter() - started
+        assert len(documents) == 4 and elapsed >= 0.6, elapsed
+        print(f"✅ host_delay spaces requests to one host ({elapsed:.2f}s for 4)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch_tracks_slowest_site()
+    test_failures_and_total_budget()
+    test_slow_consumer_does_not_use_the_budget()
+    test_host_delay_spaces_requests()
@@ -0,0 +1,24 @@
+"""Token counting - fast estimates for sizing chunks and prompts, without a tokenizer."""
+
+import re
+
+# Roughly how BPE tokenizers pre-split text: words, digit runs, single punctuation marks
+_PIECE = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+# Pieces long enough to cost more than one token
+_LONG_WORD = re.compile(r"[^\W\d_]{7,}")
+_LONG_NUMBER = re.compile(r"\d{4,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the token count of English text without a tokenizer.
+
+    Short words are one token and longer ones about one per six letters,
+    digit runs one per three digits, and each punctuation mark one token.
+    Close to cl100k/o200k counts on English prose, and never zero for non-blank text.
+    """
+    count = len(_PIECE.findall(text))
+    count += sum((len(word) - 1) // 6 for word in _LONG_WORD.findall(text))
+    count += sum((len(number) - 1) // 3 for number in _LONG_NUMBER.findall(text))
+    return count
+
@@ -1,10 +1,16 @@
 """Vector Store Module - In-memory vector database for semantic search."""
 
+import json
+import os
+import threading
 import numpy as np
-from typing import List, Dict, Optional, Any, Literal
+from typing import Callable, List, Dict, Optional, Any, Literal, Tuple
 from .embeddings import EmbeddingModel
 from .similarity import cosine_similarity_batch, euclidean_similarity_batch
 
+# Bump when the layout written by VectorStore.save changes
+INDEX_FORMAT = 1
+
 
 class VectorStore:    
     def __init__(self, embedding_model: Optional[EmbeddingModel] = None):
@@ -12,15 +18,20 @@ class VectorStore:
         self.embeddings: Optional[np.ndarray] = None
         self.metadata: List[Dict[str, Any]] = []
         self.embedding_model = embedding_model or EmbeddingModel()
+        # Bumped on every change to the index so caches built on top can invalidate
+        self.index_version = 0
+        # Searches run in worker threads; they snapshot the index under this lock
+        self._lock = threading.Lock()
     
     def insert(self, text: str, embedding: np.ndarray, metadata: Optional[Dict[str, Any]] = None) -> None:
-        if self.embeddings is None:
-            self.embeddings = np.array([embedding])
-        else:
-            self.embeddings = np.vstack([self.embeddings, embedding.reshape(1, -1)])
-        
-        self.documents.append(text)
-        self.metadata.append(metadata or {})
+        with self._lock:
+            self.documents.append(text)
+            self.metadata.append(metadata or {})
+            if self.embeddings is None:
+                self.embeddings = np.array([embedding])
+            else:
+                self.embeddings = np.vstack([self.embeddings, embedding.reshape(1, -1)])
+            self.index_version += 1
     
     async def build_from_list(
         self, 
@@ -68,18 +79,120 @@ class VectorStore:
         
         new_embeddings = await self.embedding_model.get_embeddings(documents)
         new_embeddings_array = np.array(new_embeddings)
+        
+        with self._lock:
+            self.documents.extend(documents)
+            
+            if metadata is None:
+                self.metadata.extend([{}] * len(documents))
+            else:
+                self.metadata.extend(metadata)
 
-        if self.embeddings is None:
-            self.embeddings = new_embeddings_array
-        else:
-            self.embeddings = np.vstack([self.embeddings, new_embeddings_array])
+            if self.embeddings is None:
+                self.embeddings = new_embeddings_array
+            else:
+                self.embeddings = np.vstack([self.embeddings, new_embeddings_array])
+            self.index_version += 1
+    
+    def _without_source(self, source_id: str) -> Tuple[List[int], List[Dict[str, Any]], int]:
+        """
+        Rows that survive removing one source, with their metadata (call under the lock).
         
-        self.documents.extend(documents)
+        A chunk collapsed from several sources (metadata["duplicates"], see
+        dedup.py) only loses that source's references; when its own source
+        goes, the first remaining duplicate takes its place. It keeps its
+        chunk_uid, which names the stored chunk.
         
-        if metadata is None:
-            self.metadata.extend([{}] * len(documents))
-        else:
-            self.metadata.extend(metadata)
+        Returns:
+            (indices of kept rows, their metadata, number of references removed)
+        """
+        keep: List[int] = []
+        metadata: List[Dict[str, Any]] = []
+        removed = 0
+        for i, meta in enumerate(self.metadata):
+            duplicates = meta.get("duplicates") or []
+            others = [dup for dup in duplicates if dup.get("source_id") != source_id]
+            removed += len(duplicates) - len(others)
+            if meta.get("source_id") == source_id:
+                removed += 1
+                if not others:
+                    continue
+                meta = {**others[0], "chunk_uid": meta.get("chunk_uid"), "duplicates": others[1:]}
+            elif len(others) != len(duplicates):
+                meta = {**meta, "duplicates": others}
+            keep.append(i)
+            metadata.append(meta)
+        return keep, metadata, removed
+    
+    async def replace_source(
+        self,
+        source_id: str,
+        documents: List[str],
+        metadata: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Swap one source's chunks for new ones (metadata must carry the same source_id).
+        
+        The new chunks are embedded first and swapped in under the lock, so
+        searches see either the old version of the source or the new one.
+        """
+        if len(metadata) != len(documents):
+            raise ValueError(
+                f"Metadata length ({len(metadata)}) must match documents length ({len(documents)})"
+            )
+        new_embeddings = np.array(await self.embedding_model.get_embeddings(documents)) if documents else None
+        with self._lock:
+            keep, kept_metadata, _ = self._without_source(source_id)
+            kept = self.embeddings[keep] if keep else None
+            self.documents = [self.documents[i] for i in keep] + list(documents)
+            self.metadata = kept_metadata + list(metadata)
+            if kept is None:
+                self.embeddings = new_embeddings
+            elif new_embeddings is not None:
+                self.embeddings = np.vstack([kept, new_embeddings])
+            else:
+                self.embeddings = kept
+            self.index_version += 1
+    
+    def remove_source(self, source_id: str) -> int:
+        """
+        Drop every chunk of one file or URL (matched on metadata["source_id"]).
+        
+        Returns:
+            Number of chunks (including collapsed duplicates) removed
+        """
+        with self._lock:
+            keep, metadata, removed = self._without_source(source_id)
+            if removed:
+                # New lists rather than in-place deletes: snapshots held by searches stay valid
+                self.documents = [self.documents[i] for i in keep]
+                self.metadata = metadata
+                self.embeddings = self.embeddings[keep] if keep else None
+                self.index_version += 1
+        return removed
+    
+    def attach_duplicates(self, duplicates: Dict[str, List[Dict[str, Any]]]) -> int:
+        """
+        Record near-duplicate chunks on the stored chunk they were collapsed into.
+        
+        Args:
+            duplicates: {chunk_uid of a stored chunk: [metadata of its duplicates]}
+        
+        Returns:
+            Number of duplicates attached (those whose stored chunk is gone are skipped)
+        """
+        attached = 0
+        with self._lock:
+            metadata = list(self.metadata)
+            for i, meta in enumerate(metadata):
+                refs = duplicates.get(meta.get("chunk_uid"))
+                if refs:
+                    metadata[i] = {**meta, "duplicates": (meta.get("duplicates") or []) + refs}
+                    attached += len(refs)
+            if attached:
+                self.metadata = metadata
+                self.index_version += 1
+        return attached
     
     async def search(
         self, 
@@ -103,27 +216,55 @@ class VectorStore:
         if not self.documents or self.embeddings is None:
             return []
         
+        query_vector = await self.embed_query(query)
+        return self.search_by_vector(query_vector, top_k=top_k, similarity_method=similarity_method)
+    
+    async def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query string (the network-bound half of search)."""
         query_embedding = await self.embedding_model.get_embedding(query)
-        query_vector = np.array(query_embedding)
+        return np.array(query_embedding)
+    
+    def search_by_vector(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 5,
+        similarity_method: Literal["cosine", "euclidean"] = "cosine"
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with an already-embedded query (the CPU-bound half of search).
+        
+        Args:
+            query_vector: Query embedding (1D array)
+            top_k: Number of top results to return
+            similarity_method: Either "cosine" or "euclidean"
+        
+        Returns:
+            List of dictionaries with 'text', 'score', and 'metadata'
+        """
+        # Work on one consistent snapshot - the index may change while we scan it
+        with self._lock:
+            embeddings, documents, metadata = self.embeddings, self.documents, self.metadata
+        if not documents or embeddings is None:
+            return []
 
         # Calculate similarities based on chosen method
         if similarity_method == "euclidean":
             # Euclidean similarity (higher is better, range 0-1)
-            similarities = euclidean_similarity_batch(query_vector, self.embeddings)
+            similarities = euclidean_similarity_batch(query_vector, embeddings)
         else:
             # Cosine similarity (higher is better, range 0-1)
-            similarities = cosine_similarity_batch(query_vector, self.embeddings)
+            similarities = cosine_similarity_batch(query_vector, embeddings)
 
-        top_k = min(top_k, len(self.documents))
+        top_k = min(top_k, len(embeddings))
         top_k_indices = np.argsort(similarities)[-top_k:][::-1]
 
         results = []
         for idx in top_k_indices:
             results.append({
-                "text": self.documents[idx],
+                "text": documents[idx],
                 "score": float(similarities[idx]),
                 "metadata": {
-                    **self.metadata[idx],
+                    **metadata[idx],
                     "similarity_method": similarity_method  # Include method in metadata
                 }
             })
@@ -144,8 +285,70 @@ class VectorStore:
             "total_size_mb": round(self.embeddings.nbytes / (1024 * 1024), 2)
         }
 
+    def map_metadata(self, function: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        """Rewrite every chunk's metadata (e.g. to relocate source paths of a loaded index)."""
+        with self._lock:
+            self.metadata = [function(meta) for meta in self.metadata]
+            self.index_version += 1
+    
+    def save(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the index to one .npz file: embeddings plus JSON documents and metadata.
+        
+        The file is replaced atomically, so a reader never sees a partial
+        index. `extra` (JSON-serializable) is stored alongside and returned
+        by load().
+        """
+        with self._lock:
+            documents, metadata, embeddings = list(self.documents), list(self.metadata), self.embeddings
+        payload = {
+            "format": INDEX_FORMAT,
+            "embedding_model": self.embedding_model.model,
+            "documents": documents,
+            "metadata": metadata,
+            "extra": extra or {},
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                embeddings=embeddings if embeddings is not None else np.zeros((0, 0)),
+                payload=np.frombuffer(json.dumps(payload, ensure_ascii=False).encode(), dtype=np.uint8)
+            )
+        os.replace(tmp_path, path)
+    
+    def load(self, path: str) -> Dict[str, Any]:
+        """
+        Replace the index with one written by save().
+        
+        Returns:
+            The `extra` dict stored with it
+        
+        Raises:
+            ValueError: If the file is from another format version or embedding model
+        """
+        with np.load(path, allow_pickle=False) as data:
+            payload = json.loads(data["payload"].tobytes().decode())
+            embeddings = data["embeddings"]
+        if payload.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format {payload.get('format')!r} (expected {INDEX_FORMAT})")
+        if payload["embedding_model"] != self.embedding_model.model:
+            raise ValueError(
+                f"Index was embedded with {payload['embedding_model']}, not {self.embedding_model.model}"
+            )
+        if len(payload["documents"]) != len(embeddings) or len(payload["metadata"]) != len(embeddings):
+            raise ValueError("Index is corrupt: documents, metadata and embeddings differ in length")
+        with self._lock:
+            self.documents = payload["documents"]
+            self.metadata = payload["metadata"]
+            self.embeddings = embeddings if len(embeddings) else None
+            self.index_version += 1
+        return payload["extra"]
+
     def clear(self) -> None:
-        self.documents = []
-        self.embeddings = None
-        self.metadata = []
+        with self._lock:
+            self.documents = []
+            self.embeddings = None
+            self.metadata = []
+            self.index_version += 1
 
@@ -1,8 +1,74 @@
 """Web content loader for fetching and extracting articles from URLs."""
 
+import asyncio
+import time
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from urllib.parse import urlsplit
+
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; DivingCoachBot/1.0)"
+
+
+def extract_content(html: str, url: str) -> Dict[str, Any]:
+    """Extract an article's text and metadata from HTML using trafilatura."""
+    try:
+        import trafilatura
+    except ImportError:
+        raise ImportError(
+            "trafilatura not installed. Install with: pip install trafilatura"
+        )
+    
+    extracted = trafilatura.extract(
+        html,
+        include_comments=False,
+        include_tables=False,
+        no_fallback=False
+    )
+    
+    if not extracted:
+        raise Exception("Failed to extract content from HTML")
+    
+    # Extract metadata
+    metadata_obj = trafilatura.extract_metadata(html)
+    
+    title = "Unknown Title"
+    if metadata_obj:
+        title = metadata_obj.title or title
+    
+    metadata = {
+        "source_url": url,
+        "title": title,
+        "fetch_date": datetime.now().isoformat(),
+        "source_type": "web_article"
+    }
+    
+    if metadata_obj:
+        metadata["author"] = metadata_obj.author
+        metadata["site_name"] = metadata_obj.sitename
+        metadata["publish_date"] = metadata_obj.date
+    
+    return {
+        "title": title,
+        "content": extracted,
+        "metadata": metadata
+    }
+
+
+def extract_article(html: str, url: str) -> List[Dict[str, Any]]:
+    """
+    Extract one page into documents ({'text', 'metadata'}).
+
+    CPU-bound; runs in a worker pool, so it must stay a picklable top-level function.
+    """
+    extracted = extract_content(html, url)
+    return [{
+        "text": f"# {extracted['title']}\n\n{extracted['content']}",
+        "metadata": extracted['metadata']
+    }]
 
 
 class TrafilaturaWebLoader:
@@ -17,7 +83,7 @@ class TrafilaturaWebLoader:
             user_agent: Custom user agent string (optional)
         """
         self.timeout = timeout
-        self.user_agent = user_agent or "Mozilla/5.0 (compatible; DivingCoachBot/1.0)"
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": self.user_agent})
         
@@ -40,51 +106,13 @@ class TrafilaturaWebLoader:
     
     def extract_content(self, html: str, url: str) -> Dict[str, Any]:
         """Extract content using trafilatura."""
-        extracted = self.trafilatura.extract(
-            html,
-            include_comments=False,
-            include_tables=False,
-            no_fallback=False
-        )
-        
-        if not extracted:
-            raise Exception("Failed to extract content from HTML")
-        
-        # Extract metadata
-        metadata_obj = self.trafilatura.extract_metadata(html)
-        
-        title = "Unknown Title"
-        if metadata_obj:
-            title = metadata_obj.title or title
-        
-        metadata = {
-            "source_url": url,
-            "title": title,
-            "fetch_date": datetime.now().isoformat(),
-            "source_type": "web_article"
-        }
-        
-        if metadata_obj:
-            metadata["author"] = metadata_obj.author
-            metadata["site_name"] = metadata_obj.sitename
-            metadata["publish_date"] = metadata_obj.date
-        
-        return {
-            "title": title,
-            "content": extracted,
-            "metadata": metadata
-        }
+        return extract_content(html, url)
     
     def load_from_url(self, url: str) -> List[Dict[str, Any]]:
         """Load article from a single URL."""
         try:
             html = self.fetch_url(url)
-            extracted = self.extract_content(html, url)
-            
-            return [{
-                "text": f"# {extracted['title']}\n\n{extracted['content']}",
-                "metadata": extracted['metadata']
-            }]
+            return extract_article(html, url)
         
         except Exception as e:
             print(f"❌ Error loading {url}: {e}")
@@ -102,6 +130,159 @@ class TrafilaturaWebLoader:
         return documents
 
 
+@dataclass
+class WebFetchResult:
+    """Outcome of loading one URL: its documents, or why it failed."""
+    url: str
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+    not_modified: bool = False  # the server answered 304 to a conditional request
+
+
+class AsyncWebLoader:
+    """
+    Loads many URLs concurrently, so total time tracks the slowest site
+    rather than the sum of all of them.
+
+    Requests share one pooled httpx client capped at `max_connections`, at
+    most `per_host` requests hit any one host at a time (optionally spaced
+    `host_delay` seconds apart), and fetches still running `total_timeout`
+    seconds after a run started are cancelled. HTML extraction is CPU-bound and runs in `executor` (the
+    default thread pool when None), off the event loop.
+
+    With an `http_cache` (see http_cache.HttpCache), requests carry the
+    cached ETag / Last-Modified and a 304 reuses the cached page; with
+    `skip_unmodified` such pages are not even extracted.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 16,
+        per_host: int = 2,
+        host_delay: float = 0.0,
+        timeout: float = 10.0,
+        total_timeout: float = 120.0,
+        user_agent: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        extract: Callable[[str, str], List[Dict[str, Any]]] = extract_article,
+        http_cache: Optional[Any] = None,
+        skip_unmodified: bool = False
+    ):
+        """
+        Args:
+            max_connections: Connections open at once across all hosts
+            per_host: Concurrent requests per host
+            host_delay: Minimum seconds between request starts to one host
+            timeout: Per-request connect/read timeout in seconds
+            total_timeout: Budget in seconds for fetching all URLs of an `iter_urls` run
+            user_agent: Custom user agent string (optional)
+            executor: Pool for extraction (a process pool parallelizes it)
+            extract: (html, url) -> documents; must be picklable for a process pool
+            http_cache: On-disk cache of pages and their validators (optional)
+            skip_unmodified: Report 304 pages as `not_modified` without documents
+        """
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self.executor = executor
+        self.extract = extract
+        self.http_cache = http_cache
+        self.skip_unmodified = skip_unmodified
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+    
+    async def _fetch(self, client, url: str) -> Tuple[str, bool]:
+        """Fetch a page's HTML; returns (html, not_modified)."""
+        cached = await asyncio.to_thread(self.http_cache.get, url) if self.http_cache is not None else None
+        host = urlsplit(url).netloc
+        slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with slot:
+            if self.host_delay:
+                loop = asyncio.get_running_loop()
+                now = loop.time()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.host_delay
+                await asyncio.sleep(start - now)
+            response = await client.get(url, headers=cached.conditional_headers() if cached else None)
+        if response.status_code == 304 and cached is not None:
+            self.http_cache.revalidated += 1
+            return cached.body, True
+        response.raise_for_status()
+        if self.http_cache is not None:
+            await asyncio.to_thread(
+                self.http_cache.put, url, response.text,
+                response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+        return response.text, False
+    
+    async def _load(self, client, url: str) -> WebFetchResult:
+        started = time.perf_counter()
+        try:
+            html, not_modified = await self._fetch(client, url)
+            if not_modified and self.skip_unmodified:
+                return WebFetchResult(url, seconds=time.perf_counter() - started, not_modified=True)
+            documents = await asyncio.get_running_loop().run_in_executor(self.executor, self.extract, html, url)
+            return WebFetchResult(url, documents, seconds=time.perf_counter() - started, not_modified=not_modified)
+        except Exception as e:
+            return WebFetchResult(url, error=str(e) or type(e).__name__, seconds=time.perf_counter() - started)
+    
+    async def _load_by(self, client, url: str, deadline: float) -> WebFetchResult:
+        """_load, cancelled and reported as timed out if it is still running at `deadline`."""
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._load(client, url), deadline - asyncio.get_running_loop().time())
+        except asyncio.TimeoutError:
+            return WebFetchResult(
+                url, error=f"total time budget of {self.total_timeout}s exceeded",
+                seconds=time.perf_counter() - started
+            )
+    
+    async def iter_urls(self, urls: List[str]) -> AsyncIterator[WebFetchResult]:
+        """
+        Load URLs concurrently, yielding each result as soon as it is ready.
+        
+        Failures are yielded as results with `error` set rather than raised;
+        URLs still loading when the total budget runs out are cancelled and
+        reported as timed out. The budget covers fetching only: a page
+        fetched in time is yielded even if the caller spends long on earlier
+        results (e.g. embedding them).
+        """
+        import httpx  # ingestion-only - kept out of cold starts
+        
+        self._host_slots, self._next_start = {}, {}
+        deadline = asyncio.get_running_loop().time() + self.total_timeout
+        async with httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=httpx.Timeout(self.timeout),
+            headers={"User-Agent": self.user_agent},
+            follow_redirects=True
+        ) as client:
+            tasks = [asyncio.create_task(self._load_by(client, url, deadline)) for url in dict.fromkeys(urls)]
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def load_from_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Load articles from multiple URLs concurrently (failed URLs are skipped)."""
+        documents = []
+        async for result in self.iter_urls(urls):
+            if result.error:
+                print(f"❌ Error loading {result.url}: {result.error}")
+            documents.extend(result.documents)
+        return documents
+
+
 # Convenience function
 def load_articles_from_urls(urls: List[str]) -> List[Dict[str, Any]]:
     """
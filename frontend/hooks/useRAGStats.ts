@@ -1,17 +1,25 @@
 /**
  * Hook for fetching RAG system statistics
+ *
+ * Polls by default, which is cheap: the endpoint sends an ETag, so the
+ * browser revalidates and gets 304s while stats are unchanged. Pass
+ * `live` to use server push (Server-Sent Events) instead; it falls back to
+ * polling when the stream is unavailable.
  */
 
 import { useState, useEffect } from "react";
 import { RAGStats } from "@/types";
-import { fetchRAGStats } from "@/utils/api";
+import { fetchRAGStats, subscribeRAGStats } from "@/utils/api";
 
-export function useRAGStats(refreshInterval: number = 30000) {
+export function useRAGStats(refreshInterval: number = 30000, live: boolean = false) {
   const [ragStats, setRagStats] = useState<RAGStats | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    let interval: ReturnType<typeof setInterval> | null = null;
+    let source: EventSource | null = null;
+
     const loadRAGStats = async () => {
       try {
         setLoading(true);
@@ -26,15 +34,40 @@ export function useRAGStats(refreshInterval: number = 30000) {
       }
     };
 
-    // Load immediately
-    loadRAGStats();
+    const startPolling = () => {
+      // Load immediately
+      loadRAGStats();
+
+      // Set up periodic refresh if interval is provided
+      if (refreshInterval > 0) {
+        interval = setInterval(loadRAGStats, refreshInterval);
+      }
+    };
 
-    // Set up periodic refresh if interval is provided
-    if (refreshInterval > 0) {
-      const interval = setInterval(loadRAGStats, refreshInterval);
-      return () => clearInterval(interval);
+    if (live && typeof window !== "undefined" && "EventSource" in window) {
+      source = subscribeRAGStats(
+        (stats) => {
+          setRagStats(stats);
+          setError(null);
+          setLoading(false);
+        },
+        (delta) => setRagStats((prev) => (prev ? { ...prev, ...delta } : prev)),
+        () => {
+          // Push unavailable (e.g. serverless timeout) - fall back to polling
+          source?.close();
+          source = null;
+          if (!interval) startPolling();
+        }
+      );
+    } else {
+      startPolling();
     }
-  }, [refreshInterval]);
+
+    return () => {
+      source?.close();
+      if (interval) clearInterval(interval);
+    };
+  }, [refreshInterval, live]);
 
   return {
     ragStats,
@@ -42,4 +75,3 @@ export function useRAGStats(refreshInterval: number = 30000) {
     error,
   };
 }
-
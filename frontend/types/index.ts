@@ -61,5 +61,13 @@ export interface RAGStats {
     timestamp: string;
     num_results: number;
   }>;
+
+  // Score distribution and per-minute query counts
+  relevance_score_stddev?: number;
+  relevance_score_percentiles?: Record<string, number | null>;
+  queries_over_time?: Array<{
+    timestamp: string;
+    count: number;
+  }>;
 }
 
@@ -2,6 +2,8 @@
  * API utilities for communicating with the FastAPI backend
  */
 
+import { RAGStats } from "@/types";
+
 // Get API base URL - use relative URLs in browser (same domain), or explicit env var
 const getApiBaseUrl = (): string => {
   // If explicitly set via environment variable, use it
@@ -115,3 +117,28 @@ export async function fetchRAGStats() {
   }
 }
 
+
+/**
+ * Subscribe to pushed RAG statistics (Server-Sent Events).
+ * The server sends a full snapshot first, then only the fields that changed.
+ * Returns the EventSource so the caller can close it.
+ */
+export function subscribeRAGStats(
+  onSnapshot: (stats: RAGStats) => void,
+  onDelta: (delta: Partial<RAGStats>) => void,
+  onError: () => void
+): EventSource {
+  const baseUrl = getApiBaseUrl();
+  const apiUrl = baseUrl ? `${baseUrl}/api/rag-stats/stream` : "/api/rag-stats/stream";
+  const source = new EventSource(apiUrl);
+
+  source.addEventListener("snapshot", (event) => {
+    onSnapshot(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener("delta", (event) => {
+    onDelta(JSON.parse((event as MessageEvent).data));
+  });
+  source.onerror = onError;
+
+  return source;
+}